@@ -34,7 +34,8 @@ def health_check():
             'status': 'healthy',
             'timestamp': datetime.now(timezone.utc).isoformat(),
             'version': '1.0.0-simple',
-            'cache_size': len(data_collector.cache)
+            'storage': data_collector.storage.name,
+            'storage_stats': data_collector.storage.stats()
         }
         
         return jsonify(health_status), 200
@@ -58,8 +59,8 @@ def get_market_prices():
         
         if not market_data:
             # Try to collect fresh data
-            collected = data_collector.collect_all_data()
-            market_data = collected.get('market_prices')
+            data_collector.collect_all_data()
+            market_data = data_collector.get_cached_data('market_prices')
         
         if not market_data:
             return jsonify({
@@ -94,13 +95,7 @@ def get_coin_data(symbol):
         
         # Get market data
         market_data = data_collector.get_cached_data('market_prices')
-        coin_data = None
-        
-        if market_data:
-            for coin in market_data.get('data', []):
-                if coin['symbol'] == symbol:
-                    coin_data = coin
-                    break
+        coin_data = market_data.lookup(symbol) if market_data else None
         
         if not coin_data:
             return jsonify({
@@ -110,13 +105,7 @@ def get_coin_data(symbol):
         
         # Get staking data if available
         staking_data = data_collector.get_cached_data('staking_data')
-        staking_info = None
-        
-        if staking_data:
-            for staking in staking_data.get('data', []):
-                if staking['symbol'] == symbol:
-                    staking_info = staking
-                    break
+        staking_info = staking_data.lookup(symbol) if staking_data else None
         
         response_data = {
             'symbol': symbol,
@@ -134,6 +123,53 @@ def get_coin_data(symbol):
             'timestamp': datetime.now(timezone.utc).isoformat()
         }), 500
 
+@app.route('/api/data/coins', methods=['GET'])
+def get_coins_data():
+    """Get data for several coins at once, by symbols or CoinGecko ids"""
+    try:
+        symbols = request.args.get('symbols', '')
+        ids = request.args.get('ids', '')
+        
+        if not symbols and not ids:
+            return jsonify({
+                'error': 'symbols or ids parameter is required',
+                'timestamp': datetime.now(timezone.utc).isoformat()
+            }), 400
+        
+        market_data = data_collector.get_cached_data('market_prices')
+        staking_data = data_collector.get_cached_data('staking_data')
+        
+        symbol_list = [s.strip().upper() for s in symbols.split(',') if s.strip()]
+        id_list = [i.strip().lower() for i in ids.split(',') if i.strip()]
+        coins = (market_data.lookup_many(symbol_list) + [market_data.lookup_id(i) for i in id_list]
+                 if market_data else [None] * (len(symbol_list) + len(id_list)))
+        
+        results = []
+        missing = []
+        for key, coin in zip(symbol_list + id_list, coins):
+            if coin is None:
+                missing.append(key)
+                continue
+            results.append({
+                'symbol': coin['symbol'],
+                'market_data': coin,
+                'staking_data': staking_data.lookup(coin['symbol']) if staking_data else None
+            })
+        
+        return jsonify({
+            'data': results,
+            'count': len(results),
+            'missing': missing,
+            'timestamp': datetime.now(timezone.utc).isoformat()
+        })
+    
+    except Exception as e:
+        logger.error(f"Error getting data for coins: {e}")
+        return jsonify({
+            'error': str(e),
+            'timestamp': datetime.now(timezone.utc).isoformat()
+        }), 500
+
 @app.route('/api/data/staking-data', methods=['GET'])
 def get_staking_data():
     """Get staking data"""
@@ -145,8 +181,8 @@ def get_staking_data():
         
         if not staking_data:
             # Try to collect fresh data
-            collected = data_collector.collect_all_data()
-            staking_data = collected.get('staking_data')
+            data_collector.collect_all_data()
+            staking_data = data_collector.get_cached_data('staking_data')
         
         if not staking_data:
             return jsonify({
@@ -159,7 +195,7 @@ def get_staking_data():
         # Filter by symbols if provided
         if symbols:
             symbol_list = [s.strip().upper() for s in symbols.split(',')]
-            data = [staking for staking in data if staking['symbol'] in symbol_list]
+            data = [staking for staking in staking_data.lookup_many(symbol_list) if staking]
         
         return jsonify({
             'data': data,
@@ -185,8 +221,8 @@ def get_top_staking():
         
         if not staking_data:
             # Try to collect fresh data
-            collected = data_collector.collect_all_data()
-            staking_data = collected.get('staking_data')
+            data_collector.collect_all_data()
+            staking_data = data_collector.get_cached_data('staking_data')
         
         if not staking_data:
             return jsonify({
@@ -194,13 +230,8 @@ def get_top_staking():
                 'timestamp': datetime.now(timezone.utc).isoformat()
             }), 404
         
-        data = staking_data.get('data', [])
-        
-        # Sort by APY (descending)
-        data.sort(key=lambda x: x.get('staking_apy', 0), reverse=True)
-        
-        # Limit results
-        data = data[:limit]
+        # Slice of the pre-sorted APY view, no per-request sort
+        data = staking_data.top('apy', limit)
         
         return jsonify({
             'data': data,
@@ -216,6 +247,46 @@ def get_top_staking():
             'timestamp': datetime.now(timezone.utc).isoformat()
         }), 500
 
+@app.route('/api/data/top-coins', methods=['GET'])
+def get_top_coins():
+    """Get top coins from a pre-sorted view (market_cap, volume or change_24h)"""
+    try:
+        limit = request.args.get('limit', 20, type=int)
+        by = request.args.get('by', 'market_cap')
+        ascending = request.args.get('order', 'desc').lower() == 'asc'
+        
+        market_data = data_collector.get_cached_data('market_prices')
+        
+        if not market_data:
+            return jsonify({
+                'error': 'No market data available',
+                'timestamp': datetime.now(timezone.utc).isoformat()
+            }), 404
+        
+        if by not in market_data.views:
+            return jsonify({
+                'error': f'Unknown view {by}, expected one of: {", ".join(market_data.views)}',
+                'timestamp': datetime.now(timezone.utc).isoformat()
+            }), 400
+        
+        data = market_data.top(by, limit, ascending=ascending)
+        
+        return jsonify({
+            'data': data,
+            'count': len(data),
+            'by': by,
+            'order': 'asc' if ascending else 'desc',
+            'timestamp': market_data.timestamp,
+            'source': market_data.source
+        })
+    
+    except Exception as e:
+        logger.error(f"Error getting top coins: {e}")
+        return jsonify({
+            'error': str(e),
+            'timestamp': datetime.now(timezone.utc).isoformat()
+        }), 500
+
 @app.route('/api/data/market-summary', methods=['GET'])
 def get_market_summary():
     """Get market summary data"""
@@ -246,6 +317,8 @@ def search_coins():
     """Search for coins by name or symbol"""
     try:
         query = request.args.get('q', '').strip()
+        limit = request.args.get('limit', None, type=int)
+        fuzzy = request.args.get('fuzzy', 'false').lower() == 'true'
         
         if not query:
             return jsonify({
@@ -261,15 +334,8 @@ def search_coins():
                 'timestamp': datetime.now(timezone.utc).isoformat()
             }), 404
         
-        data = market_data.get('data', [])
-        query_lower = query.lower()
-        
-        # Search by name or symbol
-        results = []
-        for coin in data:
-            if (query_lower in coin['name'].lower() or 
-                query_lower in coin['symbol'].lower()):
-                results.append(coin)
+        # Search by name or symbol through the snapshot's search index
+        results = market_data.search(query, limit=limit, fuzzy=fuzzy)
         
         return jsonify({
             'data': results,
@@ -294,10 +360,12 @@ if __name__ == '__main__':
     print("  GET /api/data/health - Health check")
     print("  GET /api/data/market-prices - Market prices")
     print("  GET /api/data/coin/<symbol> - Specific coin data")
+    print("  GET /api/data/coins?symbols=<a,b>&ids=<x,y> - Batched coin data")
     print("  GET /api/data/staking-data - Staking data")
     print("  GET /api/data/top-staking - Top staking opportunities")
+    print("  GET /api/data/top-coins?by=<market_cap|volume|change_24h>&order=<desc|asc> - Top coins")
     print("  GET /api/data/market-summary - Market summary")
-    print("  GET /api/data/search?q=<query> - Search coins")
+    print("  GET /api/data/search?q=<query>&limit=<n>&fuzzy=true - Search coins")
     
     app.run(
         host='0.0.0.0',
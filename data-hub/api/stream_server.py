@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+Live price stream (Server-Sent Events)
+
+Runs as a single asyncio process next to the Flask API. Every connection is an idle
+coroutine waiting on its own queue, so thousands of dashboards cost a few KB each.
+When the collector announces a new market_prices snapshot the changed coins are
+computed and encoded once, then fanned out to all subscribers.
+"""
+import asyncio
+import json
+import logging
+import os
+import sys
+from pathlib import Path
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Set
+
+from aiohttp import web
+
+# Add the data-hub directory to Python path
+data_hub_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(data_hub_dir))
+
+from utils.storage import storage
+from utils.snapshot_cache import SnapshotCache
+from utils.snapshot import Snapshot
+from utils.delta import diff_records
+from config.settings import Config
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+def _sse(event: str, data: Dict, event_id: Optional[int] = None) -> bytes:
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"event: {event}")
+    lines.append(f"data: {json.dumps(data, separators=(',', ':'))}")
+    return ('\n'.join(lines) + '\n\n').encode('utf-8')
+
+class Subscriber:
+    def __init__(self, symbols: Optional[Set[str]]):
+        self.symbols = symbols
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=Config.STREAM_QUEUE_SIZE)
+
+class PriceBroadcaster:
+    """Diffs consecutive market snapshots and pushes the changes to every subscriber"""
+
+    def __init__(self, cache: SnapshotCache):
+        self.cache = cache
+        self.snapshot: Optional[Snapshot] = None
+        self.version: Optional[int] = None
+        self.subscribers: Set[Subscriber] = set()
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+
+    async def start(self, app: web.Application):
+        self.loop = asyncio.get_running_loop()
+        await self.refresh()
+        # Notifications arrive on the cache's listener thread; hop onto the event loop
+        self.cache.add_listener(self._on_update)
+
+    def _on_update(self, key: str):
+        if key == 'market_prices' and self.loop is not None:
+            asyncio.run_coroutine_threadsafe(self.refresh(), self.loop)
+
+    async def refresh(self):
+        snapshot = await asyncio.to_thread(self.cache.get, 'market_prices')
+        if snapshot is None or snapshot is self.snapshot:
+            return
+
+        previous, self.snapshot = self.snapshot, snapshot
+        # The version of the snapshot being diffed, so event ids always match their data
+        self.version = snapshot.version
+        if previous is None:
+            return
+
+        changed, removed = diff_records(previous.by_id, snapshot.by_id)
+        if not changed and not removed:
+            return
+
+        logger.info(f"Pushing {len(changed)} changed coins to {len(self.subscribers)} subscribers")
+        shared_event = self._event(changed, removed)
+        for subscriber in list(self.subscribers):
+            if subscriber.symbols is None:
+                event = shared_event
+            else:
+                filtered = [coin for coin in changed if coin['symbol'] in subscriber.symbols]
+                if not filtered and not removed:
+                    continue
+                event = self._event(filtered, removed)
+            self._push(subscriber, event)
+
+    def _event(self, changed: List[Dict], removed: List[str]) -> bytes:
+        return _sse('prices', {
+            'version': self.version,
+            'timestamp': self.snapshot.timestamp,
+            'changed': changed,
+            'removed': removed
+        }, self.version)
+
+    def _push(self, subscriber: Subscriber, event: bytes):
+        try:
+            subscriber.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # Too slow to keep up: drop it, the EventSource reconnects and gets a fresh snapshot
+            self.subscribers.discard(subscriber)
+            while not subscriber.queue.empty():
+                subscriber.queue.get_nowait()
+            subscriber.queue.put_nowait(None)
+
+    def snapshot_event(self, symbols: Optional[Set[str]]) -> Optional[bytes]:
+        if self.snapshot is None:
+            return None
+        data = self.snapshot.data if symbols is None else [
+            coin for coin in self.snapshot.data if coin['symbol'] in symbols
+        ]
+        return _sse('snapshot', {
+            'version': self.version,
+            'timestamp': self.snapshot.timestamp,
+            'data': data
+        }, self.version)
+
+async def stream_prices(request: web.Request) -> web.StreamResponse:
+    """GET /api/data/stream?symbols=BTC,ETH - live price changes as Server-Sent Events"""
+    broadcaster: PriceBroadcaster = request.app['broadcaster']
+    symbols_param = request.query.get('symbols')
+    symbols = {s.strip().upper() for s in symbols_param.split(',') if s.strip()} if symbols_param else None
+
+    response = web.StreamResponse(headers={
+        'Content-Type': 'text/event-stream',
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no',
+        'Access-Control-Allow-Origin': '*'
+    })
+    await response.prepare(request)
+
+    subscriber = Subscriber(symbols)
+    broadcaster.subscribers.add(subscriber)
+    try:
+        # Send the full state first unless the client resumes at the current version
+        if request.headers.get('Last-Event-ID') != str(broadcaster.version):
+            initial = broadcaster.snapshot_event(symbols)
+            if initial:
+                await response.write(initial)
+
+        while True:
+            try:
+                event = await asyncio.wait_for(subscriber.queue.get(), timeout=Config.STREAM_KEEPALIVE)
+            except asyncio.TimeoutError:
+                await response.write(b': keepalive\n\n')
+                continue
+            if event is None:
+                break
+            await response.write(event)
+    except ConnectionResetError:
+        pass
+    finally:
+        broadcaster.subscribers.discard(subscriber)
+
+    return response
+
+async def stream_health(request: web.Request) -> web.Response:
+    broadcaster: PriceBroadcaster = request.app['broadcaster']
+    return web.json_response({
+        'status': 'healthy' if broadcaster.snapshot is not None else 'waiting',
+        'subscribers': len(broadcaster.subscribers),
+        'version': broadcaster.version,
+        'timestamp': datetime.now(timezone.utc).isoformat()
+    })
+
+def create_app() -> web.Application:
+    app = web.Application()
+    broadcaster = PriceBroadcaster(SnapshotCache(
+        storage,
+        max_age=Config.SNAPSHOT_CACHE_MAX_AGE,
+        builders={'market_prices': Snapshot}
+    ))
+    app['broadcaster'] = broadcaster
+    app.on_startup.append(broadcaster.start)
+    app.router.add_get('/api/data/stream', stream_prices)
+    app.router.add_get('/api/data/stream/health', stream_health)
+    return app
+
+if __name__ == '__main__':
+    # Create logs directory if it doesn't exist
+    os.makedirs('logs', exist_ok=True)
+
+    logger.info(f"Starting price stream on {Config.API_HOST}:{Config.STREAM_PORT}")
+    print("Available endpoints:")
+    print("  GET /api/data/stream?symbols=<a,b> - Live price changes (Server-Sent Events)")
+    print("  GET /api/data/stream/health - Stream health")
+
+    web.run_app(create_app(), host=Config.API_HOST, port=Config.STREAM_PORT)
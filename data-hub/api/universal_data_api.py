@@ -5,13 +5,24 @@ import sys
 import os
 from pathlib import Path
 from datetime import datetime, timezone
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 
 # Add the data-hub directory to Python path
 data_hub_dir = Path(__file__).parent.parent
 sys.path.insert(0, str(data_hub_dir))
 
-from utils.redis_client import redis_client
+from utils.storage import storage
+from utils.snapshot_cache import SnapshotCache
+from utils.snapshot import Snapshot
+from utils.mapped_snapshot import mapped_snapshots, packed_snapshot
+from utils.response_cache import ResponseCache
+from utils.prerender import body_name, listing_body, published_names, top_coins_body
+from utils.delta import merge_deltas
+from utils.history_store import history_store, METRICS, TIERS
+from utils.market_columns import NUMERIC_COLUMNS
+from utils.analytics import market_analytics, market_movers
+from functools import partial
+from config.settings import Config
 
 app = Flask(__name__)
 CORS(app)
@@ -23,20 +34,52 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Snapshots with their symbol/id indexes: mapped from the collector's files (pages shared by
+# all workers on the host) or, without a current file, decoded once per worker from storage.
+# Market prices are then packed into the same layout, so no worker keeps every coin as a dict
+snapshot_cache = SnapshotCache(
+    storage,
+    max_age=Config.SNAPSHOT_CACHE_MAX_AGE,
+    builders={
+        'market_prices': partial(packed_snapshot, 'market_prices'),
+        'staking_data': partial(Snapshot, key='staking_data')
+    },
+    mapped=mapped_snapshots
+)
+
+# Pre-encoded (and pre-compressed) response bodies with ETags, loaded or built once per snapshot version
+response_cache = ResponseCache(loader=storage.get_body, published=published_names(Config.PRERENDER_LIMITS))
+
+def _lookup_coins(symbols: List[str]) -> List[Optional[Dict]]:
+    """Resolve symbols through the snapshot index, falling back to the per-symbol hashes"""
+    market_data = snapshot_cache.get('market_prices')
+    records = market_data.lookup_many(symbols) if market_data else [None] * len(symbols)
+    
+    # Coins outside the head snapshot (paginated tail) only live in their hashes
+    missing = [i for i, record in enumerate(records) if record is None]
+    if missing:
+        fetched, _ = storage.get_symbol_records('market_prices', [symbols[i] for i in missing])
+        for i, record in zip(missing, fetched):
+            records[i] = record
+    
+    return records
+
 @app.route('/api/data/health', methods=['GET'])
 def health_check():
     """Health check endpoint"""
     try:
-        redis_healthy = redis_client.health_check()
+        storage_healthy = storage.health_check()
         
         health_status = {
-            'status': 'healthy' if redis_healthy else 'unhealthy',
+            'status': 'healthy' if storage_healthy else 'unhealthy',
             'timestamp': datetime.now(timezone.utc).isoformat(),
-            'redis_connected': redis_healthy,
+            'storage': storage.name,
+            'storage_connected': storage_healthy,
+            'storage_stats': storage.stats(),
             'version': '1.0.0'
         }
         
-        status_code = 200 if redis_healthy else 503
+        status_code = 200 if storage_healthy else 503
         return jsonify(health_status), status_code
     
     except Exception as e:
@@ -47,6 +90,50 @@ def health_check():
             'timestamp': datetime.now(timezone.utc).isoformat()
         }), 500
 
+def _column_query(snapshot: Snapshot, limit: int) -> Optional[Tuple[Dict, ...]]:
+    """Apply min_<column>/max_<column> filters and sort=<column> on the snapshot's NumPy columns.
+    
+    None when the request has neither, so the pre-encoded listing can be served.
+    """
+    bounds = {}
+    for column in NUMERIC_COLUMNS:
+        for side in ('min', 'max'):
+            value = request.args.get(f'{side}_{column}', None, type=float)
+            if value is not None:
+                bounds[(column, side)] = value
+    sort = request.args.get('sort', None)
+    if not bounds and sort is None:
+        return None
+    
+    columns = snapshot.columns
+    positions = columns.select(bounds) if bounds else None
+    if sort is not None:
+        positions = columns.order(sort, ascending=request.args.get('order', 'desc') == 'asc',
+                                  positions=positions, limit=limit)
+    elif positions is not None:
+        positions = positions[:limit]
+    return snapshot.records_at(positions)
+
+def _market_delta_body(snapshot: Snapshot, since: int) -> Dict:
+    """Merged changes from version since to the snapshot's version.
+    
+    When since is unknown or older than the stored deltas reach, the full snapshot is
+    returned instead: a delta client replaces its whole coin set, not just the first page.
+    """
+    current = snapshot.version
+    if current is not None and since <= current and current - since <= Config.DELTA_MAX_CHAIN:
+        deltas = storage.get_deltas('market_prices', list(range(since + 1, current + 1)))
+        if all(delta is not None for delta in deltas):
+            body = merge_deltas(deltas)
+            body.update({
+                'since': since,
+                'version': current,
+                'timestamp': snapshot.timestamp,
+                'source': snapshot.source
+            })
+            return body
+    return listing_body(snapshot.data, snapshot)
+
 @app.route('/api/data/market-prices', methods=['GET'])
 def get_market_prices():
     """Get market prices for all coins"""
@@ -54,8 +141,8 @@ def get_market_prices():
         limit = request.args.get('limit', 100, type=int)
         symbol = request.args.get('symbol', None)
         
-        # Get data from Redis
-        market_data = redis_client.get_data('market_prices')
+        # Get data from the snapshot cache
+        market_data = snapshot_cache.get('market_prices')
         
         if not market_data:
             return jsonify({
@@ -63,21 +150,38 @@ def get_market_prices():
                 'timestamp': datetime.now(timezone.utc).isoformat()
             }), 404
         
-        data = market_data.get('data', [])
-        
         # Filter by symbol if provided
         if symbol:
-            data = [coin for coin in data if coin['symbol'].upper() == symbol.upper()]
+            data = [coin for coin in _lookup_coins([symbol.upper()]) if coin][:limit]
+            return jsonify(listing_body(data, market_data))
         
-        # Limit results
-        data = data[:limit]
+        sort = request.args.get('sort', None)
+        if sort is not None and sort not in NUMERIC_COLUMNS:
+            return jsonify({
+                'error': f'Unknown sort column {sort}, expected one of: {", ".join(NUMERIC_COLUMNS)}',
+                'timestamp': datetime.now(timezone.utc).isoformat()
+            }), 400
         
-        return jsonify({
-            'data': data,
-            'count': len(data),
-            'timestamp': market_data.get('timestamp'),
-            'source': market_data.get('source')
-        })
+        # Filters and custom sorts run vectorized, only the selected rows are serialized
+        data = _column_query(market_data, limit)
+        if data is not None:
+            return jsonify(listing_body(data, market_data))
+        
+        # Clients that already hold a version only need what changed since
+        since = request.args.get('since', None, type=int)
+        if since is not None:
+            current = market_data.version
+            # One cached body per version in the delta window, older versions share the full snapshot
+            if current is not None and 0 <= current - since <= Config.DELTA_MAX_CHAIN:
+                name = body_name('market-prices-delta', since)
+            else:
+                name = body_name('market-prices', 'all')
+            return response_cache.respond(request, name, market_data,
+                                          lambda: _market_delta_body(market_data, since), cache=True)
+        
+        # Limit results; the encoded body is reused until the next collection
+        return response_cache.respond(request, body_name('market-prices', limit), market_data,
+                                      lambda: listing_body(market_data.data[:limit], market_data))
     
     except Exception as e:
         logger.error(f"Error getting market prices: {e}")
@@ -93,14 +197,7 @@ def get_coin_data(symbol):
         symbol = symbol.upper()
         
         # Get market data
-        market_data = redis_client.get_data('market_prices')
-        coin_data = None
-        
-        if market_data:
-            for coin in market_data.get('data', []):
-                if coin['symbol'] == symbol:
-                    coin_data = coin
-                    break
+        coin_data = _lookup_coins([symbol])[0]
         
         if not coin_data:
             return jsonify({
@@ -109,14 +206,8 @@ def get_coin_data(symbol):
             }), 404
         
         # Get staking data if available
-        staking_data = redis_client.get_data('staking_data')
-        staking_info = None
-        
-        if staking_data:
-            for staking in staking_data.get('data', []):
-                if staking['symbol'] == symbol:
-                    staking_info = staking
-                    break
+        staking_data = snapshot_cache.get('staking_data')
+        staking_info = staking_data.lookup(symbol) if staking_data else None
         
         response_data = {
             'symbol': symbol,
@@ -134,14 +225,64 @@ def get_coin_data(symbol):
             'timestamp': datetime.now(timezone.utc).isoformat()
         }), 500
 
+@app.route('/api/data/coins', methods=['GET'])
+def get_coins_data():
+    """Get data for several coins at once, by symbols or CoinGecko ids"""
+    try:
+        symbols = request.args.get('symbols', '')
+        ids = request.args.get('ids', '')
+        
+        if not symbols and not ids:
+            return jsonify({
+                'error': 'symbols or ids parameter is required',
+                'timestamp': datetime.now(timezone.utc).isoformat()
+            }), 400
+        
+        symbol_list = [s.strip().upper() for s in symbols.split(',') if s.strip()]
+        coins = _lookup_coins(symbol_list) if symbol_list else []
+        requested = symbol_list
+        
+        if ids:
+            id_list = [i.strip().lower() for i in ids.split(',') if i.strip()]
+            market_data = snapshot_cache.get('market_prices')
+            coins += [market_data.lookup_id(coin_id) if market_data else None for coin_id in id_list]
+            requested = requested + id_list
+        
+        staking_data = snapshot_cache.get('staking_data')
+        results = []
+        missing = []
+        for key, coin in zip(requested, coins):
+            if coin is None:
+                missing.append(key)
+                continue
+            results.append({
+                'symbol': coin['symbol'],
+                'market_data': coin,
+                'staking_data': staking_data.lookup(coin['symbol']) if staking_data else None
+            })
+        
+        return jsonify({
+            'data': results,
+            'count': len(results),
+            'missing': missing,
+            'timestamp': datetime.now(timezone.utc).isoformat()
+        })
+    
+    except Exception as e:
+        logger.error(f"Error getting data for coins: {e}")
+        return jsonify({
+            'error': str(e),
+            'timestamp': datetime.now(timezone.utc).isoformat()
+        }), 500
+
 @app.route('/api/data/staking-data', methods=['GET'])
 def get_staking_data():
     """Get staking data"""
     try:
         symbols = request.args.get('symbols', None)
         
-        # Get data from Redis
-        staking_data = redis_client.get_data('staking_data')
+        # Get data from the snapshot cache
+        staking_data = snapshot_cache.get('staking_data')
         
         if not staking_data:
             return jsonify({
@@ -149,19 +290,17 @@ def get_staking_data():
                 'timestamp': datetime.now(timezone.utc).isoformat()
             }), 404
         
-        data = staking_data.get('data', [])
-        
         # Filter by symbols if provided
-        if symbols:
-            symbol_list = [s.strip().upper() for s in symbols.split(',')]
-            data = [staking for staking in data if staking['symbol'] in symbol_list]
+        symbol_list = tuple(s.strip().upper() for s in symbols.split(',')) if symbols else None
         
-        return jsonify({
-            'data': data,
-            'count': len(data),
-            'timestamp': staking_data.get('timestamp'),
-            'source': staking_data.get('source')
-        })
+        def build():
+            if symbol_list is None:
+                return listing_body(staking_data.data, staking_data)
+            return listing_body([staking for staking in staking_data.lookup_many(symbol_list) if staking],
+                                staking_data)
+        
+        name = body_name('staking-data', ','.join(symbol_list) if symbol_list else None)
+        return response_cache.respond(request, name, staking_data, build)
     
     except Exception as e:
         logger.error(f"Error getting staking data: {e}")
@@ -176,7 +315,7 @@ def get_top_staking():
     try:
         limit = request.args.get('limit', 20, type=int)
         
-        staking_data = redis_client.get_data('staking_data')
+        staking_data = snapshot_cache.get('staking_data')
         
         if not staking_data:
             return jsonify({
@@ -184,23 +323,44 @@ def get_top_staking():
                 'timestamp': datetime.now(timezone.utc).isoformat()
             }), 404
         
-        data = staking_data.get('data', [])
+        # Slice of the pre-sorted APY view, no per-request sort
+        return response_cache.respond(request, body_name('top-staking', limit), staking_data,
+                                      lambda: listing_body(staking_data.top('apy', limit), staking_data))
+    
+    except Exception as e:
+        logger.error(f"Error getting top staking data: {e}")
+        return jsonify({
+            'error': str(e),
+            'timestamp': datetime.now(timezone.utc).isoformat()
+        }), 500
+
+@app.route('/api/data/top-coins', methods=['GET'])
+def get_top_coins():
+    """Get top coins from a pre-sorted view (market_cap, volume or change_24h)"""
+    try:
+        limit = request.args.get('limit', 20, type=int)
+        by = request.args.get('by', 'market_cap')
+        ascending = request.args.get('order', 'desc').lower() == 'asc'
         
-        # Sort by APY (descending)
-        data.sort(key=lambda x: x.get('staking_apy', 0), reverse=True)
+        market_data = snapshot_cache.get('market_prices')
         
-        # Limit results
-        data = data[:limit]
+        if not market_data:
+            return jsonify({
+                'error': 'No market data available',
+                'timestamp': datetime.now(timezone.utc).isoformat()
+            }), 404
         
-        return jsonify({
-            'data': data,
-            'count': len(data),
-            'timestamp': staking_data.get('timestamp'),
-            'source': staking_data.get('source')
-        })
+        if by not in market_data.views:
+            return jsonify({
+                'error': f'Unknown view {by}, expected one of: {", ".join(market_data.views)}',
+                'timestamp': datetime.now(timezone.utc).isoformat()
+            }), 400
+        
+        return response_cache.respond(request, body_name('top-coins', by, ascending, limit), market_data,
+                                      lambda: top_coins_body(market_data, by, ascending, limit))
     
     except Exception as e:
-        logger.error(f"Error getting top staking data: {e}")
+        logger.error(f"Error getting top coins: {e}")
         return jsonify({
             'error': str(e),
             'timestamp': datetime.now(timezone.utc).isoformat()
@@ -210,7 +370,7 @@ def get_top_staking():
 def get_market_summary():
     """Get market summary data"""
     try:
-        summary = redis_client.get_data('market_summary')
+        summary = snapshot_cache.get('market_summary')
         
         if not summary:
             return jsonify({
@@ -218,7 +378,7 @@ def get_market_summary():
                 'timestamp': datetime.now(timezone.utc).isoformat()
             }), 404
         
-        return jsonify(summary)
+        return response_cache.respond(request, body_name('market-summary'), summary, lambda: summary)
     
     except Exception as e:
         logger.error(f"Error getting market summary: {e}")
@@ -227,11 +387,59 @@ def get_market_summary():
             'timestamp': datetime.now(timezone.utc).isoformat()
         }), 500
 
+@app.route('/api/data/analytics', methods=['GET'])
+def get_market_analytics():
+    """Market-wide aggregates: total market cap and volume, dominance, weighted 24h change"""
+    try:
+        market_data = snapshot_cache.get('market_prices')
+        
+        if not market_data:
+            return jsonify({
+                'error': 'No market data available',
+                'timestamp': datetime.now(timezone.utc).isoformat()
+            }), 404
+        
+        # Computed once per snapshot (by the collector, or here on a miss)
+        return response_cache.respond(request, body_name('market-analytics'), market_data,
+                                      lambda: market_analytics(market_data))
+    
+    except Exception as e:
+        logger.error(f"Error getting market analytics: {e}")
+        return jsonify({
+            'error': str(e),
+            'timestamp': datetime.now(timezone.utc).isoformat()
+        }), 500
+
+@app.route('/api/data/analytics/movers', methods=['GET'])
+def get_market_movers():
+    """Biggest 24h gainers and losers"""
+    try:
+        limit = request.args.get('limit', 20, type=int)
+        market_data = snapshot_cache.get('market_prices')
+        
+        if not market_data:
+            return jsonify({
+                'error': 'No market data available',
+                'timestamp': datetime.now(timezone.utc).isoformat()
+            }), 404
+        
+        return response_cache.respond(request, body_name('market-movers', limit), market_data,
+                                      lambda: market_movers(market_data, limit))
+    
+    except Exception as e:
+        logger.error(f"Error getting market movers: {e}")
+        return jsonify({
+            'error': str(e),
+            'timestamp': datetime.now(timezone.utc).isoformat()
+        }), 500
+
 @app.route('/api/data/search', methods=['GET'])
 def search_coins():
     """Search for coins by name or symbol"""
     try:
         query = request.args.get('q', '').strip()
+        limit = request.args.get('limit', None, type=int)
+        fuzzy = request.args.get('fuzzy', 'false').lower() == 'true'
         
         if not query:
             return jsonify({
@@ -239,7 +447,7 @@ def search_coins():
                 'timestamp': datetime.now(timezone.utc).isoformat()
             }), 400
         
-        market_data = redis_client.get_data('market_prices')
+        market_data = snapshot_cache.get('market_prices')
         
         if not market_data:
             return jsonify({
@@ -247,15 +455,8 @@ def search_coins():
                 'timestamp': datetime.now(timezone.utc).isoformat()
             }), 404
         
-        data = market_data.get('data', [])
-        query_lower = query.lower()
-        
-        # Search by name or symbol
-        results = []
-        for coin in data:
-            if (query_lower in coin['name'].lower() or 
-                query_lower in coin['symbol'].lower()):
-                results.append(coin)
+        # Search by name or symbol through the snapshot's search index
+        results = market_data.search(query, limit=limit, fuzzy=fuzzy)
         
         return jsonify({
             'data': results,
@@ -271,6 +472,60 @@ def search_coins():
             'timestamp': datetime.now(timezone.utc).isoformat()
         }), 500
 
+def _parse_time(value: Optional[str], default: int) -> int:
+    """Epoch seconds from a unix timestamp or an ISO 8601 string"""
+    if not value:
+        return default
+    if value.isdigit():
+        return int(value)
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return int(parsed.timestamp())
+
+@app.route('/api/data/history/<symbol>', methods=['GET'])
+def get_history(symbol):
+    """Price/market cap/volume/APY history from the best fitting resolution tier"""
+    try:
+        symbol = symbol.upper()
+        metric = request.args.get('metric', 'price')
+        resolution = request.args.get('resolution', None)
+        
+        if metric not in METRICS or (resolution and resolution not in {tier for tier, _, _ in TIERS}):
+            return jsonify({
+                'error': f'Unknown metric or resolution, use metric={"|".join(sorted(METRICS))}',
+                'timestamp': datetime.now(timezone.utc).isoformat()
+            }), 400
+        
+        try:
+            end = _parse_time(request.args.get('end'), int(datetime.now(timezone.utc).timestamp()))
+            start = _parse_time(request.args.get('start'), end - 86400)
+        except ValueError:
+            return jsonify({
+                'error': 'start and end must be unix timestamps or ISO 8601 dates',
+                'timestamp': datetime.now(timezone.utc).isoformat()
+            }), 400
+        
+        resolution, points = history_store.query(symbol, metric, start, end, resolution)
+        
+        return jsonify({
+            'symbol': symbol,
+            'metric': metric,
+            'resolution': resolution,
+            'start': datetime.fromtimestamp(start, timezone.utc).isoformat(),
+            'end': datetime.fromtimestamp(end, timezone.utc).isoformat(),
+            'data': points,
+            'count': len(points),
+            'timestamp': datetime.now(timezone.utc).isoformat()
+        })
+    
+    except Exception as e:
+        logger.error(f"Error getting history for {symbol}: {e}")
+        return jsonify({
+            'error': str(e),
+            'timestamp': datetime.now(timezone.utc).isoformat()
+        }), 500
+
 if __name__ == '__main__':
     # Create logs directory if it doesn't exist
     os.makedirs('logs', exist_ok=True)
@@ -278,12 +533,17 @@ if __name__ == '__main__':
     logger.info("Starting Universal Data API on 0.0.0.0:5000")
     print("Available endpoints:")
     print("  GET /api/data/health - Health check")
-    print("  GET /api/data/market-prices - Market prices")
+    print("  GET /api/data/market-prices?since=<version> - Market prices (changes only with since)")
     print("  GET /api/data/coin/<symbol> - Specific coin data")
+    print("  GET /api/data/coins?symbols=<a,b>&ids=<x,y> - Batched coin data")
     print("  GET /api/data/staking-data - Staking data")
     print("  GET /api/data/top-staking - Top staking opportunities")
+    print("  GET /api/data/top-coins?by=<market_cap|volume|change_24h>&order=<desc|asc> - Top coins")
     print("  GET /api/data/market-summary - Market summary")
-    print("  GET /api/data/search?q=<query> - Search coins")
+    print("  GET /api/data/analytics - Market cap, dominance and weighted change")
+    print("  GET /api/data/analytics/movers?limit=<n> - Top gainers and losers")
+    print("  GET /api/data/history/<symbol>?metric=<price|market_cap|volume|apy>&start=&end= - History")
+    print("  GET /api/data/search?q=<query>&limit=<n>&fuzzy=true - Search coins")
     
     app.run(
         host='0.0.0.0',
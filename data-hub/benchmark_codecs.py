@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Benchmark the Redis payload codecs: encode/decode time and stored bytes
+
+Uses a synthetic market_prices snapshot by default, or a live snapshot with --key.
+"""
+import argparse
+import json
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# Add the data-hub directory to Python path
+data_hub_dir = Path(__file__).parent
+sys.path.insert(0, str(data_hub_dir))
+
+from utils.codecs import CODECS, PayloadSerializer
+
+def synthetic_snapshot(coins: int) -> dict:
+    """A market_prices-like payload with realistic field types"""
+    rng = random.Random(42)
+    data = []
+    for rank in range(1, coins + 1):
+        price = 10 ** rng.uniform(-4, 5)
+        data.append({
+            'id': f"coin-{rank}",
+            'symbol': f"C{rank}",
+            'name': f"Coin {rank}",
+            'price': price,
+            'market_cap': price * rng.uniform(1e6, 1e9),
+            'market_cap_rank': rank,
+            'volume_24h': price * rng.uniform(1e4, 1e8),
+            'price_change_1h': rng.uniform(-5, 5),
+            'price_change_24h': rng.uniform(-20, 20),
+            'price_change_7d': rng.uniform(-40, 40),
+            'image': f"https://assets.coingecko.com/coins/images/{rank}/large/coin.png",
+            'last_updated': '2024-01-01T00:00:00+00:00'
+        })
+    return {'data': data, 'timestamp': '2024-01-01T00:00:00+00:00', 'source': 'coingecko', 'version': 1}
+
+def timed(func, arg, runs: int) -> float:
+    """Median seconds per call"""
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        func(arg)
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples)
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark Redis payload codecs')
+    parser.add_argument('--coins', type=int, default=250, help='coins in the synthetic snapshot (default: 250)')
+    parser.add_argument('--key', help='benchmark the snapshot stored under this Redis key instead')
+    parser.add_argument('--runs', type=int, default=50)
+    parser.add_argument('--threshold', type=int, default=4096, help='compression threshold in bytes')
+    args = parser.parse_args()
+
+    if args.key:
+        from utils.storage import storage
+        payload = storage.get_data(args.key)
+        if payload is None:
+            print(f"No data under {args.key}")
+            sys.exit(1)
+    else:
+        payload = synthetic_snapshot(args.coins)
+
+    # Untagged json.dumps is what set_data stored before codecs existed
+    rows = [('json (untagged)', lambda value: json.dumps(value).encode('utf-8'), PayloadSerializer.loads)]
+    for name in CODECS:
+        for threshold in (0, args.threshold):
+            serializer = PayloadSerializer(name, threshold)
+            rows.append((f"{name}+zlib" if threshold else name, serializer.dumps, serializer.loads))
+
+    print(f"{'codec':<20}{'bytes':>10}{'encode ms':>12}{'decode ms':>12}")
+    for label, dumps, loads in rows:
+        encoded = dumps(payload)
+        print(f"{label:<20}{len(encoded):>10}"
+              f"{timed(dumps, payload, args.runs) * 1000:>12.3f}"
+              f"{timed(loads, encoded, args.runs) * 1000:>12.3f}")
+
+if __name__ == '__main__':
+    main()
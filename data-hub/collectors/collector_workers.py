@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Queue-based collection: one scheduler, many workers
+
+Every process runs a scheduler candidate and a pool of worker processes. Leader
+election makes sure only one scheduler enqueues jobs; the job queue's dedupe key
+makes sure a source is never fetched by two workers at the same time. Start this
+on several hosts against the same Redis to spread collection over all of them.
+
+REDIS_URL=memory:// runs everything in one process (workers as threads) on an
+in-memory Redis stand-in, which is what tests use.
+"""
+import argparse
+import logging
+import multiprocessing
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+# Add the data-hub directory to Python path
+data_hub_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(data_hub_dir))
+
+from utils.redis_client import redis_client
+from utils.job_queue import JobQueue, LeaderElection
+from utils.scheduler import Scheduler
+from config.settings import Config
+
+logger = logging.getLogger(__name__)
+
+def _job_handlers() -> Dict[str, Callable[[], Optional[Dict]]]:
+    """Collectors are created per worker process, after the fork"""
+    from collectors.market_data_collector import MarketDataCollector
+    from collectors.staking_data_collector import StakingDataCollector
+
+    market = MarketDataCollector()
+    staking = StakingDataCollector()
+    handlers = {key: (lambda key=key: market.collect_source(key)) for key in market.SOURCES}
+    handlers['market_summary'] = market.collect_summary
+    handlers['staking_details'] = staking.collect_staking_data
+    return handlers
+
+def _complete(queue: JobQueue, job: Dict, success: bool, attempts: int = 3):
+    """Report a finished job, retrying briefly while Redis is unavailable.
+
+    If every attempt fails the job's dedupe key still expires after JOB_DEDUPE_TTL
+    and purge_stale drops its processing entry, so the worker just moves on.
+    """
+    for attempt in range(1, attempts + 1):
+        try:
+            queue.complete(job, success)
+            return
+        except Exception as e:
+            logger.error(f"Error completing job {job['name']} (attempt {attempt}/{attempts}): {e}")
+            if attempt < attempts:
+                time.sleep(attempt)
+
+def run_worker(stop: threading.Event = None):
+    """Consume jobs until stop is set"""
+    queue = JobQueue(redis_client.client, Config.JOB_QUEUE_KEY, Config.JOB_DEDUPE_TTL)
+    handlers = _job_handlers()
+
+    while stop is None or not stop.is_set():
+        try:
+            job = queue.reserve(timeout=1)
+        except Exception as e:
+            logger.error(f"Error reserving job: {e}")
+            time.sleep(5)
+            continue
+        if job is None:
+            continue
+
+        started = time.time()
+        success = False
+        try:
+            success = handlers[job['name']]() is not None
+            logger.info(f"Job {job['name']} {'done' if success else 'returned no data'} "
+                        f"in {time.time() - started:.1f}s")
+        except Exception as e:
+            logger.error(f"Job {job['name']} failed: {e}")
+        finally:
+            _complete(queue, job, success)
+
+def run_scheduler(stop: threading.Event = None):
+    """Enqueue due jobs while this process holds the scheduler leadership"""
+    queue = JobQueue(redis_client.client, Config.JOB_QUEUE_KEY, Config.JOB_DEDUPE_TTL)
+    leader = LeaderElection(redis_client.client, f"{Config.JOB_QUEUE_KEY}:leader", Config.LEADER_TTL)
+    scheduler = Scheduler(Config.SOURCE_INTERVALS, Config.SCHEDULE_JITTER, Config.BACKOFF_BASE, Config.BACKOFF_MAX)
+    was_leader = False
+
+    try:
+        while stop is None or not stop.is_set():
+            is_leader = leader.ensure()
+            if is_leader != was_leader:
+                logger.info(f"Scheduler {leader.identity} {'is now' if is_leader else 'is no longer'} leader")
+                was_leader = is_leader
+
+            if is_leader:
+                for name, success in queue.pop_results().items():
+                    if name in scheduler.sources:
+                        scheduler.record(name, success)
+                scheduler.expire_running(Config.JOB_DEDUPE_TTL)
+                
+                for name in scheduler.due():
+                    # A job that is still queued from an earlier leader counts as running too
+                    if not queue.enqueue(name):
+                        logger.debug(f"Job {name} still pending")
+                    scheduler.start(name)
+                queue.purge_stale()
+
+            time.sleep(1)
+    finally:
+        leader.release()
+
+def main():
+    parser = argparse.ArgumentParser(description='Queue-based data collection')
+    parser.add_argument('--workers', type=int, default=Config.COLLECTOR_WORKERS,
+                        help='number of worker processes (default: COLLECTOR_WORKERS)')
+    parser.add_argument('--no-scheduler', action='store_true', help='only run workers on this host')
+    args = parser.parse_args()
+
+    if not redis_client.client:
+        logger.error("The job queue needs Redis (or REDIS_URL=memory://)")
+        sys.exit(1)
+
+    stop = threading.Event()
+    in_memory = redis_client.in_memory
+    if in_memory:
+        # The in-memory stand-in is not shared between processes
+        workers = [threading.Thread(target=run_worker, args=(stop,), daemon=True) for _ in range(args.workers)]
+    else:
+        workers = [multiprocessing.Process(target=run_worker, daemon=True) for _ in range(args.workers)]
+    for worker in workers:
+        worker.start()
+    logger.info(f"Started {len(workers)} collector workers")
+
+    try:
+        if args.no_scheduler:
+            for worker in workers:
+                worker.join()
+        else:
+            run_scheduler(stop)
+    except KeyboardInterrupt:
+        logger.info("Collector workers stopped by user")
+    finally:
+        stop.set()
+        if not in_memory:
+            for worker in workers:
+                worker.terminate()
+
+if __name__ == '__main__':
+    # Create logs directory if it doesn't exist
+    os.makedirs('logs', exist_ok=True)
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(processName)s - %(name)s - %(levelname)s - %(message)s',
+        handlers=[
+            logging.FileHandler('logs/collector_workers.log'),
+            logging.StreamHandler()
+        ]
+    )
+
+    main()
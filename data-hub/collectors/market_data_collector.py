@@ -1,12 +1,50 @@
+import asyncio
+import aiohttp
+import json
+import math
 import requests
 import time
 import logging
 from datetime import datetime, timezone
-from typing import Dict, List, Optional
-from utils.redis_client import redis_client
+from functools import partial
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from utils.storage import storage
+from utils.storage_backend import SYMBOL_LAYOUTS, SymbolRecords, symbol_members_key
+from utils.rate_limiter import RateLimiter
+from utils.scheduler import Scheduler
+from utils.http_cache import UpstreamCache
+from utils.stream_json import parse_head
+from utils.views import attach_views
+from utils.prerender import prerender_bodies
+from utils.delta import field_diff
+from utils.history_store import history_store, HISTORY_METRICS
+from utils.mapped_snapshot import MAPPED_KEYS, mapped_snapshots
 from config.settings import Config
 
+class CycleBatch(dict):
+    """Writes of one collection cycle for _write_batch: snapshot key -> (result, delta).
+    
+    Paginated ingestion also puts its page snapshots here with their own TTLs and merges
+    the coins of every page into symbol_records, so they switch over with the cycle.
+    """
+    
+    def __init__(self):
+        super().__init__()
+        self.ttls: Dict[str, int] = {}
+        self.symbol_records: Dict[str, SymbolRecords] = {}
+    
+    def merge_symbol_records(self, key: str, records: List[Dict], meta: Dict, ttl: int):
+        """Add records to the (merging, not replacing) symbol records of key"""
+        current = self.symbol_records.get(key)
+        merged = (current.records if current else []) + records
+        # Pages finish in any order; the best ranked coin must come first to claim its symbol
+        merged.sort(key=lambda record: record.get('market_cap_rank') or float('inf'))
+        self.symbol_records[key] = SymbolRecords(merged, meta, ttl, replace=False)
+
 class MarketDataCollector:
+    # Independently collectable snapshot keys
+    SOURCES = ('market_prices', 'staking_data', 'defi_data')
+    
     def __init__(self):
         self.logger = logging.getLogger(__name__)
         self.session = requests.Session()
@@ -14,63 +52,126 @@ class MarketDataCollector:
             'User-Agent': 'CryptoWealth-DataHub/1.0'
         })
         
-        # Rate limiting
-        self.last_request_times = {}
+        # Rate limiting (token buckets shared with the other collectors through Redis, if used)
         self.rate_limits = {
             'coingecko': Config.COINGECKO_RATE_LIMIT,
             'stakingrewards': Config.STAKINGREWARDS_RATE_LIMIT,
             'defillama': Config.DEFILLAMA_RATE_LIMIT,
             'coinmarketcap': Config.COINMARKETCAP_RATE_LIMIT
         }
-    
-    def _rate_limit_check(self, source: str) -> bool:
-        """Check if we can make a request to the source"""
-        current_time = time.time()
-        if source not in self.last_request_times:
-            self.last_request_times[source] = []
+        self.rate_limiter = RateLimiter(self.rate_limits, shared=Config.STORAGE_BACKEND == 'redis')
         
-        # Remove requests older than 1 minute
-        self.last_request_times[source] = [
-            req_time for req_time in self.last_request_times[source]
-            if current_time - req_time < 60
-        ]
+        # Upstream responses with their ETag/Last-Modified, kept on disk across restarts
+        self.http_cache = UpstreamCache(Config.HTTP_CACHE_DIR)
+        # Per snapshot key: last stored result and the storage keys it wrote
+        self._stored: Dict[str, Dict] = {}
         
-        # Check if we're under the rate limit
-        if len(self.last_request_times[source]) < self.rate_limits[source]:
-            self.last_request_times[source].append(current_time)
-            return True
+        # Paginated ingestion state: ids per page, which page each coin was last seen on
+        self._page_state: Dict[int, Dict] = {}
+        self._coin_pages: Dict[str, int] = {}
+        self._dirty_pages = set()
+        self._symbol_owners: Dict[str, Tuple[float, str]] = {}
+        self._last_page = Config.COINGECKO_MAX_PAGES
         
-        return False
+        # (version, coins by id) of the last market_prices snapshot, the base for its delta
+        self._previous_prices: Optional[Tuple[Optional[int], Dict[str, Dict]]] = None
     
-    def _make_request(self, url: str, source: str, params: Dict = None) -> Optional[Dict]:
-        """Make a rate-limited request"""
-        if not self._rate_limit_check(source):
+    def _make_request(self, url: str, source: str, params: Dict = None,
+                      parse: Callable[[bytes], Any] = json.loads) -> Optional[Dict]:
+        """Make a rate-limited, conditional request"""
+        cached = self.http_cache.get(url, params)
+        if cached is not None and cached.is_fresh():
+            return parse(cached.body)
+        
+        if not self.rate_limiter.acquire(source, timeout=Config.RATE_LIMIT_MAX_WAIT):
             self.logger.warning(f"Rate limit exceeded for {source}")
-            return None
+            return parse(cached.body) if cached is not None else None
         
         try:
-            response = self.session.get(url, params=params, timeout=30)
+            response = self.session.get(url, params=params, timeout=30,
+                                        headers=self.http_cache.conditional_headers(cached))
+            if response.status_code == 304 and cached is not None:
+                return parse(self.http_cache.revalidate(url, params, response.headers).body)
             response.raise_for_status()
-            return response.json()
+            return parse(self.http_cache.store(url, params, response.headers, response.content)[0].body)
         except requests.exceptions.RequestException as e:
             self.logger.error(f"Request failed for {source}: {e}")
             return None
     
-    def collect_coingecko_data(self) -> Optional[Dict]:
-        """Collect market data from CoinGecko"""
+    async def _fetch_async(self, http: aiohttp.ClientSession, url: str, source: str,
+                           params: Dict = None, parse: Callable[[bytes], Any] = json.loads) -> Tuple[Optional[Any], bool]:
+        """Rate-limited, conditional request on the shared async connection pool.
+        
+        Returns (data, changed): changed is False when the upstream content is the same
+        as last time (fresh cache hit, 304 or an identical body).
+        """
+        cached = self.http_cache.get(url, params)
+        if cached is not None and cached.is_fresh():
+            return parse(cached.body), False
+        
+        if not await self.rate_limiter.acquire_async(source, timeout=Config.RATE_LIMIT_MAX_WAIT):
+            self.logger.warning(f"Rate limit exceeded for {source}")
+            return (parse(cached.body), False) if cached is not None else (None, True)
+        
+        async with self._source_semaphores[source]:
+            try:
+                async with http.get(url, params=params,
+                                    headers=self.http_cache.conditional_headers(cached)) as response:
+                    if response.status == 304 and cached is not None:
+                        return parse(self.http_cache.revalidate(url, params, response.headers).body), False
+                    response.raise_for_status()
+                    body = await response.read()
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                self.logger.error(f"Request failed for {source}: {e}")
+                return None, True
+        
+        entry, changed = self.http_cache.store(url, params, response.headers, body)
+        return parse(entry.body), changed
+    
+    async def _make_request_async(self, http: aiohttp.ClientSession, url: str, source: str,
+                                  params: Dict = None) -> Optional[Dict]:
+        """Make a rate-limited, conditional request on the shared async connection pool"""
+        return (await self._fetch_async(http, url, source, params))[0]
+    
+    def _coingecko_request(self, page: int = 1, per_page: int = 200) -> Tuple[str, Dict]:
         url = f"{Config.COINGECKO_API_URL}/coins/markets"
         params = {
             'vs_currency': 'usd',
             'order': 'market_cap_desc',
-            'per_page': 200,
-            'page': 1,
-            'sparkline': False,
+            'per_page': per_page,
+            'page': page,
+            'sparkline': 'false',
             'price_change_percentage': '1h,24h,7d'
         }
-        
-        data = self._make_request(url, 'coingecko', params)
+        return url, params
+    
+    def _staking_request(self) -> Tuple[str, Dict]:
+        url = f"{Config.COINGECKO_API_URL}/coins/markets"
+        params = {
+            'vs_currency': 'usd',
+            'category': 'staking',
+            'order': 'market_cap_desc',
+            'per_page': 100
+        }
+        return url, params
+    
+    def _defi_request(self) -> Tuple[str, Optional[Dict]]:
+        return f"{Config.DEFILLAMA_API_URL}/protocols", None
+    
+    # /protocols is several MB; only the head of the list and these fields are used
+    _parse_protocols = staticmethod(partial(parse_head, limit=Config.DEFI_PROTOCOL_LIMIT,
+                                            fields=('name', 'tvl', 'change_1d', 'category', 'chains')))
+    
+    def collect_coingecko_data(self) -> Optional[Dict]:
+        """Collect market data from CoinGecko"""
+        url, params = self._coingecko_request()
+        return self._process_coingecko_data(self._make_request(url, 'coingecko', params))
+    
+    def _process_coingecko_data(self, data: Optional[List[Dict]]) -> Optional[Dict]:
+        """Structure a raw CoinGecko /coins/markets response"""
         if data:
-            # Process and structure the data
+            # One collection time for the whole response instead of a clock read per coin
+            timestamp = datetime.now(timezone.utc).isoformat()
             processed_data = []
             for coin in data:
                 processed_coin = {
@@ -84,13 +185,13 @@ class MarketDataCollector:
                     'price_change_1h': coin.get('price_change_percentage_1h_in_currency', 0),
                     'price_change_24h': coin.get('price_change_percentage_24h_in_currency', 0),
                     'price_change_7d': coin.get('price_change_percentage_7d_in_currency', 0),
-                    'last_updated': datetime.now(timezone.utc).isoformat()
+                    'last_updated': timestamp
                 }
                 processed_data.append(processed_coin)
             
             return {
                 'source': 'coingecko',
-                'timestamp': datetime.now(timezone.utc).isoformat(),
+                'timestamp': timestamp,
                 'data': processed_data
             }
         
@@ -98,18 +199,14 @@ class MarketDataCollector:
     
     def collect_staking_data(self) -> Optional[Dict]:
         """Collect staking data from various sources"""
-        staking_data = []
-        
         # Get staking data from CoinGecko
-        url = f"{Config.COINGECKO_API_URL}/coins/markets"
-        params = {
-            'vs_currency': 'usd',
-            'category': 'staking',
-            'order': 'market_cap_desc',
-            'per_page': 100
-        }
-        
-        data = self._make_request(url, 'coingecko', params)
+        url, params = self._staking_request()
+        return self._process_staking_data(self._make_request(url, 'coingecko', params))
+    
+    def _process_staking_data(self, data: Optional[List[Dict]]) -> Optional[Dict]:
+        """Structure a raw CoinGecko staking category response"""
+        staking_data = []
+        timestamp = datetime.now(timezone.utc).isoformat()
         if data:
             for coin in data:
                 staking_info = {
@@ -118,13 +215,13 @@ class MarketDataCollector:
                     'current_price': coin['current_price'],
                     'market_cap': coin['market_cap'],
                     'staking_apy': self._get_staking_apy(coin['symbol']),
-                    'last_updated': datetime.now(timezone.utc).isoformat()
+                    'last_updated': timestamp
                 }
                 staking_data.append(staking_info)
         
         return {
             'source': 'staking_data',
-            'timestamp': datetime.now(timezone.utc).isoformat(),
+            'timestamp': timestamp,
             'data': staking_data
         }
     
@@ -145,33 +242,391 @@ class MarketDataCollector:
     
     def collect_defi_data(self) -> Optional[Dict]:
         """Collect DeFi protocol data"""
-        url = f"{Config.DEFILLAMA_API_URL}/protocols"
-        
-        data = self._make_request(url, 'defillama')
+        url, params = self._defi_request()
+        return self._process_defi_data(self._make_request(url, 'defillama', params, self._parse_protocols))
+    
+    def _process_defi_data(self, data: Optional[List[Dict]]) -> Optional[Dict]:
+        """Structure a raw DefiLlama /protocols response"""
         if data:
             # Process DeFi data
+            timestamp = datetime.now(timezone.utc).isoformat()
             defi_data = []
-            for protocol in data[:50]:  # Top 50 protocols
+            for protocol in data[:Config.DEFI_PROTOCOL_LIMIT]:  # Top protocols
                 defi_info = {
                     'name': protocol['name'],
                     'tvl': protocol['tvl'],
                     'tvl_change_24h': protocol.get('change_1d', 0),
                     'category': protocol.get('category', 'Unknown'),
                     'chains': protocol.get('chains', []),
-                    'last_updated': datetime.now(timezone.utc).isoformat()
+                    'last_updated': timestamp
                 }
                 defi_data.append(defi_info)
             
             return {
                 'source': 'defillama',
-                'timestamp': datetime.now(timezone.utc).isoformat(),
+                'timestamp': timestamp,
                 'data': defi_data
             }
         
         return None
     
-    def collect_all_data(self) -> Dict:
-        """Collect all market data"""
+    async def _publish_bodies(self, key: str, payload: Dict) -> List[str]:
+        """Pre-render and compress the API response bodies for payload.
+        
+        Stored under the payload's version and written before the snapshot itself, so an
+        API worker that sees the new version finds them, while one still on the previous
+        version keeps reading that version's bodies. Returns the stored body names.
+        """
+        bodies = await asyncio.to_thread(prerender_bodies, key, payload, Config.PRERENDER_LIMITS)
+        await asyncio.to_thread(storage.set_bodies, bodies)
+        return list(bodies)
+    
+    def _stored_keys(self, key: str, result: Dict, body_names: List[str]) -> List[str]:
+        """Every storage key written for a snapshot, so an unchanged one can be kept alive"""
+        keys = [key] + [f"body:{name}" for name in body_names]
+        if key in SYMBOL_LAYOUTS:
+            prefix, meta_key, indexes = SYMBOL_LAYOUTS[key]
+            keys += [meta_key, symbol_members_key(key), *indexes]
+            keys += list({f"{prefix}:{record['symbol']}" for record in result['data']})
+        return keys
+    
+    @staticmethod
+    def _next_version(current: Optional[int]) -> int:
+        """Version for a new snapshot; published bodies are stored under it"""
+        return (current or 0) + 1
+    
+    async def _version_market_prices(self, result: Dict) -> Optional[Dict]:
+        """Number a new market_prices snapshot and diff it against the previous one.
+        
+        Returns the delta to store next to it, or None when the previous snapshot is
+        unknown (first cycle, or it expired).
+        """
+        current = await asyncio.to_thread(storage.get_version, 'market_prices')
+        result['version'] = self._next_version(current)
+        coins = {coin['id']: coin for coin in result['data']}
+        previous, self._previous_prices = self._previous_prices, (result['version'], coins)
+        
+        if current is not None and (previous is None or previous[0] != current):
+            # Another process (e.g. a queue worker) wrote the previous snapshot
+            stored = await asyncio.to_thread(storage.get_data, 'market_prices')
+            if stored and stored.get('version') == current:
+                previous = (current, {coin['id']: coin for coin in stored['data']})
+        
+        if previous is None or previous[0] != current:
+            return None
+        
+        delta = field_diff(previous[1], coins)
+        delta.update({'version': result['version'], 'base': current, 'timestamp': result['timestamp']})
+        return delta
+    
+    async def _collect_source(self, http: aiohttp.ClientSession, key: str, source: str,
+                              request: Tuple[str, Optional[Dict]], process,
+                              parse: Callable[[bytes], Any] = json.loads,
+                              batch: Optional[CycleBatch] = None) -> Optional[Dict]:
+        """Fetch one source, process it and store it as soon as it arrives.
+        
+        With a batch the snapshot itself is left in batch (key -> (result, delta)) for
+        _write_batch, which also writes its symbol hashes; bodies and history are
+        written right away.
+        """
+        url, params = request
+        data, changed = await self._fetch_async(http, url, source, params, parse)
+        stored = self._stored.get(key)
+        if not changed and stored is not None:
+            # Same upstream content: keep the stored snapshot alive instead of rewriting it
+            await asyncio.to_thread(storage.expire_keys, stored['keys'], 300)
+            if mapped_snapshots is not None and key in MAPPED_KEYS:
+                mapped_snapshots.touch(key)
+            self.logger.info(f"{key} unchanged upstream, skipped processing")
+            return stored['result']
+        
+        result = process(data)
+        if result:
+            attach_views(key, result)
+            if key == 'market_prices':
+                delta = await self._version_market_prices(result)
+            else:
+                result['version'] = self._next_version(await asyncio.to_thread(storage.get_version, key))
+                delta = None
+            body_names = await self._publish_bodies(key, result)
+            if batch is None:
+                if await asyncio.to_thread(storage.set_data, key, result, 300, delta, Config.DELTA_TTL):
+                    await asyncio.to_thread(self._publish_mapped, {key: result})
+            else:
+                batch[key] = (result, delta)
+            if key in SYMBOL_LAYOUTS and batch is None:
+                meta = {'source': result['source'], 'timestamp': result['timestamp']}
+                await asyncio.to_thread(storage.set_symbol_records, key, result['data'], meta=meta)
+            if key in HISTORY_METRICS:
+                await asyncio.to_thread(history_store.append, key, result)
+            self._stored[key] = {'result': result, 'keys': self._stored_keys(key, result, body_names)}
+            self.logger.info(f"Collected {len(result['data'])} items for {key}")
+        return result
+    
+    def _select_pages(self) -> List[int]:
+        """Pick the pages to refetch this cycle, within the CoinGecko request budget"""
+        # Reserve the tokens the staking fetch and the staking collector spend in the same interval
+        interval = Config.SOURCE_INTERVALS['market_prices']
+        reserved = sum(math.ceil(interval / Config.SOURCE_INTERVALS[key])
+                       for key in ('staking_data', 'staking_details'))
+        budget = max(1, int(Config.COINGECKO_RATE_LIMIT * interval / 60) - reserved)
+        now = time.time()
+        last_page = min(self._last_page, Config.COINGECKO_MAX_PAGES)
+        
+        hot = list(range(1, min(Config.COINGECKO_HOT_PAGES, last_page) + 1))
+        dirty = sorted(page for page in self._dirty_pages if page <= last_page)
+        stale = sorted(
+            (page for page in range(1, last_page + 1)
+             if now - self._page_state.get(page, {}).get('fetched_at', 0) >= Config.COINGECKO_PAGE_REFRESH),
+            key=lambda page: self._page_state.get(page, {}).get('fetched_at', 0)
+        )
+        
+        selected = []
+        for page in hot + dirty + stale:
+            if page not in selected:
+                selected.append(page)
+        return selected[:budget]
+    
+    def _update_page_state(self, page: int, coin_ids: List[str]):
+        """Record a fetched page and mark pages whose ranks have shifted as dirty"""
+        self._dirty_pages.discard(page)
+        previous = self._page_state.get(page)
+        
+        # Coins moved across the page boundaries, so the neighbours are out of date
+        if previous and previous['ids'] != tuple(coin_ids):
+            for neighbour in (page - 1, page + 1):
+                if 1 <= neighbour <= self._last_page:
+                    self._dirty_pages.add(neighbour)
+        
+        for coin_id in coin_ids:
+            old_page = self._coin_pages.get(coin_id)
+            if old_page is not None and old_page != page:
+                self._dirty_pages.add(old_page)
+            self._coin_pages[coin_id] = page
+        
+        self._page_state[page] = {
+            'ids': tuple(coin_ids),
+            'fetched_at': time.time()
+        }
+        
+        # A short page is the end of the coin universe; a full last page means it grew
+        if len(coin_ids) < Config.COINGECKO_PER_PAGE:
+            self._last_page = page
+        elif page == self._last_page:
+            self._last_page = min(page + 1, Config.COINGECKO_MAX_PAGES)
+    
+    def _owned_records(self, records: List[Dict]) -> List[Dict]:
+        """Keep only the coins that own their symbol, i.e. the best ranked coin with it"""
+        owned = []
+        for coin in records:
+            rank = coin['market_cap_rank'] or float('inf')
+            owner = self._symbol_owners.get(coin['symbol'])
+            if owner is None or owner[1] == coin['id'] or rank < owner[0]:
+                self._symbol_owners[coin['symbol']] = (rank, coin['id'])
+                owned.append(coin)
+        return owned
+    
+    async def _collect_coingecko_page(self, http: aiohttp.ClientSession, page: int,
+                                      batch: Optional[CycleBatch] = None) -> Optional[Dict]:
+        """Fetch one CoinGecko markets page and store it as soon as it arrives, or add it to batch"""
+        url, params = self._coingecko_request(page=page, per_page=Config.COINGECKO_PER_PAGE)
+        data = await self._make_request_async(http, url, 'coingecko', params)
+        if data is None:
+            return None
+        
+        if not data:
+            self._last_page = min(self._last_page, page - 1)
+            return None
+        
+        result = self._process_coingecko_data(data)
+        result['page'] = page
+        if page == 1:
+            attach_views('market_prices', result)
+            delta = await self._version_market_prices(result)
+        # The head page doubles as the regular market_prices snapshot
+        if page == 1:
+            await self._publish_bodies('market_prices', result)
+        
+        page_key = f'market_prices:page:{page}'
+        meta = {'source': result['source'], 'timestamp': result['timestamp']}
+        owned = self._owned_records(result['data'])
+        if batch is None:
+            await asyncio.to_thread(storage.set_data, page_key, result, Config.COINGECKO_PAGE_TTL)
+            if page == 1 and await asyncio.to_thread(storage.set_data, 'market_prices', result, 300, delta,
+                                                     Config.DELTA_TTL):
+                await asyncio.to_thread(self._publish_mapped, {'market_prices': result})
+            await asyncio.to_thread(storage.set_symbol_records, 'market_prices',
+                                    owned, Config.COINGECKO_PAGE_TTL, False, meta)
+        else:
+            batch[page_key] = (result, None)
+            batch.ttls[page_key] = Config.COINGECKO_PAGE_TTL
+            if page == 1:
+                batch['market_prices'] = (result, delta)
+            batch.merge_symbol_records('market_prices', owned, meta, Config.COINGECKO_PAGE_TTL)
+        await asyncio.to_thread(history_store.append, 'market_prices', {**result, 'data': owned})
+        
+        self._update_page_state(page, [coin['id'] for coin in result['data']])
+        return result
+    
+    async def collect_coingecko_pages_async(self, http: aiohttp.ClientSession,
+                                            batch: Optional[CycleBatch] = None) -> Optional[Dict]:
+        """Incrementally ingest the full CoinGecko coin universe page by page.
+        
+        With a batch, pages, the head snapshot, their symbol records and the manifest are
+        written with the rest of the cycle by _write_batch.
+        """
+        pages = self._select_pages()
+        known = [page for page in pages if page in self._page_state]
+        results = dict(zip(known, await asyncio.gather(*(self._collect_coingecko_page(http, page, batch)
+                                                         for page in known))))
+        
+        # Pages never seen before are fetched in order, so the first short or empty page
+        # ends the scan instead of every page up to the budget spending a token
+        for page in sorted(page for page in pages if page not in self._page_state):
+            if page > self._last_page:
+                break
+            results[page] = await self._collect_coingecko_page(http, page, batch)
+        fetched = [page for page, result in results.items() if result]
+        
+        if not self._page_state:
+            return None
+        
+        manifest = {
+            'source': 'coingecko',
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+            'per_page': Config.COINGECKO_PER_PAGE,
+            'pages': {
+                str(page): {
+                    'count': len(state['ids']),
+                    'fetched_at': datetime.fromtimestamp(state['fetched_at'], timezone.utc).isoformat()
+                }
+                for page, state in sorted(self._page_state.items()) if page <= self._last_page
+            }
+        }
+        manifest['total_coins'] = sum(page['count'] for page in manifest['pages'].values())
+        if batch is None:
+            await asyncio.to_thread(storage.set_data, 'market_prices:pages', manifest, Config.COINGECKO_PAGE_TTL)
+        else:
+            batch['market_prices:pages'] = (manifest, None)
+            batch.ttls['market_prices:pages'] = Config.COINGECKO_PAGE_TTL
+        
+        self.logger.info(f"Refreshed {len(fetched)}/{len(results)} CoinGecko pages, "
+                         f"{manifest['total_coins']} coins tracked")
+        return manifest
+    
+    def _open_http(self) -> aiohttp.ClientSession:
+        """Shared async connection pool for one collection run"""
+        # Semaphores are bound to the running loop, so create them once per loop; runs that
+        # overlap on the scheduler's loop share them
+        loop = asyncio.get_running_loop()
+        if getattr(self, '_semaphore_loop', None) is not loop:
+            self._semaphore_loop = loop
+            self._source_semaphores = {
+                source: asyncio.Semaphore(Config.SOURCE_CONCURRENCY) for source in self.rate_limits
+            }
+        connector = aiohttp.TCPConnector(limit=Config.HTTP_POOL_SIZE)
+        timeout = aiohttp.ClientTimeout(total=Config.HTTP_TIMEOUT)
+        return aiohttp.ClientSession(connector=connector, timeout=timeout, headers=dict(self.session.headers))
+    
+    def _source_task(self, http: aiohttp.ClientSession, key: str, batch: Optional[CycleBatch] = None):
+        """Coroutine collecting and storing one of SOURCES"""
+        if key == 'market_prices':
+            if Config.COINGECKO_PAGINATED:
+                # Page 1 doubles as market_prices
+                return self.collect_coingecko_pages_async(http, batch)
+            return self._collect_source(http, 'market_prices', 'coingecko', self._coingecko_request(),
+                                        self._process_coingecko_data, batch=batch)
+        if key == 'staking_data':
+            return self._collect_source(http, 'staking_data', 'coingecko', self._staking_request(),
+                                        self._process_staking_data, batch=batch)
+        if key == 'defi_data':
+            return self._collect_source(http, 'defi_data', 'defillama', self._defi_request(),
+                                        self._process_defi_data, self._parse_protocols, batch)
+        raise ValueError(f"Unknown source {key}")
+    
+    def _write_batch(self, batch: CycleBatch):
+        """Store a cycle's snapshots and switch readers over to them atomically"""
+        if not batch:
+            return
+        deltas = {key: delta for key, (_, delta) in batch.items() if delta is not None}
+        # Symbol hashes switch over in the same write as the snapshots they were taken from
+        symbol_records = {
+            key: SymbolRecords(result['data'], {'source': result['source'], 'timestamp': result['timestamp']})
+            for key, (result, _) in batch.items() if key in SYMBOL_LAYOUTS
+        }
+        # Paginated ingestion merges every page's coins instead of keeping only the head page's
+        symbol_records.update(batch.symbol_records)
+        cycle = storage.set_data_batch({key: result for key, (result, _) in batch.items()},
+                                       deltas=deltas, delta_ttl=Config.DELTA_TTL, symbol_records=symbol_records,
+                                       ttls=batch.ttls)
+        if cycle:
+            self._publish_mapped({key: result for key, (result, _) in batch.items()})
+        for key in batch:
+            if cycle and key in self._stored:
+                # Unchanged runs refresh the TTL of the cycle key readers actually resolve
+                keys = [name for name in self._stored[key]['keys'] if not name.startswith(f"{key}@")]
+                self._stored[key]['keys'] = keys + [f"{key}@{cycle}"]
+    
+    def _publish_mapped(self, items: Dict[str, Dict]):
+        """Publish stored snapshots as mapped files for the API workers on this host"""
+        if mapped_snapshots is None:
+            return
+        for key, result in items.items():
+            if key in MAPPED_KEYS:
+                mapped_snapshots.publish(key, result)
+    
+    async def collect_source_async(self, key: str) -> Optional[Dict]:
+        """Collect a single source on its own connection pool"""
+        async with self._open_http() as http:
+            return await self._source_task(http, key)
+    
+    def collect_source(self, key: str) -> Optional[Dict]:
+        """Collect a single source (used by the queue workers)"""
+        return asyncio.run(self.collect_source_async(key))
+    
+    async def collect_sources_async(self, keys: List[str], batch: Optional[CycleBatch] = None) -> Dict[str, Any]:
+        """Collect several sources concurrently; a failing source does not affect the others"""
+        async with self._open_http() as http:
+            results = await asyncio.gather(*(self._source_task(http, key, batch) for key in keys),
+                                           return_exceptions=True)
+        return dict(zip(keys, results))
+    
+    async def _store_summary(self, timestamp: str, market_data: Optional[Dict], staking_data: Optional[Dict],
+                             defi_data: Optional[Dict], batch: Optional[CycleBatch] = None) -> Dict:
+        summary = {
+            'timestamp': timestamp,
+            'total_coins': market_data.get('total_coins', len(market_data.get('data', []))) if market_data else 0,
+            'total_staking': len(staking_data['data']) if staking_data else 0,
+            'total_defi': len(defi_data['data']) if defi_data else 0,
+            'status': 'success'
+        }
+        summary['version'] = self._next_version(await asyncio.to_thread(storage.get_version, 'market_summary'))
+        
+        await self._publish_bodies('market_summary', summary)
+        if batch is None:
+            await asyncio.to_thread(storage.set_data, 'market_summary', summary)
+        else:
+            batch['market_summary'] = (summary, None)
+        return summary
+    
+    def _summary_inputs(self, collected: Optional[Dict] = None) -> List[Optional[Dict]]:
+        """Snapshots for the summary: this run's results, the stored ones for the rest"""
+        collected = collected or {}
+        market_key = 'market_prices:pages' if Config.COINGECKO_PAGINATED else 'market_prices'
+        missing = [key for key in self.SOURCES if not isinstance(collected.get(key), dict)]
+        stored = storage.get_many_with_versions(
+            [market_key if key == 'market_prices' else key for key in missing])
+        return [
+            collected[key] if key not in missing else stored[market_key if key == 'market_prices' else key][0]
+            for key in self.SOURCES
+        ]
+    
+    def collect_summary(self) -> Dict:
+        """Rebuild market_summary from the snapshots currently in storage"""
+        return asyncio.run(self._store_summary(datetime.now(timezone.utc).isoformat(), *self._summary_inputs()))
+    
+    async def collect_all_data_async(self) -> Dict:
+        """Collect all market data concurrently over one shared connection pool"""
         self.logger.info("Starting data collection...")
         
         collected_data = {
@@ -181,55 +636,58 @@ class MarketDataCollector:
             'defi_data': None
         }
         
-        # Collect market prices
-        market_data = self.collect_coingecko_data()
-        if market_data:
-            collected_data['market_prices'] = market_data
-            redis_client.set_data('market_prices', market_data)
-            self.logger.info(f"Collected {len(market_data['data'])} market prices")
-        
-        # Collect staking data
-        staking_data = self.collect_staking_data()
-        if staking_data:
-            collected_data['staking_data'] = staking_data
-            redis_client.set_data('staking_data', staking_data)
-            self.logger.info(f"Collected {len(staking_data['data'])} staking opportunities")
-        
-        # Collect DeFi data
-        defi_data = self.collect_defi_data()
-        if defi_data:
-            collected_data['defi_data'] = defi_data
-            redis_client.set_data('defi_data', defi_data)
-            self.logger.info(f"Collected {len(defi_data['data'])} DeFi protocols")
+        # The cycle's snapshots are written together, readers never see half a cycle
+        batch = CycleBatch()
+        async with self._open_http() as http:
+            results = await asyncio.gather(*(self._source_task(http, key, batch) for key in self.SOURCES),
+                                           return_exceptions=True)
         
-        # Store summary data
-        summary = {
-            'timestamp': collected_data['timestamp'],
-            'total_coins': len(market_data['data']) if market_data else 0,
-            'total_staking': len(staking_data['data']) if staking_data else 0,
-            'total_defi': len(defi_data['data']) if defi_data else 0,
-            'status': 'success'
-        }
+        # A failing source does not cost the cycle the other sources and the summary
+        for key, result in zip(self.SOURCES, results):
+            if isinstance(result, Exception):
+                self.logger.error(f"Error collecting {key}: {result}")
+        market_data, staking_data, defi_data = (
+            None if isinstance(result, Exception) else result for result in results
+        )
+        
+        collected_data['market_prices'] = market_data
+        collected_data['staking_data'] = staking_data
+        collected_data['defi_data'] = defi_data
         
-        redis_client.set_data('market_summary', summary)
+        # Store summary data
+        await self._store_summary(collected_data['timestamp'], market_data, staking_data, defi_data, batch)
+        await asyncio.to_thread(self._write_batch, batch)
         
         self.logger.info("Data collection completed successfully")
         return collected_data
     
+    def collect_all_data(self) -> Dict:
+        """Collect all market data"""
+        return asyncio.run(self.collect_all_data_async())
+    
+    async def _run_due_async(self, due: List[str]) -> Dict[str, Any]:
+        batch = CycleBatch()
+        sources = [key for key in due if key in self.SOURCES]
+        results = await self.collect_sources_async(sources, batch) if sources else {}
+        if 'market_summary' in due:
+            inputs = await asyncio.to_thread(self._summary_inputs, results)
+            results['market_summary'] = await self._store_summary(
+                datetime.now(timezone.utc).isoformat(), *inputs, batch)
+        await asyncio.to_thread(self._write_batch, batch)
+        return results
+    
     def run_collection_loop(self):
-        """Run the data collection in a loop"""
-        self.logger.info(f"Starting data collection loop with {Config.COLLECTION_INTERVAL}s interval")
+        """Collect every source on its own wall-clock anchored schedule"""
+        intervals = {key: Config.SOURCE_INTERVALS[key] for key in self.SOURCES + ('market_summary',)}
+        scheduler = Scheduler(intervals, Config.SCHEDULE_JITTER, Config.BACKOFF_BASE, Config.BACKOFF_MAX)
+        self.logger.info("Starting data collection loop with intervals " +
+                         ', '.join(f"{key}={interval}s" for key, interval in intervals.items()))
         
-        while True:
-            try:
-                self.collect_all_data()
-                time.sleep(Config.COLLECTION_INTERVAL)
-            except KeyboardInterrupt:
-                self.logger.info("Data collection stopped by user")
-                break
-            except Exception as e:
-                self.logger.error(f"Error in collection loop: {e}")
-                time.sleep(60)  # Wait 1 minute before retrying
+        try:
+            # Every source runs as its own task on one loop, so a slow source never delays the others
+            asyncio.run(scheduler.run_forever_async(self._run_due_async))
+        except KeyboardInterrupt:
+            self.logger.info("Data collection stopped by user")
 
 if __name__ == "__main__":
     # Setup logging
@@ -3,50 +3,48 @@ import time
 import json
 import logging
 from datetime import datetime, timezone
+from functools import partial
 from typing import Dict, List, Optional
+import sys
+from pathlib import Path
+
+# Add the data-hub directory to Python path
+data_hub_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(data_hub_dir))
+
+from utils.rate_limiter import RateLimiter
+from utils.snapshot import Snapshot
+from utils.snapshot_cache import SnapshotCache
+from utils.storage_backend import StorageBackend, create_storage
 
 class SimpleDataCollector:
-    def __init__(self):
+    def __init__(self, storage: Optional[StorageBackend] = None):
         self.logger = logging.getLogger(__name__)
         self.session = requests.Session()
         self.session.headers.update({
             'User-Agent': 'CryptoWealth-DataHub/1.0'
         })
         
-        # In-memory cache (simplified)
-        self.cache = {}
+        # Local SQLite store (no Redis needed), shared by the collector and API processes
+        self.storage = storage or create_storage('sqlite')
+        self.cache = SnapshotCache(self.storage, builders={
+            'market_prices': partial(Snapshot, key='market_prices'),
+            'staking_data': partial(Snapshot, key='staking_data')
+        })
         self.cache_timeout = 300  # 5 minutes
+        self.rate_limit_max_wait = 30  # seconds to wait for a rate limit token
         
-        # Rate limiting
-        self.last_request_times = {}
+        # Rate limiting (in-process only, the simple setup runs without Redis)
         self.rate_limits = {
             'coingecko': 10,
             'stakingrewards': 10,
             'defillama': 10
         }
-    
-    def _rate_limit_check(self, source: str) -> bool:
-        """Check if we can make a request to the source"""
-        current_time = time.time()
-        if source not in self.last_request_times:
-            self.last_request_times[source] = []
-        
-        # Remove requests older than 1 minute
-        self.last_request_times[source] = [
-            req_time for req_time in self.last_request_times[source]
-            if current_time - req_time < 60
-        ]
-        
-        # Check if we're under the rate limit
-        if len(self.last_request_times[source]) < self.rate_limits[source]:
-            self.last_request_times[source].append(current_time)
-            return True
-        
-        return False
+        self.rate_limiter = RateLimiter(self.rate_limits)
     
     def _make_request(self, url: str, source: str, params: Dict = None) -> Optional[Dict]:
         """Make a rate-limited request"""
-        if not self._rate_limit_check(source):
+        if not self.rate_limiter.acquire(source, timeout=self.rate_limit_max_wait):
             self.logger.warning(f"Rate limit exceeded for {source}")
             return None
         
@@ -72,7 +70,8 @@ class SimpleDataCollector:
         
         data = self._make_request(url, 'coingecko', params)
         if data:
-            # Process and structure the data
+            # One collection time for the whole response instead of a clock read per coin
+            timestamp = datetime.now(timezone.utc).isoformat()
             processed_data = []
             for coin in data:
                 processed_coin = {
@@ -86,13 +85,13 @@ class SimpleDataCollector:
                     'price_change_1h': coin.get('price_change_percentage_1h_in_currency', 0),
                     'price_change_24h': coin.get('price_change_percentage_24h_in_currency', 0),
                     'price_change_7d': coin.get('price_change_percentage_7d_in_currency', 0),
-                    'last_updated': datetime.now(timezone.utc).isoformat()
+                    'last_updated': timestamp
                 }
                 processed_data.append(processed_coin)
             
             return {
                 'source': 'coingecko',
-                'timestamp': datetime.now(timezone.utc).isoformat(),
+                'timestamp': timestamp,
                 'data': processed_data
             }
         
@@ -101,6 +100,7 @@ class SimpleDataCollector:
     def collect_staking_data(self) -> Optional[Dict]:
         """Collect staking data (simplified)"""
         # Mock staking data for now
+        timestamp = datetime.now(timezone.utc).isoformat()
         staking_data = [
             {
                 'symbol': 'ETH',
@@ -108,7 +108,7 @@ class SimpleDataCollector:
                 'current_price': 2650,
                 'market_cap': 320000000000,
                 'staking_apy': 5.2,
-                'last_updated': datetime.now(timezone.utc).isoformat()
+                'last_updated': timestamp
             },
             {
                 'symbol': 'ADA',
@@ -116,7 +116,7 @@ class SimpleDataCollector:
                 'current_price': 0.485,
                 'market_cap': 17000000000,
                 'staking_apy': 4.8,
-                'last_updated': datetime.now(timezone.utc).isoformat()
+                'last_updated': timestamp
             },
             {
                 'symbol': 'SOL',
@@ -124,7 +124,7 @@ class SimpleDataCollector:
                 'current_price': 98.50,
                 'market_cap': 45000000000,
                 'staking_apy': 7.1,
-                'last_updated': datetime.now(timezone.utc).isoformat()
+                'last_updated': timestamp
             },
             {
                 'symbol': 'DOT',
@@ -132,13 +132,13 @@ class SimpleDataCollector:
                 'current_price': 7.25,
                 'market_cap': 9000000000,
                 'staking_apy': 12.5,
-                'last_updated': datetime.now(timezone.utc).isoformat()
+                'last_updated': timestamp
             }
         ]
         
         return {
             'source': 'staking_data',
-            'timestamp': datetime.now(timezone.utc).isoformat(),
+            'timestamp': timestamp,
             'data': staking_data
         }
     
@@ -156,20 +156,12 @@ class SimpleDataCollector:
         market_data = self.collect_coingecko_data()
         if market_data:
             collected_data['market_prices'] = market_data
-            self.cache['market_prices'] = {
-                'data': market_data,
-                'timestamp': time.time()
-            }
             self.logger.info(f"Collected {len(market_data['data'])} market prices")
         
         # Collect staking data
         staking_data = self.collect_staking_data()
         if staking_data:
             collected_data['staking_data'] = staking_data
-            self.cache['staking_data'] = {
-                'data': staking_data,
-                'timestamp': time.time()
-            }
             self.logger.info(f"Collected {len(staking_data['data'])} staking opportunities")
         
         # Store summary data
@@ -180,21 +172,19 @@ class SimpleDataCollector:
             'status': 'success'
         }
         
-        self.cache['market_summary'] = {
-            'data': summary,
-            'timestamp': time.time()
-        }
+        # One transaction, readers never see half a collection
+        items = {'market_prices': market_data, 'staking_data': staking_data, 'market_summary': summary}
+        self.storage.set_data_batch({key: value for key, value in items.items() if value},
+                                    ttl=self.cache_timeout)
+        for key in items:
+            self.cache.invalidate(key)
         
         self.logger.info("Data collection completed successfully")
         return collected_data
     
     def get_cached_data(self, key: str) -> Optional[Dict]:
-        """Get data from cache if not expired"""
-        if key in self.cache:
-            cached = self.cache[key]
-            if time.time() - cached['timestamp'] < self.cache_timeout:
-                return cached['data']
-        return None
+        """Get data from storage if not expired (snapshots come with their indexes)"""
+        return self.cache.get(key)
     
     def run_collection_loop(self):
         """Run the data collection in a loop"""
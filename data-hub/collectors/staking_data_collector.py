@@ -1,5 +1,4 @@
 import requests
-import time
 import json
 import logging
 from datetime import datetime, timezone
@@ -12,7 +11,14 @@ from pathlib import Path
 data_hub_dir = Path(__file__).parent.parent
 sys.path.insert(0, str(data_hub_dir))
 
-from utils.redis_client import redis_client
+from utils.storage import storage
+from utils.rate_limiter import RateLimiter
+from utils.views import attach_views
+from utils.prerender import prerender_bodies
+from utils.history_store import history_store
+from utils.scheduler import Scheduler
+from utils.http_cache import UpstreamCache
+from config.settings import Config
 
 class StakingDataCollector:
     def __init__(self):
@@ -22,49 +28,38 @@ class StakingDataCollector:
             'User-Agent': 'CryptoWealth-StakingCollector/1.0'
         })
         
-        # Rate limiting (5 per minute)
+        # Rate limiting (token buckets shared with the other collectors through Redis, if used)
         self.rate_limits = {
-            'coingecko': 5,
-            'stakingrewards': 5,
-            'coinmarketcap': 5,
-            'defillama': 5,
+            'coingecko': Config.COINGECKO_RATE_LIMIT,
+            'stakingrewards': Config.STAKINGREWARDS_RATE_LIMIT,
+            'coinmarketcap': Config.COINMARKETCAP_RATE_LIMIT,
+            'defillama': Config.DEFILLAMA_RATE_LIMIT,
             'coindesk': 5
         }
-        self.last_request_times = {source: [] for source in self.rate_limits.keys()}
-    
-    def _rate_limit_check(self, source: str) -> bool:
-        """Check if we can make a request to the source"""
-        current_time = time.time()
-        if source not in self.last_request_times:
-            self.last_request_times[source] = []
-        
-        # Remove requests older than 1 minute
-        self.last_request_times[source] = [
-            req_time for req_time in self.last_request_times[source]
-            if current_time - req_time < 60
-        ]
-        
-        # Check if we're under the rate limit
-        if len(self.last_request_times[source]) < self.rate_limits[source]:
-            self.last_request_times[source].append(current_time)
-            return True
-        
-        return False
+        self.rate_limiter = RateLimiter(self.rate_limits, shared=Config.STORAGE_BACKEND == 'redis')
+        self.http_cache = UpstreamCache(Config.HTTP_CACHE_DIR)
     
     def _make_request(self, url: str, source: str, params: Dict = None, headers: Dict = None) -> Optional[Dict]:
-        """Make a rate-limited request"""
-        if not self._rate_limit_check(source):
+        """Make a rate-limited, conditional request"""
+        cached = self.http_cache.get(url, params)
+        if cached is not None and cached.is_fresh():
+            return cached.json()
+        
+        if not self.rate_limiter.acquire(source, timeout=Config.RATE_LIMIT_MAX_WAIT):
             self.logger.warning(f"Rate limit exceeded for {source}")
-            return None
+            return cached.json() if cached is not None else None
         
         try:
             request_headers = self.session.headers.copy()
+            request_headers.update(self.http_cache.conditional_headers(cached))
             if headers:
                 request_headers.update(headers)
             
             response = self.session.get(url, params=params, headers=request_headers, timeout=30)
+            if response.status_code == 304 and cached is not None:
+                return self.http_cache.revalidate(url, params, response.headers).json()
             response.raise_for_status()
-            return response.json()
+            return self.http_cache.store(url, params, response.headers, response.content)[0].json()
         except requests.exceptions.RequestException as e:
             self.logger.error(f"Request failed for {source}: {e}")
             return None
@@ -89,6 +84,7 @@ class StakingDataCollector:
     def get_staking_data_from_sources(self, coins: List[Dict]) -> List[Dict]:
         """Get staking data from multiple sources"""
         staking_data = []
+        timestamp = datetime.now(timezone.utc).isoformat()
         
         for coin in coins:
             symbol = coin['symbol'].upper()
@@ -113,7 +109,7 @@ class StakingDataCollector:
                 'staking_type': apy_data.get('type', 'unknown'),
                 'min_stake': apy_data.get('min_stake', 0),
                 'unbonding_period': apy_data.get('unbonding_period', 0),
-                'last_updated': datetime.now(timezone.utc).isoformat()
+                'last_updated': timestamp
             }
             
             staking_data.append(staking_info)
@@ -178,29 +174,29 @@ class StakingDataCollector:
             'data': staking_coins
         }
         
-        # Store in Redis
-        redis_client.set_data('staking_data', result)
+        # Publish pre-sorted views and store them; bodies are published under the new version
+        result['version'] = (storage.get_version('staking_data') or 0) + 1
+        attach_views('staking_data', result)
+        storage.set_bodies(prerender_bodies('staking_data', result))
+        storage.set_data('staking_data', result)
+        storage.set_symbol_records('staking_data', staking_coins,
+                                   meta={'source': result['source'], 'timestamp': result['timestamp']})
+        history_store.append('staking_data', result)
         
         self.logger.info(f"Collected staking data for {len(staking_coins)} coins")
         return result
     
     def run_collection_loop(self):
-        """Run the staking data collection in a loop (every 8 minutes)"""
-        self.logger.info("Starting staking data collection loop with 8-minute interval")
+        """Run the staking data collection on a wall-clock anchored schedule"""
+        interval = Config.SOURCE_INTERVALS['staking_details']
+        scheduler = Scheduler({'staking_details': interval}, Config.SCHEDULE_JITTER,
+                              Config.BACKOFF_BASE, Config.BACKOFF_MAX)
+        self.logger.info(f"Starting staking data collection loop with {interval}s interval")
         
-        # Initial collection
-        self.collect_staking_data()
-        
-        while True:
-            try:
-                time.sleep(480)  # 8 minutes
-                self.collect_staking_data()
-            except KeyboardInterrupt:
-                self.logger.info("Staking data collection stopped by user")
-                break
-            except Exception as e:
-                self.logger.error(f"Error in staking collection loop: {e}")
-                time.sleep(60)  # Wait 1 minute before retrying
+        try:
+            scheduler.run_forever(lambda due: {'staking_details': self.collect_staking_data()})
+        except KeyboardInterrupt:
+            self.logger.info("Staking data collection stopped by user")
 
 if __name__ == "__main__":
     # Setup logging
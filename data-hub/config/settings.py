@@ -9,6 +9,20 @@ class Config:
     REDIS_PORT = int(os.getenv('REDIS_PORT', 6379))
     REDIS_DB = int(os.getenv('REDIS_DB', 0))
     REDIS_PASSWORD = os.getenv('REDIS_PASSWORD', None)
+    REDIS_POOL_SIZE = int(os.getenv('REDIS_POOL_SIZE', 20))  # connections per client and process
+    REDIS_POOL_TIMEOUT = float(os.getenv('REDIS_POOL_TIMEOUT', 5))  # seconds to wait for a free connection
+    REDIS_CONNECT_TIMEOUT = float(os.getenv('REDIS_CONNECT_TIMEOUT', 5))  # seconds
+    REDIS_BREAKER_THRESHOLD = int(os.getenv('REDIS_BREAKER_THRESHOLD', 5))  # consecutive failures that open the circuit
+    REDIS_RECONNECT_INTERVAL = float(os.getenv('REDIS_RECONNECT_INTERVAL', 5))  # seconds between reconnect attempts
+    REDIS_SCAN_COUNT = int(os.getenv('REDIS_SCAN_COUNT', 500))  # keys per SCAN call / bulk batch
+    
+    # Snapshot storage: redis, or sqlite for a single host without Redis (file shared by all processes)
+    STORAGE_BACKEND = os.getenv('STORAGE_BACKEND', 'redis')
+    STORAGE_PATH = os.getenv('STORAGE_PATH', 'data/datahub.db')  # sqlite backend
+    STORAGE_POLL_INTERVAL = float(os.getenv('STORAGE_POLL_INTERVAL', 0.5))  # sqlite update notifications
+    # Snapshot/delta encoding (msgpack or json); values are tagged, so readers handle both
+    STORAGE_CODEC = os.getenv('STORAGE_CODEC', 'msgpack')
+    STORAGE_COMPRESS_THRESHOLD = int(os.getenv('STORAGE_COMPRESS_THRESHOLD', 4096))  # bytes, zlib above this; 0 disables
     
     # InfluxDB Configuration
     INFLUXDB_URL = os.getenv('INFLUXDB_URL', 'http://localhost:8086')
@@ -21,15 +35,63 @@ class Config:
     API_PORT = int(os.getenv('API_PORT', 5000))
     API_DEBUG = os.getenv('API_DEBUG', 'False').lower() == 'true'
     
+    # Live price stream (Server-Sent Events)
+    STREAM_PORT = int(os.getenv('STREAM_PORT', 5001))
+    STREAM_KEEPALIVE = int(os.getenv('STREAM_KEEPALIVE', 15))  # seconds between keepalive comments
+    STREAM_QUEUE_SIZE = int(os.getenv('STREAM_QUEUE_SIZE', 16))  # pending events before a slow client is dropped
+    
     # Data Collection
     COLLECTION_INTERVAL = int(os.getenv('COLLECTION_INTERVAL', 120))  # seconds
     CACHE_TTL = int(os.getenv('CACHE_TTL', 300))  # 5 minutes
+    # Per-source intervals in seconds; runs are anchored to the wall clock
+    SOURCE_INTERVALS = {
+        'market_prices': int(os.getenv('MARKET_PRICES_INTERVAL', COLLECTION_INTERVAL)),
+        'staking_data': int(os.getenv('STAKING_DATA_INTERVAL', COLLECTION_INTERVAL)),
+        'defi_data': int(os.getenv('DEFI_DATA_INTERVAL', COLLECTION_INTERVAL)),
+        'market_summary': int(os.getenv('MARKET_SUMMARY_INTERVAL', COLLECTION_INTERVAL)),
+        'staking_details': int(os.getenv('STAKING_DETAILS_INTERVAL', 480))  # staking_data_collector.py
+    }
+    SCHEDULE_JITTER = float(os.getenv('SCHEDULE_JITTER', 0.05))  # max delay, as a fraction of the interval
+    BACKOFF_BASE = int(os.getenv('BACKOFF_BASE', 15))  # first retry delay of a failing source
+    BACKOFF_MAX = int(os.getenv('BACKOFF_MAX', 900))
+    PRERENDER_LIMITS = [int(limit) for limit in os.getenv('PRERENDER_LIMITS', '10,50,100').split(',')]
+    DELTA_TTL = int(os.getenv('DELTA_TTL', 3600))  # seconds a market_prices delta is kept
+    DELTA_MAX_CHAIN = int(os.getenv('DELTA_MAX_CHAIN', 30))  # older ?since= versions get a full snapshot
+    SNAPSHOT_CACHE_MAX_AGE = int(os.getenv('SNAPSHOT_CACHE_MAX_AGE', 120))  # seconds, API in-process cache
+    SNAPSHOT_MMAP_DIR = os.getenv('SNAPSHOT_MMAP_DIR', 'data/snapshots')  # shared mapped snapshot files, empty disables
+    
+    # Price/APY history (embedded SQLite time-series store with 1m/1h/1d rollups)
+    HISTORY_DB_PATH = os.getenv('HISTORY_DB_PATH', 'data/history.db')
+    HISTORY_MAX_POINTS = int(os.getenv('HISTORY_MAX_POINTS', 1000))  # per range query, picks the tier
+    
+    # Queue-based collection (collectors/collector_workers.py)
+    COLLECTOR_WORKERS = int(os.getenv('COLLECTOR_WORKERS', os.cpu_count() or 2))  # worker processes per host
+    JOB_QUEUE_KEY = os.getenv('JOB_QUEUE_KEY', 'datahub:jobs')
+    JOB_DEDUPE_TTL = int(os.getenv('JOB_DEDUPE_TTL', 600))  # seconds before a lost job can be queued again
+    LEADER_TTL = int(os.getenv('LEADER_TTL', 15))  # seconds before a dead scheduler is replaced
+    
+    DEFI_PROTOCOL_LIMIT = int(os.getenv('DEFI_PROTOCOL_LIMIT', 50))  # head of DefiLlama /protocols that is kept
+    
+    # HTTP Client (shared async connection pool)
+    HTTP_CACHE_DIR = os.getenv('HTTP_CACHE_DIR', 'data/http_cache')  # upstream responses + ETags, '' disables
+    HTTP_POOL_SIZE = int(os.getenv('HTTP_POOL_SIZE', 20))
+    HTTP_TIMEOUT = int(os.getenv('HTTP_TIMEOUT', 30))  # seconds
+    SOURCE_CONCURRENCY = int(os.getenv('SOURCE_CONCURRENCY', 2))  # in-flight requests per source
+    
+    # Paginated CoinGecko ingestion (full coin universe)
+    COINGECKO_PAGINATED = os.getenv('COINGECKO_PAGINATED', 'False').lower() == 'true'
+    COINGECKO_PER_PAGE = int(os.getenv('COINGECKO_PER_PAGE', 250))  # CoinGecko maximum
+    COINGECKO_MAX_PAGES = int(os.getenv('COINGECKO_MAX_PAGES', 24))
+    COINGECKO_HOT_PAGES = int(os.getenv('COINGECKO_HOT_PAGES', 2))  # refetched every cycle
+    COINGECKO_PAGE_REFRESH = int(os.getenv('COINGECKO_PAGE_REFRESH', 900))  # max age of a tail page
+    COINGECKO_PAGE_TTL = int(os.getenv('COINGECKO_PAGE_TTL', 1800))
     
     # Rate Limits (requests per minute)
     COINGECKO_RATE_LIMIT = 10
     STAKINGREWARDS_RATE_LIMIT = 10
     DEFILLAMA_RATE_LIMIT = 10
     COINMARKETCAP_RATE_LIMIT = 2
+    RATE_LIMIT_MAX_WAIT = int(os.getenv('RATE_LIMIT_MAX_WAIT', 60))  # seconds to wait for a token
     
     # Data Sources
     COINGECKO_API_URL = 'https://api.coingecko.com/api/v3'
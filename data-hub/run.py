@@ -20,13 +20,18 @@ def main():
     print(f"Starting Universal Data API on {Config.API_HOST}:{Config.API_PORT}")
     print("Available endpoints:")
     print("  GET /api/data/health - Health check")
-    print("  GET /api/data/market-prices - Market prices")
+    print("  GET /api/data/market-prices?since=<version> - Market prices (changes only with since)")
     print("  GET /api/data/coin/<symbol> - Specific coin data")
+    print("  GET /api/data/coins?symbols=<a,b>&ids=<x,y> - Batched coin data")
     print("  GET /api/data/staking-data - Staking data")
     print("  GET /api/data/top-staking - Top staking opportunities")
+    print("  GET /api/data/top-coins?by=<market_cap|volume|change_24h>&order=<desc|asc> - Top coins")
     print("  GET /api/data/defi-data - DeFi protocol data")
     print("  GET /api/data/market-summary - Market summary")
-    print("  GET /api/data/search?q=<query> - Search coins")
+    print("  GET /api/data/search?q=<query>&limit=<n>&fuzzy=true - Search coins")
+    print("  GET /api/data/analytics - Market cap, dominance and weighted change")
+    print("  GET /api/data/analytics/movers?limit=<n> - Top gainers and losers")
+    print("  GET /api/data/history/<symbol>?metric=<price|market_cap|volume|apy>&start=&end= - History")
     
     app.run(
         host=Config.API_HOST,
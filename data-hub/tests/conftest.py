@@ -0,0 +1,19 @@
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Settings are read when config.settings is imported, so point everything at throwaway
+# local state before any test module imports the data-hub code
+_state_dir = tempfile.mkdtemp(prefix='datahub-tests-')
+os.environ.update({
+    'REDIS_URL': 'memory://',
+    'STORAGE_BACKEND': 'sqlite',
+    'STORAGE_PATH': os.path.join(_state_dir, 'datahub.db'),
+    'HISTORY_DB_PATH': os.path.join(_state_dir, 'history.db'),
+    'HTTP_CACHE_DIR': '',
+    'SNAPSHOT_MMAP_DIR': ''
+})
+
+# Add the data-hub directory to Python path
+sys.path.insert(0, str(Path(__file__).parent.parent))
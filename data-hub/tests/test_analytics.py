@@ -0,0 +1,39 @@
+import pytest
+
+from utils.analytics import market_analytics, market_movers
+from utils.snapshot import Snapshot
+
+RECORDS = [
+    {'id': 'bitcoin', 'symbol': 'BTC', 'market_cap': 600.0, 'total_volume': 30.0, 'price_change_24h': 2.0},
+    {'id': 'ethereum', 'symbol': 'ETH', 'market_cap': 300.0, 'total_volume': 10.0, 'price_change_24h': -1.0},
+    {'id': 'solana', 'symbol': 'SOL', 'market_cap': 100.0, 'total_volume': None, 'price_change_24h': 5.0},
+    {'id': 'newcoin', 'symbol': 'NEW', 'market_cap': None, 'total_volume': 1.0, 'price_change_24h': None}
+]
+
+@pytest.fixture
+def snapshot():
+    return Snapshot({'data': RECORDS, 'version': 9, 'timestamp': '2024-01-01T00:00:00', 'source': 'coingecko'},
+                    'market_prices')
+
+def test_market_analytics(snapshot):
+    result = market_analytics(snapshot)
+    assert result['total_coins'] == 4
+    assert result['total_market_cap'] == 1000.0
+    assert result['total_volume'] == 41.0
+    assert result['dominance'] == {'BTC': 60.0, 'ETH': 30.0}
+    assert result['volume_weighted_change_24h'] == pytest.approx((2.0 * 30 - 1.0 * 10) / 40)
+    assert result['market_cap_weighted_change_24h'] == pytest.approx((1200 - 300 + 500) / 1000)
+    assert (result['advancers'], result['decliners']) == (2, 1)
+    assert result['version'] == 9
+
+def test_market_movers(snapshot):
+    result = market_movers(snapshot, limit=2)
+    assert [coin['symbol'] for coin in result['gainers']] == ['SOL', 'BTC']
+    assert [coin['symbol'] for coin in result['losers']] == ['ETH', 'BTC']
+    assert result['limit'] == 2 and result['source'] == 'coingecko'
+
+def test_empty_snapshot():
+    result = market_analytics(Snapshot({'data': []}, 'market_prices'))
+    assert result['total_coins'] == 0
+    assert result['dominance'] == {}
+    assert result['volume_weighted_change_24h'] is None
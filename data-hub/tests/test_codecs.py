@@ -0,0 +1,36 @@
+import json
+
+import pytest
+
+from utils.codecs import CODECS, MAGIC, UNCOMPRESSED, ZLIB, PayloadSerializer
+
+PAYLOAD = {'data': [{'symbol': 'BTC', 'current_price': 64123.5, 'market_cap_rank': 1}], 'version': 7}
+
+@pytest.mark.parametrize('codec', sorted(CODECS))
+def test_round_trip_with_tags(codec):
+    serializer = PayloadSerializer(codec=codec, compress_threshold=0)
+    raw = serializer.dumps(PAYLOAD)
+    assert raw[:1] == MAGIC
+    assert raw[1:2] == CODECS[codec].tag
+    assert raw[2:3] == UNCOMPRESSED
+    assert PayloadSerializer.loads(raw) == PAYLOAD
+
+def test_large_bodies_are_compressed():
+    serializer = PayloadSerializer(compress_threshold=1024)
+    payload = {'data': [{'symbol': f"C{i}", 'name': 'Some coin'} for i in range(200)]}
+    raw = serializer.dumps(payload)
+    assert raw[2:3] == ZLIB
+    assert len(raw) < len(json.dumps(payload))
+    assert PayloadSerializer.loads(raw) == payload
+    assert serializer.dumps({'small': True})[2:3] == UNCOMPRESSED
+
+def test_legacy_json_values_still_load():
+    legacy = json.dumps(PAYLOAD)
+    assert PayloadSerializer.loads(legacy) == PAYLOAD
+    assert PayloadSerializer.loads(legacy.encode('utf-8')) == PAYLOAD
+
+def test_unknown_codecs_are_rejected():
+    with pytest.raises(ValueError):
+        PayloadSerializer(codec='pickle')
+    with pytest.raises(ValueError):
+        PayloadSerializer.loads(MAGIC + b'?' + UNCOMPRESSED + b'{}')
@@ -0,0 +1,26 @@
+import asyncio
+
+from collectors.market_data_collector import MarketDataCollector
+from utils.storage import storage
+
+def test_sources_run_concurrently_and_failures_stay_isolated(monkeypatch):
+    collector = MarketDataCollector()
+    running, peak = set(), []
+
+    async def collect(key):
+        running.add(key)
+        peak.append(len(running))
+        await asyncio.sleep(0.05)
+        running.discard(key)
+        if key == 'defi_data':
+            raise RuntimeError('upstream down')
+        return {'data': [{'symbol': 'BTC'}], 'source': 'test', 'timestamp': 'now'}
+
+    monkeypatch.setattr(collector, '_source_task', lambda http, key, batch=None: collect(key))
+    collected = collector.collect_all_data()
+
+    assert max(peak) == len(collector.SOURCES)
+    assert collected['market_prices']['data'] == [{'symbol': 'BTC'}]
+    assert collected['defi_data'] is None
+    summary = storage.get_data('market_summary')
+    assert (summary['total_coins'], summary['total_staking'], summary['total_defi']) == (1, 1, 0)
@@ -0,0 +1,141 @@
+import asyncio
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from collectors import market_data_collector
+from collectors.market_data_collector import CycleBatch, MarketDataCollector
+from config.settings import Config
+from utils.redis_client import CURRENT_POINTER, RedisClient
+from utils.sqlite_store import SQLiteStore
+from utils.storage_backend import SymbolRecords
+from utils.storage import storage
+
+def snapshot(version, symbols):
+    return {'data': [{'symbol': symbol, 'market_cap_rank': rank} for rank, symbol in enumerate(symbols, 1)],
+            'timestamp': f"t{version}", 'source': 'test', 'version': version}
+
+@pytest.fixture
+def redis_store():
+    # memory:// gives every client its own in-process server
+    return RedisClient()
+
+def test_cycle_switches_snapshots_and_symbol_records_together(redis_store):
+    first = snapshot(1, ['BTC', 'ETH'])
+    cycle = redis_store.set_data_batch(
+        {'market_prices': first, 'market_summary': {'status': 'success'}},
+        symbol_records={'market_prices': (first['data'], {'source': 'test', 'timestamp': 't1'})})
+    assert redis_store.get_many_with_versions(['market_prices', 'market_summary']) == {
+        'market_prices': (first, 1),
+        'market_summary': ({'status': 'success'}, 1)
+    }
+    records, meta = redis_store.get_symbol_records('market_prices', ['BTC', 'DOGE'])
+    assert records == [{'symbol': 'BTC', 'market_cap_rank': 1}, None]
+    assert meta == {'source': 'test', 'timestamp': 't1'}
+
+    second = snapshot(2, ['BTC'])
+    next_cycle = redis_store.set_data_batch(
+        {'market_prices': second}, symbol_records={'market_prices': (second['data'], None)})
+    assert redis_store.get_data_with_version('market_prices') == (second, 2)
+    # The replaced cycle key is gone and the rank index only holds this cycle's coins
+    assert not redis_store.client.exists(f"market_prices@{cycle}")
+    assert redis_store.client.hget(CURRENT_POINTER, 'market_prices') == next_cycle
+    assert redis_store.client.zrange('coin_index:rank', 0, -1) == ['BTC']
+
+def test_cycle_items_and_merged_records_keep_their_own_ttl(redis_store):
+    redis_store.set_data_batch({'market_prices': snapshot(1, ['BTC'])},
+                               symbol_records={'market_prices': (snapshot(1, ['BTC'])['data'], None)})
+    head = snapshot(2, ['ETH'])
+    cycle = redis_store.set_data_batch(
+        {'market_prices': head, 'market_prices:page:1': head}, ttls={'market_prices:page:1': 3600},
+        symbol_records={'market_prices': SymbolRecords(head['data'], None, 3600, replace=False)})
+    assert 300 < redis_store.client.ttl(f"market_prices:page:1@{cycle}") <= 3600
+    assert redis_store.client.ttl(f"market_prices@{cycle}") <= 300
+    # Merged, not replaced
+    assert redis_store.client.zrange('coin_index:rank', 0, -1) == ['BTC', 'ETH']
+    assert 300 < redis_store.client.ttl('coin:ETH') <= 3600
+
+def test_cycle_write_retries_when_another_writer_moves_the_pointer(redis_store):
+    dumps = redis_store.serializer.dumps
+    moved = []
+
+    def racing_dumps(value):
+        if not moved:
+            moved.append(True)
+            redis_store.client.hset(CURRENT_POINTER, 'market_prices', 'other')
+        return dumps(value)
+
+    redis_store.serializer.dumps = racing_dumps
+    cycle = redis_store.set_data_batch({'market_prices': snapshot(1, ['BTC'])})
+    assert redis_store.client.hget(CURRENT_POINTER, 'market_prices') == cycle
+
+def test_plain_write_takes_a_key_out_of_the_cycle(redis_store):
+    redis_store.set_data_batch({'market_prices': snapshot(1, ['BTC'])})
+    redis_store.set_data('market_prices', snapshot(2, ['ETH']))
+    assert redis_store.get_data_with_version('market_prices') == (snapshot(2, ['ETH']), 2)
+    assert redis_store.client.hget(CURRENT_POINTER, 'market_prices') is None
+
+def test_a_failing_source_does_not_lose_the_cycle(monkeypatch):
+    collector = MarketDataCollector()
+
+    async def source_task(http, key, batch=None):
+        if key == 'defi_data':
+            raise ValueError('unexpected upstream format')
+        result = {'data': [{'symbol': 'BTC', 'id': 'bitcoin'}], 'timestamp': 't', 'source': 'test'}
+        batch[key] = (result, None)
+        return result
+
+    monkeypatch.setattr(collector, '_source_task', source_task)
+    collected = asyncio.run(collector.collect_all_data_async())
+    assert collected['defi_data'] is None
+    assert storage.get_data('staking_data')['source'] == 'test'
+    assert storage.get_data('market_summary')['total_defi'] == 0
+
+def test_paginated_ingestion_is_written_with_the_cycle(monkeypatch, tmp_path):
+    store = SQLiteStore(str(tmp_path / 'store.db'))
+    monkeypatch.setattr(market_data_collector, 'storage', store)
+    monkeypatch.setattr(Config, 'COINGECKO_PER_PAGE', 2)
+    # The second page's coin shares a symbol with a better ranked coin on the third page
+    coins = [
+        {'id': 'bitcoin', 'symbol': 'BTC', 'market_cap_rank': 1},
+        {'id': 'ethereum', 'symbol': 'ETH', 'market_cap_rank': 2},
+        {'id': 'fake-sol', 'symbol': 'SOL', 'market_cap_rank': None},
+        {'id': 'tether', 'symbol': 'USDT', 'market_cap_rank': 3},
+        {'id': 'solana', 'symbol': 'SOL', 'market_cap_rank': 4}
+    ]
+    for coin in coins:
+        coin.update({'name': coin['id'], 'current_price': 1.0, 'market_cap': 1.0, 'total_volume': 1.0,
+                     'last_updated': '2024-01-01T00:00:00+00:00'})
+
+    async def markets(request):
+        page = int(request.query['page'])
+        return web.json_response(coins[(page - 1) * 2:page * 2])
+
+    async def run():
+        app = web.Application()
+        app.router.add_get('/coins/markets', markets)
+        server = TestServer(app)
+        await server.start_server()
+        monkeypatch.setattr(Config, 'COINGECKO_API_URL', str(server.make_url('')).rstrip('/'))
+        collector = MarketDataCollector()
+        batch = CycleBatch()
+        try:
+            async with collector._open_http() as http:
+                await collector.collect_coingecko_pages_async(http, batch)
+        finally:
+            await server.close()
+        return collector, batch
+
+    collector, batch = asyncio.run(run())
+    # Nothing is visible before the cycle is written
+    assert store.get_data('market_prices') is None
+    assert store.get_symbol_records('market_prices', ['BTC'])[0] == [None]
+    assert set(batch) == {'market_prices', 'market_prices:pages', 'market_prices:page:1',
+                          'market_prices:page:2', 'market_prices:page:3'}
+
+    collector._write_batch(batch)
+    assert len(store.get_data('market_prices')['data']) == 2
+    assert store.get_data('market_prices:pages')['total_coins'] == 5
+    records, _ = store.get_symbol_records('market_prices', ['BTC', 'USDT', 'SOL'])
+    assert [record['id'] for record in records] == ['bitcoin', 'tether', 'solana']
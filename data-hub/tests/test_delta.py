@@ -0,0 +1,33 @@
+from utils.delta import diff_records, field_diff, merge_deltas
+
+def coin(coin_id, price, updated='t1'):
+    return {'id': coin_id, 'symbol': coin_id.upper(), 'current_price': price, 'last_updated': updated}
+
+def test_field_diff_carries_only_changed_fields():
+    previous = {'btc': coin('btc', 1.0), 'eth': coin('eth', 2.0), 'old': coin('old', 3.0)}
+    current = {'btc': coin('btc', 1.5, 't2'), 'eth': coin('eth', 2.0, 't2'), 'new': coin('new', 4.0)}
+    delta = field_diff(previous, current)
+    assert delta['changed'] == {'btc': {'current_price': 1.5, 'last_updated': 't2'}}
+    assert delta['added'] == [coin('new', 4.0)]
+    assert delta['removed'] == ['old']
+
+def test_diff_records_ignores_last_updated():
+    changed, removed = diff_records({'btc': coin('btc', 1.0)}, {'btc': coin('btc', 1.0, 't2')})
+    assert changed == [] and removed == []
+
+def test_merge_deltas_folds_a_chain_oldest_first():
+    first = {'changed': {'btc': {'current_price': 1.5}}, 'added': [coin('new', 4.0)], 'removed': ['old']}
+    second = {'changed': {'btc': {'current_price': 1.7}, 'new': {'current_price': 4.2}},
+              'added': [], 'removed': ['eth']}
+    merged = merge_deltas([first, second])
+    assert merged['changed'] == {'btc': {'current_price': 1.7}}
+    assert merged['added'] == [{**coin('new', 4.0), 'current_price': 4.2}]
+    assert merged['removed'] == ['eth', 'old']
+
+def test_merge_deltas_readded_coin_is_not_removed():
+    merged = merge_deltas([
+        {'changed': {}, 'added': [], 'removed': ['btc']},
+        {'changed': {}, 'added': [coin('btc', 2.0)], 'removed': []}
+    ])
+    assert merged['removed'] == []
+    assert merged['added'] == [coin('btc', 2.0)]
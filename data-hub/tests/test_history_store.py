@@ -0,0 +1,38 @@
+import time
+from datetime import datetime, timezone
+
+from utils.history_store import HistoryStore
+
+def payload(timestamp, price):
+    return {
+        'timestamp': datetime.fromtimestamp(timestamp, timezone.utc).isoformat(),
+        'data': [{'symbol': 'BTC', 'current_price': price, 'market_cap': None, 'total_volume': 10.0}]
+    }
+
+def test_points_roll_up_into_ohlc_buckets(tmp_path):
+    store = HistoryStore(str(tmp_path / 'history.db'))
+    # Recent points, older ones would be pruned by tier retention
+    now = int(time.time())
+    base = now - now % 3600 - 3600
+    for offset, price in ((0, 10.0), (60, 12.0), (120, 9.0), (180, 11.0)):
+        # market_cap is None, so only price and volume are stored
+        assert store.append('market_prices', payload(base + offset, price)) == 2
+
+    resolution, points = store.query('BTC', 'price', base, base + 3599, resolution='1h')
+    assert resolution == '1h'
+    ohlc = [(point['open'], point['high'], point['low'], point['close'], point['samples']) for point in points]
+    assert ohlc == [(10.0, 12.0, 9.0, 11.0, 4)]
+    assert len(store.query('BTC', 'price', base, base + 3599, resolution='1m')[1]) == 4
+
+def test_select_tier_keeps_within_max_points(tmp_path):
+    store = HistoryStore(str(tmp_path / 'history.db'), max_points=100, raw_step=60)
+    now = 1_700_000_000
+    assert store.select_tier(now - 3600, now, now=now) == 'raw'
+    assert store.select_tier(now - 86400, now, now=now) == '1h'
+    assert store.select_tier(now - 400 * 86400, now, now=now) == '1d'
+
+def test_reconnects_after_fork(tmp_path, monkeypatch):
+    store = HistoryStore(str(tmp_path / 'history.db'))
+    inherited = store._connect()
+    monkeypatch.setattr('os.getpid', lambda: -1)
+    assert store._connect() is not inherited
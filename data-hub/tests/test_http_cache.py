@@ -0,0 +1,56 @@
+import os
+
+from utils.http_cache import UpstreamCache
+
+URL = 'https://api.coingecko.com/api/v3/coins/markets'
+PARAMS = {'vs_currency': 'usd', 'page': 1}
+
+def test_store_reports_content_changes_and_validators(tmp_path):
+    cache = UpstreamCache(str(tmp_path))
+    assert cache.conditional_headers(cache.get(URL, PARAMS)) == {}
+
+    headers = {'ETag': '"v1"', 'Last-Modified': 'Mon, 01 Jan 2024 00:00:00 GMT', 'Cache-Control': 'max-age=30'}
+    entry, changed = cache.store(URL, PARAMS, headers, b'[1]')
+    assert changed and entry.is_fresh()
+    assert cache.conditional_headers(entry) == {'If-None-Match': '"v1"',
+                                                'If-Modified-Since': 'Mon, 01 Jan 2024 00:00:00 GMT'}
+
+    # Same body under a new ETag is not a change
+    assert not cache.store(URL, PARAMS, {'ETag': '"v2"'}, b'[1]')[1]
+    assert cache.store(URL, PARAMS, {}, b'[2]')[1]
+    # Other parameters are another entry
+    assert cache.get(URL, {'vs_currency': 'usd', 'page': 2}) is None
+
+def test_no_cache_responses_are_never_fresh(tmp_path):
+    cache = UpstreamCache(str(tmp_path))
+    entry, _ = cache.store(URL, PARAMS, {'Cache-Control': 'no-cache, max-age=60'}, b'[]')
+    assert not entry.is_fresh()
+
+def test_revalidation_keeps_the_body_and_refreshes_expiry(tmp_path):
+    cache = UpstreamCache(str(tmp_path))
+    assert cache.revalidate(URL, PARAMS, {}) is None
+
+    cache.store(URL, PARAMS, {'ETag': '"v1"'}, b'[1]')
+    entry = cache.revalidate(URL, PARAMS, {'ETag': '"v1"', 'Cache-Control': 'max-age=60'})
+    assert entry.body == b'[1]' and entry.is_fresh()
+    assert UpstreamCache(str(tmp_path)).get(URL, PARAMS).is_fresh()
+
+def test_entries_survive_a_restart(tmp_path):
+    UpstreamCache(str(tmp_path)).store(URL, PARAMS, {'ETag': '"v1"'}, b'[1, 2]')
+    entry = UpstreamCache(str(tmp_path)).get(URL, PARAMS)
+    assert entry.body == b'[1, 2]' and entry.etag == '"v1"'
+    assert entry.json() == [1, 2]
+
+def test_half_written_entries_are_ignored(tmp_path):
+    cache = UpstreamCache(str(tmp_path))
+    cache.store(URL, PARAMS, {}, b'[1]')
+    key = cache.key(URL, PARAMS)
+    with open(os.path.join(str(tmp_path), f"{key}.body"), 'wb') as f:
+        f.write(b'[2]')
+    assert UpstreamCache(str(tmp_path)).get(URL, PARAMS) is None
+
+def test_memory_only_cache(tmp_path):
+    cache = UpstreamCache()
+    cache.store(URL, PARAMS, {}, b'[1]')
+    assert cache.get(URL, PARAMS).body == b'[1]'
+    assert UpstreamCache().get(URL, PARAMS) is None
@@ -0,0 +1,88 @@
+import json
+
+import fakeredis
+import pytest
+
+from collectors import collector_workers
+from utils.job_queue import JobQueue, LeaderElection
+
+@pytest.fixture
+def client():
+    return fakeredis.FakeRedis(decode_responses=True)
+
+def test_a_job_is_only_queued_once_until_it_completes(client):
+    queue = JobQueue(client, 'jobs')
+    assert queue.enqueue('market_prices')
+    assert not queue.enqueue('market_prices')
+    assert queue.depth() == 1
+
+    job = queue.reserve(timeout=1)
+    assert job['name'] == 'market_prices'
+    # Reserved but still running: the dedupe key holds
+    assert not queue.enqueue('market_prices')
+    assert client.llen('jobs:processing') == 1
+
+    queue.complete(job, success=False)
+    assert client.llen('jobs:processing') == 0
+    assert queue.pop_results() == {'market_prices': False}
+    assert queue.pop_results() == {}
+    assert queue.enqueue('market_prices')
+
+def test_purge_stale_drops_jobs_of_dead_workers(client):
+    queue = JobQueue(client, 'jobs', dedupe_ttl=60)
+    queue.enqueue('defi_data')
+    job = queue.reserve(timeout=1)
+    assert queue.purge_stale() == 0
+
+    stale = json.dumps({**json.loads(job['_raw']), 'enqueued_at': 0})
+    client.lset('jobs:processing', 0, stale)
+    assert queue.purge_stale() == 1
+
+def test_only_one_candidate_leads_until_it_releases(client):
+    first = LeaderElection(client, 'leader', ttl=15)
+    second = LeaderElection(client, 'leader', ttl=15)
+    assert first.ensure()
+    assert not second.ensure()
+    # Renewing keeps the lease
+    assert first.ensure()
+    assert not second.ensure()
+
+    first.release()
+    assert second.ensure()
+    assert not first.ensure()
+
+def test_a_lost_lease_moves_to_another_candidate(client):
+    first = LeaderElection(client, 'leader', ttl=15)
+    second = LeaderElection(client, 'leader', ttl=15)
+    assert first.ensure()
+    client.delete('leader')  # the lease expired
+    assert second.ensure()
+    assert not first.ensure()
+
+def test_worker_survives_a_failing_completion(client, monkeypatch):
+    queue = JobQueue(client, 'jobs')
+    queue.enqueue('staking_data')
+    job = queue.reserve(timeout=1)
+    calls = []
+
+    def complete(job, success):
+        calls.append(success)
+        if len(calls) < 3:
+            raise ConnectionError('Redis unavailable')
+        JobQueue.complete(queue, job, success)
+
+    monkeypatch.setattr(queue, 'complete', complete)
+    monkeypatch.setattr(collector_workers.time, 'sleep', lambda seconds: None)
+    collector_workers._complete(queue, job, True)
+    assert calls == [True, True, True]
+    assert queue.pop_results() == {'staking_data': True}
+
+    # Redis stays down: give up without raising, the dedupe TTL releases the job
+    def down(job, success):
+        calls.append(success)
+        raise ConnectionError('Redis unavailable')
+
+    calls.clear()
+    monkeypatch.setattr(queue, 'complete', down)
+    collector_workers._complete(queue, job, True)
+    assert len(calls) == 3
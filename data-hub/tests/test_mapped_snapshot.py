@@ -0,0 +1,126 @@
+import os
+import time
+
+import numpy as np
+import pytest
+
+from utils.mapped_snapshot import MappedSnapshot, MappedSnapshots, packed_snapshot
+from utils.redis_client import RedisClient
+from utils.snapshot import Snapshot
+from utils.snapshot_cache import SnapshotCache
+from utils.sqlite_store import SQLiteStore
+
+RECORDS = [
+    {'id': 'bitcoin', 'symbol': 'BTC', 'name': 'Bitcoin', 'current_price': 64000.0, 'market_cap': 1.2e12,
+     'market_cap_rank': 1, 'total_volume': 3e10, 'price_change_24h': 1.5},
+    {'id': 'ethereum', 'symbol': 'ETH', 'name': 'Ethereum', 'current_price': 3100.0, 'market_cap': 3.7e11,
+     'market_cap_rank': 2, 'total_volume': 1.5e10, 'price_change_24h': -0.8},
+    {'id': 'tether', 'symbol': 'USDT', 'name': 'Tether', 'current_price': 1.0, 'market_cap': 1.1e11,
+     'market_cap_rank': 3, 'total_volume': None, 'price_change_24h': 0.01},
+    {'id': 'bitcoin-wrapped', 'symbol': 'BTC', 'name': 'Wrapped Bitcoin', 'current_price': 64010.0,
+     'market_cap': 9e9, 'market_cap_rank': 15, 'total_volume': 2e8, 'price_change_24h': 1.4}
+]
+
+def _payload(version, records=RECORDS):
+    return {'data': records, 'version': version, 'timestamp': '2024-01-01T00:00:00', 'source': 'coingecko'}
+
+@pytest.fixture
+def snapshots(tmp_path):
+    return MappedSnapshots(str(tmp_path / 'snapshots'), ttl=60)
+
+def test_mapped_reads_match_the_decoded_snapshot(snapshots):
+    assert snapshots.publish('market_prices', _payload(4))
+    mapped = snapshots.get('market_prices')
+    decoded = Snapshot(_payload(4), 'market_prices')
+
+    assert isinstance(mapped, MappedSnapshot)
+    assert (mapped.version, mapped.timestamp, mapped.source) == (4, decoded.timestamp, decoded.source)
+    assert list(mapped.data) == list(decoded.data)
+    assert mapped.data[-1] == RECORDS[-1]
+    assert mapped.lookup('BTC') == decoded.lookup('BTC') == RECORDS[0]
+    assert mapped.lookup_many(['ETH', 'DOGE']) == decoded.lookup_many(['ETH', 'DOGE'])
+    assert mapped.lookup_id('bitcoin-wrapped') == RECORDS[3]
+    for view in ('market_cap', 'volume', 'change_24h'):
+        assert mapped.top(view, 2) == decoded.top(view, 2)
+        assert mapped.top(view, 2, ascending=True) == decoded.top(view, 2, ascending=True)
+    assert mapped.search('ether') == decoded.search('ether')
+
+    np.testing.assert_array_equal(mapped.columns['price'], decoded.columns['price'])
+    assert list(mapped.columns.order('volume', limit=3)) == list(decoded.columns.order('volume', limit=3))
+
+def test_packed_snapshot_keeps_no_records_but_answers_the_same():
+    payload = _payload(4)
+    packed = packed_snapshot('market_prices', payload)
+    decoded = Snapshot(payload, 'market_prices')
+
+    # Only the encoded bytes are kept; records are decoded per access
+    assert isinstance(packed.map, bytes)
+    assert packed.data[0] == RECORDS[0] and packed.data[0] is not RECORDS[0]
+    assert packed.version == 4
+    assert packed.lookup_many(['BTC', 'DOGE']) == decoded.lookup_many(['BTC', 'DOGE'])
+    assert packed.top('market_cap', 3) == decoded.top('market_cap', 3)
+    np.testing.assert_array_equal(packed.columns['volume'], decoded.columns['volume'])
+
+def test_republish_swaps_the_mapping(snapshots):
+    snapshots.publish('market_prices', _payload(1))
+    first = snapshots.get('market_prices')
+    assert snapshots.get('market_prices') is first
+
+    snapshots.publish('market_prices', _payload(2, RECORDS[:2]))
+    second = snapshots.get('market_prices')
+    assert second.version == 2 and len(second.data) == 2
+    # Readers that still hold the old snapshot keep reading it
+    assert first.version == 1 and len(first.data) == 4
+
+def test_files_expire_unless_touched(snapshots):
+    snapshots.publish('market_prices', _payload(1))
+    path = snapshots.path('market_prices')
+    stale = time.time() - 120
+    os.utime(path, (stale, stale))
+    assert snapshots.get('market_prices') is None
+
+    assert snapshots.touch('market_prices')
+    assert snapshots.get('market_prices').version == 1
+
+def test_only_mapped_keys_are_served(snapshots):
+    snapshots.publish('staking_data', _payload(1))
+    assert snapshots.get('staking_data') is None
+    assert snapshots.get('market_prices') is None
+    assert not snapshots.touch('market_prices')
+
+def test_cache_falls_back_to_the_store_when_its_version_is_newer(tmp_path, snapshots):
+    store = SQLiteStore(str(tmp_path / 'store.db'))
+    # max_age=0 checks the store version on every read, independent of the listener
+    cache = SnapshotCache(store, max_age=0, builders={'market_prices': lambda p: Snapshot(p, 'market_prices')},
+                          mapped=snapshots)
+
+    store.set_data('market_prices', _payload(1))
+    snapshots.publish('market_prices', _payload(1))
+    assert isinstance(cache.get('market_prices'), MappedSnapshot)
+
+    # Written by another collector that did not replace this host's file
+    store.set_data('market_prices', _payload(2, RECORDS[:2]))
+    snapshot = cache.get('market_prices')
+    assert isinstance(snapshot, Snapshot) and snapshot.version == 2
+    assert cache.get_version('market_prices') == 2
+
+    snapshots.publish('market_prices', _payload(2, RECORDS[:2]))
+    assert isinstance(cache.get('market_prices'), MappedSnapshot)
+    assert cache.get_version('market_prices') == 2
+
+def test_cache_keeps_the_mapped_snapshot_while_redis_is_unreachable(monkeypatch, snapshots):
+    store = RedisClient()
+    store.client.flushdb()
+    monkeypatch.setattr(store, '_ensure_reconnector', lambda: None)
+    store.breaker.on_open = None
+    cache = SnapshotCache(store, max_age=0, mapped=snapshots)
+
+    store.set_data('market_prices', _payload(1))
+    snapshots.publish('market_prices', _payload(1))
+    assert isinstance(cache.get('market_prices'), MappedSnapshot)
+
+    # This worker never read the store itself, so it has no last known version either
+    store.breaker.trip()
+    assert store.get_version('market_prices') is None
+    snapshot = cache.get('market_prices')
+    assert isinstance(snapshot, MappedSnapshot) and snapshot.version == 1
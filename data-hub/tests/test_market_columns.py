@@ -0,0 +1,46 @@
+import math
+
+import numpy as np
+
+from utils.market_columns import MarketColumns
+
+RECORDS = [
+    {'id': 'bitcoin', 'symbol': 'BTC', 'name': 'Bitcoin', 'current_price': 64000.0, 'market_cap': 1200.0,
+     'total_volume': 30.0, 'price_change_24h': 1.5},
+    {'id': 'ethereum', 'symbol': 'ETH', 'name': 'Ethereum', 'current_price': 3100.0, 'market_cap': 370.0,
+     'total_volume': 15.0, 'price_change_24h': -0.8},
+    {'id': 'tether', 'symbol': 'USDT', 'name': 'Tether', 'current_price': 1.0, 'market_cap': 110.0,
+     'total_volume': None, 'price_change_24h': 0.01},
+    {'id': 'newcoin', 'symbol': 'NEW', 'name': None, 'current_price': None, 'market_cap': None,
+     'total_volume': 1.0, 'price_change_24h': None}
+]
+
+def test_missing_values_become_nan():
+    columns = MarketColumns(RECORDS)
+    assert len(columns) == 4
+    assert math.isnan(columns['price'][3])
+    assert math.isnan(columns['volume'][2])
+    assert columns['name'][3] == ''
+    assert list(columns['symbol']) == ['BTC', 'ETH', 'USDT', 'NEW']
+
+def test_select_never_matches_missing_values():
+    columns = MarketColumns(RECORDS)
+    assert list(columns.select({('market_cap', 'min'): 100.0, ('market_cap', 'max'): 500.0})) == [1, 2]
+    assert list(columns.select({('change_24h', 'max'): 100.0})) == [0, 1, 2]
+    assert list(columns.select({})) == [0, 1, 2, 3]
+
+def test_order_puts_missing_values_last():
+    columns = MarketColumns(RECORDS)
+    assert list(columns.order('change_24h')) == [0, 2, 1, 3]
+    assert list(columns.order('change_24h', ascending=True)) == [1, 2, 0, 3]
+    assert list(columns.order('market_cap', limit=2)) == [0, 1]
+    assert list(columns.order('market_cap', limit=0)) == []
+    assert list(columns.order('volume', positions=np.array([1, 2, 3]))) == [1, 3, 2]
+
+def test_aggregates_skip_missing_values():
+    columns = MarketColumns(RECORDS)
+    assert columns.total('market_cap') == 1680.0
+    assert columns.total('volume', positions=np.array([0, 1])) == 45.0
+    # Weighted by volume over rows that have both values
+    assert columns.weighted_mean('change_24h', 'volume') == (1.5 * 30 - 0.8 * 15) / 45
+    assert columns.weighted_mean('change_24h', 'volume', positions=np.array([2, 3])) is None
@@ -0,0 +1,45 @@
+import pytest
+
+from api import universal_data_api
+from api.universal_data_api import app
+from utils.delta import field_diff
+from utils.storage import storage
+
+COINS = {f"coin-{i}": {'id': f"coin-{i}", 'symbol': f"C{i}", 'current_price': float(i), 'market_cap_rank': i + 1}
+         for i in range(150)}
+
+def _write(version, coins, previous=None):
+    payload = {'data': list(coins.values()), 'version': version, 'timestamp': f"t{version}", 'source': 'test'}
+    delta = field_diff(previous, coins) if previous is not None else None
+    storage.set_data('market_prices', payload, delta=delta)
+
+@pytest.fixture
+def client(monkeypatch):
+    second = {**COINS, 'coin-0': {**COINS['coin-0'], 'current_price': 2.5}}
+    third = {key: coin for key, coin in second.items() if key != 'coin-149'}
+    _write(1, COINS)
+    _write(2, second, COINS)
+    _write(3, third, second)
+    universal_data_api.snapshot_cache.invalidate()
+
+    calls = []
+    get_deltas = storage.get_deltas
+    monkeypatch.setattr(storage, 'get_deltas', lambda *args: calls.append(args) or get_deltas(*args))
+    client = app.test_client()
+    client.delta_calls = calls
+    return client
+
+def test_deltas_are_merged_once_per_since_and_version(client):
+    body = client.get('/api/data/market-prices?since=1').get_json()
+    assert (body['since'], body['version']) == (1, 3)
+    assert body['changed'] == {'coin-0': {'current_price': 2.5}}
+    assert body['removed'] == ['coin-149']
+
+    assert client.get('/api/data/market-prices?since=1').get_json() == body
+    assert len(client.delta_calls) == 1
+
+def test_too_old_versions_get_every_coin(client):
+    for since in (-100, 0, 7):
+        body = client.get(f'/api/data/market-prices?since={since}').get_json()
+        assert body['version'] == 3
+        assert body['count'] == 149
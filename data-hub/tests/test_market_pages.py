@@ -0,0 +1,48 @@
+import asyncio
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from collectors.market_data_collector import MarketDataCollector
+from config.settings import Config
+
+COINS = [
+    {'id': f"coin-{i}", 'symbol': f"C{i}", 'name': f"Coin {i}", 'current_price': 1.0, 'market_cap': 1e9 - i,
+     'market_cap_rank': i + 1, 'total_volume': 1e6, 'last_updated': '2024-01-01T00:00:00+00:00'}
+    for i in range(5)
+]
+
+def test_page_budget_reserves_the_other_coingecko_consumers(monkeypatch):
+    monkeypatch.setattr(Config, 'SOURCE_INTERVALS', {**Config.SOURCE_INTERVALS, 'market_prices': 120,
+                                                     'staking_data': 60, 'staking_details': 480})
+    collector = MarketDataCollector()
+    # 10/min over 120s, minus two staking_data runs and one staking collector run
+    assert len(collector._select_pages()) == 20 - 3
+
+def test_first_cycle_stops_at_the_first_short_page(monkeypatch):
+    monkeypatch.setattr(Config, 'COINGECKO_PER_PAGE', 2)
+    requested = []
+
+    async def markets(request):
+        page = int(request.query['page'])
+        requested.append(page)
+        return web.json_response(COINS[(page - 1) * 2:page * 2])
+
+    async def run():
+        app = web.Application()
+        app.router.add_get('/coins/markets', markets)
+        server = TestServer(app)
+        await server.start_server()
+        monkeypatch.setattr(Config, 'COINGECKO_API_URL', str(server.make_url('')).rstrip('/'))
+        collector = MarketDataCollector()
+        try:
+            async with collector._open_http() as http:
+                manifest = await collector.collect_coingecko_pages_async(http)
+        finally:
+            await server.close()
+        return collector, manifest
+
+    collector, manifest = asyncio.run(run())
+    assert requested == [1, 2, 3]
+    assert collector._last_page == 3
+    assert manifest['total_coins'] == 5
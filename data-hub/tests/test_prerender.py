@@ -0,0 +1,67 @@
+import gzip
+import json
+
+from flask import Flask, request
+
+from utils import prerender
+from utils.prerender import (body_name, encode_variants, listing_body, prerender_bodies, published_names,
+                             versioned_name)
+from utils.response_cache import ResponseCache
+from utils.snapshot import Snapshot
+from utils.sqlite_store import SQLiteStore
+
+MARKET = {
+    'data': [{'id': 'bitcoin', 'symbol': 'BTC', 'name': 'Bitcoin', 'market_cap': 600.0, 'total_volume': 30.0,
+              'price_change_24h': 2.0},
+             {'id': 'ethereum', 'symbol': 'ETH', 'name': 'Ethereum', 'market_cap': 300.0, 'total_volume': 10.0,
+              'price_change_24h': -1.0}],
+    'version': 4, 'timestamp': '2024-01-01T00:00:00', 'source': 'coingecko'
+}
+MARKET_SNAPSHOT = Snapshot(MARKET, 'market_prices')
+
+def test_variants_decode_to_the_same_body():
+    variants = encode_variants({'data': list(range(100))})
+    assert json.loads(variants['identity']) == {'data': list(range(100))}
+    assert gzip.decompress(variants['gzip']) == variants['identity']
+    if prerender.brotli:
+        assert prerender.brotli.decompress(variants['br']) == variants['identity']
+
+def test_collector_renders_the_common_market_bodies():
+    bodies = prerender_bodies('market_prices', MARKET, limits=(1,), top_limit=5)
+    assert set(bodies) == {versioned_name(name, 4) for name in published_names((1,), 5)
+                           if not name.startswith(('staking', 'top-staking', 'market-summary'))}
+    listing = json.loads(bodies[versioned_name(body_name('market-prices', 1), 4)]['identity'])
+    assert listing == {'data': MARKET['data'][:1], 'count': 1, 'timestamp': MARKET['timestamp'],
+                       'source': 'coingecko', 'version': 4}
+    assert prerender_bodies('unknown', MARKET) == {}
+    # Without a version readers could not tell which snapshot a body belongs to
+    assert prerender_bodies('market_prices', {**MARKET, 'version': None}) == {}
+
+def test_api_serves_published_bodies_in_the_accepted_encoding(tmp_path):
+    store = SQLiteStore(str(tmp_path / 'store.db'))
+    store.set_bodies(prerender_bodies('market_prices', MARKET, limits=(10,)))
+    cache = ResponseCache(loader=store.get_body, published=published_names((10,)))
+
+    def build():
+        raise AssertionError('published bodies are not rebuilt')
+
+    with Flask(__name__).test_request_context(headers={'Accept-Encoding': 'gzip'}):
+        response = cache.respond(request, body_name('market-prices', 10), MARKET_SNAPSHOT, build)
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert response.headers['Vary'] == 'Accept-Encoding'
+    assert response.headers['ETag'].endswith('-gzip"')
+    assert json.loads(gzip.decompress(response.get_data()))['count'] == 2
+
+def test_bodies_of_the_next_version_are_not_served_for_the_current_one(tmp_path):
+    store = SQLiteStore(str(tmp_path / 'store.db'))
+    cache = ResponseCache(loader=store.get_body, published=published_names((10,)))
+    name = body_name('market-prices', 10)
+    # The collector publishes version 5 bodies before the cycle with the snapshot is written
+    store.set_bodies(prerender_bodies('market_prices', {**MARKET, 'version': 5, 'data': MARKET['data'][:1]},
+                                      limits=(10,)))
+
+    with Flask(__name__).test_request_context():
+        current = cache.respond(request, name, MARKET_SNAPSHOT,
+                                lambda: listing_body(MARKET_SNAPSHOT.data, MARKET_SNAPSHOT))
+    body = json.loads(current.get_data())
+    assert (body['version'], body['count']) == (4, 2)
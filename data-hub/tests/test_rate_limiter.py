@@ -0,0 +1,30 @@
+import fakeredis
+import pytest
+
+from utils.rate_limiter import RateLimiter, RedisTokenBucket, TokenBucket
+
+def test_bucket_starts_full_and_reports_wait_when_empty():
+    bucket = TokenBucket(rate_per_minute=60, capacity=2)
+    assert bucket.take() == 0.0
+    assert bucket.take() == 0.0
+    # One token per second, so the next one is about a second away
+    assert bucket.take() == pytest.approx(1.0, abs=0.05)
+
+def test_bucket_refills_with_elapsed_time():
+    bucket = TokenBucket(rate_per_minute=60, capacity=1)
+    assert bucket.take() == 0.0
+    bucket.updated -= 1.0
+    assert bucket.take() == 0.0
+
+def test_redis_buckets_share_one_quota():
+    client = fakeredis.FakeRedis()
+    first = RedisTokenBucket(client, 'ratelimit:test', rate_per_minute=60, capacity=2)
+    second = RedisTokenBucket(client, 'ratelimit:test', rate_per_minute=60, capacity=2)
+    assert first.take() == 0.0
+    assert second.take() == 0.0
+    assert first.take() > 0.0
+
+def test_acquire_gives_up_when_the_wait_exceeds_the_timeout():
+    limiter = RateLimiter({'coingecko': 1})
+    assert limiter.try_acquire('coingecko')
+    assert not limiter.acquire('coingecko', timeout=0.1)
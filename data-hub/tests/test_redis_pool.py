@@ -0,0 +1,47 @@
+from utils.redis_client import RedisClient
+from utils.redis_pool import CircuitBreaker, PoolMetrics
+
+def test_breaker_opens_after_consecutive_failures_only():
+    opened = []
+    breaker = CircuitBreaker(threshold=3, on_open=lambda: opened.append(True))
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker.record_success()
+    assert not breaker.record_failure()
+    assert breaker.allow()
+
+    breaker.record_failure()
+    assert breaker.record_failure()
+    assert breaker.is_open
+    # Refused calls make sure a reconnect is running
+    assert not breaker.allow()
+    assert len(opened) == 2
+
+    breaker.reset()
+    assert breaker.allow() and breaker.failures == 0
+
+def test_metrics_report_wait_times_and_error_rate():
+    metrics = PoolMetrics()
+    metrics.checkout(0.002)
+    metrics.checkout(0.004)
+    metrics.checkin()
+    metrics.error()
+    stats = metrics.as_dict()
+    assert stats['in_flight'] == 1
+    assert stats['checkouts'] == 2
+    assert stats['error_rate'] == 0.5
+    assert stats['pool_wait_avg_ms'] == 3.0
+    assert stats['pool_wait_max_ms'] == 4.0
+
+def test_open_circuit_serves_the_last_known_snapshot(monkeypatch):
+    store = RedisClient()
+    monkeypatch.setattr(store, '_ensure_reconnector', lambda: None)
+    store.breaker.on_open = None
+    store.set_data('market_prices', {'data': [], 'version': 3})
+    assert store.get_data_with_version('market_prices') == ({'data': [], 'version': 3}, 3)
+
+    store.breaker.trip()
+    assert store.get_data_with_version('market_prices') == ({'data': [], 'version': 3}, 3)
+    assert store.get_version('market_prices') == 3
+    assert not store.set_data('market_prices', {'data': [], 'version': 4})
+    assert store.stats()['circuit_open']
@@ -0,0 +1,58 @@
+import pytest
+from redis.exceptions import ConnectionError as RedisConnectionError
+
+from config.settings import Config
+from utils.redis_client import RedisClient
+
+@pytest.fixture
+def store():
+    store = RedisClient()
+    store.client.flushdb()
+    for i in range(25):
+        store.client.set(f"scan:test:{i}", i)
+    store.client.set('scan:test:expiring', 1, ex=60)
+    store.client.set('other:key', 1)
+    return store
+
+def _fail_after_first_scan(store, monkeypatch):
+    scan = store.client.scan
+    calls = []
+
+    def flaky_scan(*args, **kwargs):
+        calls.append(True)
+        if len(calls) > 1:
+            raise RedisConnectionError('connection lost')
+        return scan(*args, **kwargs)
+
+    monkeypatch.setattr(store.client, 'scan', flaky_scan)
+
+def test_scan_keys_matches_pattern(store):
+    keys = set(store.scan_keys('scan:test:*', count=5))
+    assert len(keys) == 26
+    assert 'other:key' not in keys
+    assert set(store.get_keys('scan:test:*')) == keys
+
+def test_scan_ttls_reports_expiry(store):
+    ttls = dict(store.scan_ttls('scan:test:*', count=5))
+    assert len(ttls) == 26
+    assert ttls['scan:test:0'] == -1
+    assert 0 < ttls['scan:test:expiring'] <= 60
+
+def test_delete_pattern_removes_in_batches(store):
+    assert store.delete_pattern('scan:test:*', count=4) == 26
+    assert list(store.scan_keys('scan:test:*')) == []
+    assert store.client.exists('other:key')
+
+def test_failed_scan_raises_instead_of_ending_early(store, monkeypatch):
+    _fail_after_first_scan(store, monkeypatch)
+    with pytest.raises(RedisConnectionError):
+        list(store.scan_keys('scan:test:*', count=2))
+    with pytest.raises(RedisConnectionError):
+        store.delete_pattern('scan:test:*', count=2)
+    # Only the first batch was deleted
+    assert len(store.client.keys('scan:test:*')) >= 24
+
+def test_get_keys_is_empty_when_scan_fails(store, monkeypatch):
+    monkeypatch.setattr(Config, 'REDIS_SCAN_COUNT', 2)
+    _fail_after_first_scan(store, monkeypatch)
+    assert store.get_keys('scan:test:*') == []
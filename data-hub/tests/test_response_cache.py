@@ -0,0 +1,70 @@
+import json
+
+from flask import Flask, request
+
+from utils.prerender import published_names
+from utils.response_cache import ResponseCache
+
+app = Flask(__name__)
+NAME = 'market-prices:10'
+
+def _respond(cache, source, headers=None, build=lambda: {'data': [1, 2, 3]}, name=NAME):
+    with app.test_request_context(headers=headers or {}):
+        return cache.respond(request, name, source, build)
+
+def test_published_body_is_built_once_per_source_snapshot():
+    cache = ResponseCache(published=[NAME])
+    builds = []
+
+    def build():
+        builds.append(True)
+        return {'data': len(builds)}
+
+    first, second = {'version': 1}, {'version': 2}
+    assert cache.get_body(NAME, first, build) is cache.get_body(NAME, first, build)
+    entry = cache.get_body(NAME, second, build)
+    assert len(builds) == 2
+    assert json.loads(entry.variants['identity']) == {'data': 2}
+    assert 'gzip' in entry.variants
+
+def test_etag_and_not_modified():
+    cache = ResponseCache(published=[NAME])
+    source = {'version': 1}
+    response = _respond(cache, source, {'Accept-Encoding': 'identity'})
+    assert response.status_code == 200
+    assert response.headers['Cache-Control'] == 'no-cache'
+    assert json.loads(response.get_data()) == {'data': [1, 2, 3]}
+
+    etag = response.headers['ETag']
+    revalidated = _respond(cache, source, {'Accept-Encoding': 'identity', 'If-None-Match': etag})
+    assert revalidated.status_code == 304
+
+    # A new snapshot changes the body and therefore the ETag
+    changed = _respond(cache, {'version': 2}, {'If-None-Match': etag}, build=lambda: {'data': [4]})
+    assert changed.status_code == 200
+
+def test_ad_hoc_bodies_are_not_compressed_or_cached():
+    cache = ResponseCache(published=[NAME])
+    source = {'version': 1}
+    _respond(cache, source)
+    for limit in range(500):
+        response = _respond(cache, source, {'Accept-Encoding': 'gzip'}, name=f"market-prices:{limit + 1000}")
+        assert 'Content-Encoding' not in response.headers
+    assert list(cache._entries) == [NAME]
+
+    # Still revalidates
+    etag = response.headers['ETag']
+    assert _respond(cache, source, {'If-None-Match': etag}, name='market-prices:1499').status_code == 304
+
+def test_least_recently_used_bodies_are_evicted():
+    cache = ResponseCache(published=['a', 'b', 'c'], max_entries=2)
+    source = {'version': 1}
+    for name in ('a', 'b', 'c'):
+        cache.get_body(name, source, lambda: {})
+    assert list(cache._entries) == ['b', 'c']
+
+def test_published_names_match_the_api_parameters():
+    names = published_names((10, 100))
+    assert {'market-prices:10', 'market-prices:100', 'top-coins:volume:True:20', 'staking-data:None',
+            'top-staking:20', 'market-movers:20', 'market-analytics', 'market-summary'} <= names
+    assert 'market-prices:50' not in names
@@ -0,0 +1,69 @@
+import asyncio
+
+import pytest
+
+from utils.scheduler import Scheduler
+
+def test_sources_are_due_immediately_and_then_run_on_wall_clock_slots():
+    scheduler = Scheduler({'prices': 120, 'defi': 300}, jitter=0)
+    assert scheduler.due(now=1000) == ['prices', 'defi']
+
+    scheduler.start('prices', now=1000)
+    assert scheduler.due(now=1000) == ['defi']
+    # Finishing late does not shift the cadence: the next run is the next multiple of 120
+    scheduler.record('prices', True, now=1010)
+    assert scheduler.sources['prices'].next_run == 1080
+    assert 'prices' not in scheduler.due(now=1079)
+    assert 'prices' in scheduler.due(now=1080)
+
+def test_jitter_stays_within_its_share_of_the_interval():
+    scheduler = Scheduler({'prices': 100}, jitter=0.1)
+    for _ in range(50):
+        scheduler.record('prices', True, now=1050)
+        assert 1100 <= scheduler.sources['prices'].next_run <= 1110
+
+def test_failures_back_off_exponentially_up_to_the_maximum():
+    scheduler = Scheduler({'prices': 120}, backoff_base=10, backoff_max=60)
+    delays = []
+    for _ in range(5):
+        scheduler.record('prices', False, now=0)
+        delays.append(scheduler.sources['prices'].next_run)
+    # Full jitter: each retry lands between half and all of min(max, base * 2^(n-1))
+    for delay, cap in zip(delays, (10, 20, 40, 60, 60)):
+        assert cap / 2 <= delay <= cap
+
+    scheduler.record('prices', True, now=0)
+    assert scheduler.sources['prices'].failures == 0
+
+def test_runs_that_never_report_back_expire_as_failures():
+    scheduler = Scheduler({'prices': 120, 'defi': 120}, backoff_base=10)
+    scheduler.start('prices', now=0)
+    scheduler.start('defi', now=50)
+    assert scheduler.expire_running(timeout=60, now=100) == ['prices']
+    assert scheduler.sources['prices'].failures == 1
+    assert scheduler.sources['defi'].running_since == 50
+
+def test_wait_time_is_the_earliest_idle_next_run():
+    scheduler = Scheduler({'prices': 120, 'defi': 300}, jitter=0)
+    scheduler.record('prices', True, now=0)
+    scheduler.record('defi', True, now=0)
+    assert scheduler.wait_time(now=20) == pytest.approx(100)
+
+def test_a_slow_source_does_not_delay_the_others():
+    scheduler = Scheduler({'prices': 0.02, 'defi': 0.02}, jitter=0)
+    runs = []
+
+    async def run(due):
+        runs.extend(due)
+        if due == ['defi']:
+            # Stuck on its rate limiter
+            await asyncio.sleep(10)
+        return {name: {} for name in due}
+
+    async def main():
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(scheduler.run_forever_async(run, max_sleep=0.01), 0.3)
+
+    asyncio.run(main())
+    assert runs.count('defi') == 1
+    assert runs.count('prices') > 3
@@ -0,0 +1,31 @@
+from utils.search_index import SearchIndex
+
+RECORDS = [
+    {'symbol': 'ETC', 'name': 'Ethereum Classic', 'market_cap_rank': 30},
+    {'symbol': 'BTC', 'name': 'Bitcoin', 'market_cap_rank': 1},
+    {'symbol': 'ETH', 'name': 'Ethereum', 'market_cap_rank': 2},
+    {'symbol': 'WBTC', 'name': 'Wrapped Bitcoin', 'market_cap_rank': None}
+]
+
+def symbols(results):
+    return [record['symbol'] for record in results]
+
+def test_short_queries_match_symbols_and_names_in_rank_order():
+    index = SearchIndex(RECORDS)
+    assert symbols(index.search('btc')) == ['BTC', 'WBTC']
+    assert symbols(index.search('et')) == ['ETH', 'ETC']
+
+def test_long_queries_match_substrings_case_insensitively():
+    index = SearchIndex(RECORDS)
+    assert symbols(index.search('  BitCoin ')) == ['BTC', 'WBTC']
+    assert symbols(index.search('ethereum', limit=1)) == ['ETH']
+
+def test_fuzzy_search_tolerates_typos():
+    index = SearchIndex(RECORDS)
+    assert index.search('etherum') == []
+    assert symbols(index.search('etherum', fuzzy=True))[:2] == ['ETH', 'ETC']
+
+def test_empty_query_and_zero_limit_return_nothing():
+    index = SearchIndex(RECORDS)
+    assert index.search('') == []
+    assert index.search('btc', limit=0) == []
@@ -0,0 +1,36 @@
+from utils.snapshot import Snapshot
+from utils.views import attach_views
+
+STAKING = [
+    {'symbol': 'ETH', 'id': 'ethereum', 'staking_apy': 3.5, 'market_cap': 370.0},
+    {'symbol': 'SOL', 'id': 'solana', 'staking_apy': 7.0, 'market_cap': 80.0},
+    {'symbol': 'ETH', 'id': 'ethereum-pow', 'staking_apy': 9.0, 'market_cap': 1.0},
+    {'symbol': 'ATOM', 'id': 'cosmos', 'staking_apy': None, 'market_cap': 3.0}
+]
+
+def test_lookups_by_symbol_and_id():
+    snapshot = Snapshot({'data': STAKING, 'version': 2})
+    # Records are ranked, so the first coin owns a shared symbol
+    assert snapshot.lookup('ETH')['id'] == 'ethereum'
+    assert snapshot.lookup('eth') is None
+    assert [record and record['id'] for record in snapshot.lookup_many(['SOL', 'DOGE'])] == ['solana', None]
+    assert snapshot.lookup_id('ethereum-pow') is STAKING[2]
+    assert snapshot.records_at([3, 0]) == (STAKING[3], STAKING[0])
+    assert snapshot.get('version') == 2
+
+def test_views_are_sorted_once_and_skip_missing_values():
+    payload = {'data': STAKING}
+    attach_views('staking_data', payload)
+    assert payload['views']['apy'] == [2, 1, 0]
+    assert payload['views']['market_cap'] == [0, 1, 3, 2]
+    assert attach_views('global_metrics', {'data': []}) == {'data': []}
+
+def test_top_reads_views_from_either_end():
+    snapshot = Snapshot({'data': STAKING}, 'staking_data')
+    assert [record['id'] for record in snapshot.top('apy', 2)] == ['ethereum-pow', 'solana']
+    assert [record['id'] for record in snapshot.top('apy', 2, ascending=True)] == ['ethereum', 'solana']
+    assert snapshot.top('apy', 0) == ()
+    assert snapshot.top('unknown', 5) == ()
+    # Published views are used as they are
+    published = Snapshot({'data': STAKING, 'views': {'apy': [1]}}, 'staking_data')
+    assert published.top('apy', 5) == (STAKING[1],)
@@ -0,0 +1,49 @@
+import time
+
+from utils.snapshot import Snapshot
+from utils.snapshot_cache import SnapshotCache
+from utils.sqlite_store import SQLiteStore
+
+def test_decoded_snapshots_are_reused_until_the_version_changes(tmp_path):
+    store = SQLiteStore(str(tmp_path / 'store.db'))
+    built = []
+
+    def build(payload):
+        built.append(payload['version'])
+        return Snapshot(payload)
+
+    # max_age=0 checks the version key on every read, as without a subscription
+    cache = SnapshotCache(store, max_age=0, builders={'market_prices': build})
+    assert cache.get('market_prices') is None
+
+    store.set_data('market_prices', {'data': [], 'version': 1})
+    first = cache.get('market_prices')
+    assert cache.get('market_prices') is first
+    assert cache.get_version('market_prices') == 1
+
+    store.set_data('market_prices', {'data': [], 'version': 2})
+    assert cache.get('market_prices').version == 2
+    assert built == [1, 2]
+
+    cache.invalidate('market_prices')
+    assert cache.get_version('market_prices') is None
+    assert cache.get('market_prices').version == 2
+    assert built == [1, 2, 2]
+
+def test_notifications_drop_entries_and_reach_listeners(tmp_path):
+    store = SQLiteStore(str(tmp_path / 'store.db'), poll_interval=0.01)
+    cache = SnapshotCache(store, max_age=60)
+    updates = []
+    cache.add_listener(updates.append)
+
+    deadline = time.monotonic() + 5
+    while not cache._listening and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert cache._listening
+
+    store.set_data('staking_data', {'data': [], 'version': 1})
+    assert cache.get('staking_data') == {'data': [], 'version': 1}
+    store.set_data('staking_data', {'data': [1], 'version': 2})
+    while 'staking_data' not in updates and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert cache.get('staking_data') == {'data': [1], 'version': 2}
@@ -0,0 +1,77 @@
+import pytest
+
+from utils.sqlite_store import SQLiteStore
+from utils.storage_backend import create_storage
+
+@pytest.fixture
+def store(tmp_path):
+    return SQLiteStore(str(tmp_path / 'store.db'), poll_interval=0.01)
+
+def test_versions_follow_the_payload_or_count_writes(store):
+    store.set_data('market_prices', {'data': [1], 'version': 5})
+    assert store.get_data_with_version('market_prices') == ({'data': [1], 'version': 5}, 5)
+
+    store.set_data('plain', {'data': []})
+    store.set_data('plain', {'data': []})
+    assert store.get_version('plain') == 2
+    assert store.get_version('missing') is None
+    assert store.get_data_with_version('missing') == (None, None)
+
+def test_expired_values_keep_their_version(store):
+    store.set_data('market_prices', {'data': [], 'version': 3}, ttl=-1)
+    assert store.get_data_with_version('market_prices') == (None, 3)
+
+    store.set_data('market_prices', {'data': [], 'version': 4}, ttl=-1)
+    assert store.expire_keys(['market_prices'], 60)
+    assert store.get_data('market_prices') == {'data': [], 'version': 4}
+
+def test_batch_writes_snapshots_deltas_and_symbol_records_together(store):
+    records = [{'symbol': 'BTC', 'id': 'bitcoin'}, {'symbol': 'ETH', 'id': 'ethereum'},
+               {'symbol': 'BTC', 'id': 'bitcoin-clone'}]
+    meta = {'source': 'coingecko', 'timestamp': '2024-01-01T00:00:00'}
+    write_id = store.set_data_batch(
+        {'market_prices': {'data': records, 'version': 2}, 'global_metrics': {'data': {}}},
+        deltas={'market_prices': {'changed': {'BTC': {}}}},
+        symbol_records={'market_prices': (records, meta)}
+    )
+    assert write_id is not None
+
+    snapshots = store.get_many_with_versions(['market_prices', 'global_metrics'])
+    assert snapshots['market_prices'][1] == 2
+    assert snapshots['global_metrics'][1] == 1
+    assert store.get_deltas('market_prices', [2, 1]) == [{'changed': {'BTC': {}}}, None]
+
+    found, found_meta = store.get_symbol_records('market_prices', ['BTC', 'DOGE'])
+    # The first (highest ranked) coin owns a shared symbol
+    assert found == [{'symbol': 'BTC', 'id': 'bitcoin'}, None]
+    assert found_meta == meta
+
+def test_bodies_replace_all_encodings(store):
+    store.set_bodies({'market_prices': {'identity': b'{}', 'gzip': b'gz'}})
+    assert store.get_body('market_prices') == {'identity': b'{}', 'gzip': b'gz'}
+    store.set_bodies({'market_prices': {'identity': b'[]'}})
+    assert store.get_body('market_prices') == {'identity': b'[]'}
+    assert store.get_body('missing') is None
+
+def test_subscription_announces_changed_versions(store):
+    store.set_data('market_prices', {'data': [], 'version': 1})
+    messages = store.subscribe_updates().listen()
+    store.set_data('market_prices', {'data': [], 'version': 2})
+    assert next(messages) == {'data': 'market_prices'}
+
+def test_create_storage_selects_sqlite():
+    assert isinstance(create_storage('sqlite'), SQLiteStore)
+    with pytest.raises(ValueError):
+        create_storage('memcached')
+
+def test_replacing_symbol_records_drops_symbols_that_left_the_set(store):
+    store.set_symbol_records('market_prices', [{'symbol': 'BTC'}, {'symbol': 'ETH'}])
+    store.set_symbol_records('market_prices', [{'symbol': 'SOL'}], replace=False)
+    assert store.get_symbol_records('market_prices', ['BTC', 'SOL'])[0] == [{'symbol': 'BTC'}, {'symbol': 'SOL'}]
+
+    store.set_symbol_records('market_prices', [{'symbol': 'ETH'}])
+    assert store.get_symbol_records('market_prices', ['BTC', 'ETH', 'SOL'])[0] == [None, {'symbol': 'ETH'}, None]
+    # Other layouts are untouched
+    store.set_symbol_records('staking_data', [{'symbol': 'DOT'}])
+    store.set_symbol_records('market_prices', [])
+    assert store.get_symbol_records('staking_data', ['DOT'])[0] == [{'symbol': 'DOT'}]
@@ -0,0 +1,38 @@
+import json
+
+import pytest
+
+from utils import stream_json
+from utils.stream_json import parse_head
+
+PROTOCOLS = [
+    {'name': 'Lido', 'tvl': 2.5e10, 'chains': ['Ethereum', 'Solana'], 'description': 'x' * 500,
+     'chainTvls': {'Ethereum': {'tvl': 2.4e10}}},
+    {'name': 'Aave', 'tvl': 1.1e10, 'category': 'Lending', 'audits': '2'},
+    'not an object',
+    {'name': 'Maker', 'tvl': None, 'chains': []},
+    {'name': 'Uniswap', 'tvl': 5e9}
+]
+BODY = json.dumps(PROTOCOLS).encode('utf-8')
+FIELDS = ('name', 'tvl', 'chains', 'chainTvls')
+
+def _expected(limit):
+    return [{field: item[field] for field in FIELDS if field in item}
+            for item in PROTOCOLS if isinstance(item, dict)][:limit]
+
+@pytest.mark.skipif(stream_json.ijson is None, reason='ijson not installed')
+def test_streaming_keeps_only_requested_fields():
+    assert parse_head(BODY, 3, FIELDS) == _expected(3)
+    assert parse_head(BODY, 10, FIELDS) == _expected(10)
+    assert parse_head(BODY, 0, FIELDS) == []
+
+@pytest.mark.skipif(stream_json.ijson is None, reason='ijson not installed')
+def test_parsing_stops_after_the_last_needed_object():
+    # Everything after the second object is invalid, but never reached
+    truncated = BODY[:BODY.index(b'"not an object"')] + b'{"broken'
+    assert parse_head(truncated, 2, FIELDS) == _expected(2)
+
+def test_full_parse_fallback_matches(monkeypatch):
+    monkeypatch.setattr(stream_json, 'ijson', None)
+    assert parse_head(BODY, 3, FIELDS) == _expected(3)
+    assert parse_head(BODY, 0, FIELDS) == []
@@ -0,0 +1,61 @@
+import asyncio
+import json
+
+from api.stream_server import PriceBroadcaster, Subscriber
+from utils.snapshot import Snapshot
+
+def _snapshot(version, prices):
+    return Snapshot({'version': version, 'timestamp': f"t{version}",
+                     'data': [{'id': coin_id, 'symbol': coin_id[:3].upper(), 'current_price': price}
+                              for coin_id, price in prices.items()]})
+
+class _Cache:
+    def __init__(self, *snapshots):
+        self.snapshots = list(snapshots)
+
+    def get(self, key):
+        return self.snapshots.pop(0)
+
+def _decode(event):
+    lines = dict(line.split(': ', 1) for line in event.decode('utf-8').strip().split('\n'))
+    return lines['event'], int(lines['id']), json.loads(lines['data'])
+
+def test_changed_coins_are_pushed_with_the_new_version():
+    async def run():
+        broadcaster = PriceBroadcaster(_Cache(_snapshot(1, {'bitcoin': 1.0, 'ethereum': 2.0, 'solana': 3.0}),
+                                              _snapshot(2, {'bitcoin': 1.5, 'ethereum': 2.0})))
+        everyone, bitcoin, ethereum = Subscriber(None), Subscriber({'BIT'}), Subscriber({'ETH'})
+        broadcaster.subscribers |= {everyone, bitcoin, ethereum}
+
+        await broadcaster.refresh()
+        assert broadcaster.version == 1 and everyone.queue.empty()
+        await broadcaster.refresh()
+        return broadcaster, everyone, bitcoin, ethereum
+
+    broadcaster, everyone, bitcoin, ethereum = asyncio.run(run())
+    event, event_id, data = _decode(everyone.queue.get_nowait())
+    assert (event, event_id, data['version']) == ('prices', 2, 2)
+    assert [coin['id'] for coin in data['changed']] == ['bitcoin']
+    assert data['removed'] == ['solana']
+    assert [coin['id'] for coin in _decode(bitcoin.queue.get_nowait())[2]['changed']] == ['bitcoin']
+    # Removals reach every subscriber
+    assert _decode(ethereum.queue.get_nowait())[2]['changed'] == []
+
+    event, event_id, data = _decode(broadcaster.snapshot_event({'ETH'}))
+    assert (event, event_id) == ('snapshot', 2)
+    assert [coin['id'] for coin in data['data']] == ['ethereum']
+
+def test_slow_subscribers_are_dropped():
+    async def run():
+        broadcaster = PriceBroadcaster(_Cache())
+        subscriber = Subscriber(None)
+        subscriber.queue = asyncio.Queue(maxsize=1)
+        broadcaster.subscribers.add(subscriber)
+        broadcaster._push(subscriber, b'first')
+        broadcaster._push(subscriber, b'second')
+        return broadcaster, subscriber
+
+    broadcaster, subscriber = asyncio.run(run())
+    assert subscriber not in broadcaster.subscribers
+    # The stream handler ends the response on None
+    assert subscriber.queue.get_nowait() is None
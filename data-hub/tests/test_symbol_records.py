@@ -0,0 +1,54 @@
+import pytest
+
+from utils.redis_client import RedisClient
+
+RECORDS = [
+    {'symbol': 'BTC', 'id': 'bitcoin', 'current_price': 64000.5, 'market_cap_rank': 1, 'tags': ['pow']},
+    {'symbol': 'ETH', 'id': 'ethereum', 'current_price': 3100.0, 'market_cap_rank': 2, 'tags': None},
+    {'symbol': 'BTC', 'id': 'bitcoin-clone', 'current_price': 1.0, 'market_cap_rank': 900, 'tags': []},
+    {'symbol': 'NEW', 'id': 'newcoin', 'current_price': 0.1, 'market_cap_rank': None}
+]
+
+@pytest.fixture
+def store():
+    store = RedisClient()
+    store.client.flushdb()
+    return store
+
+def test_records_round_trip_per_symbol(store):
+    meta = {'source': 'coingecko', 'timestamp': '2024-01-01T00:00:00'}
+    assert store.set_symbol_records('market_prices', RECORDS, meta=meta)
+
+    records, found_meta = store.get_symbol_records('market_prices', ['ETH', 'BTC', 'DOGE'])
+    # Field values keep their JSON types; the first (highest ranked) coin owns a shared symbol
+    assert records == [RECORDS[1], RECORDS[0], None]
+    assert found_meta == meta
+    assert store.get_symbol_record('market_prices', 'NEW') == RECORDS[3]
+    assert 0 < store.client.ttl('coin:BTC') <= 300
+
+def test_rank_index_skips_missing_values(store):
+    store.set_symbol_records('market_prices', RECORDS)
+    assert store.get_index_range('coin_index:rank') == ['BTC', 'ETH']
+    assert store.get_index_range('coin_index:rank', 0, 0, desc=True) == ['ETH']
+
+def test_pages_merge_into_the_index_unless_replacing(store):
+    store.set_symbol_records('market_prices', RECORDS[:1])
+    store.set_symbol_records('market_prices', RECORDS[1:2], replace=False)
+    assert store.get_index_range('coin_index:rank') == ['BTC', 'ETH']
+
+    store.set_symbol_records('market_prices', RECORDS[1:2])
+    assert store.get_index_range('coin_index:rank') == ['ETH']
+
+def test_replacing_drops_symbols_that_left_the_set(store):
+    store.set_symbol_records('market_prices', RECORDS[:2])
+    store.set_data_batch({'market_prices': {'data': RECORDS[1:2]}},
+                         symbol_records={'market_prices': (RECORDS[1:2], None)})
+
+    records, _ = store.get_symbol_records('market_prices', ['BTC', 'ETH'])
+    assert records == [None, RECORDS[1]]
+
+    # Merged pages keep the symbols of earlier pages
+    store.set_symbol_records('market_prices', RECORDS[:1], replace=False)
+    store.set_symbol_records('market_prices', RECORDS[3:], replace=False)
+    records, _ = store.get_symbol_records('market_prices', ['BTC', 'ETH', 'NEW'])
+    assert records == [RECORDS[0], RECORDS[1], RECORDS[3]]
@@ -0,0 +1,44 @@
+from typing import Dict
+
+from utils.snapshot import Snapshot
+
+# Coins whose market cap share is reported as dominance
+DOMINANCE_SYMBOLS = ('BTC', 'ETH')
+
+def market_analytics(snapshot: Snapshot) -> Dict:
+    """Market-wide aggregates over a market_prices snapshot, computed on its NumPy columns"""
+    columns = snapshot.columns
+    total_market_cap = columns.total('market_cap')
+    change = columns['change_24h']
+
+    dominance = {}
+    for symbol in DOMINANCE_SYMBOLS:
+        coin = snapshot.lookup(symbol)
+        if coin and coin.get('market_cap') and total_market_cap:
+            dominance[symbol] = coin['market_cap'] / total_market_cap * 100
+
+    return {
+        'total_coins': len(columns),
+        'total_market_cap': total_market_cap,
+        'total_volume': columns.total('volume'),
+        'dominance': dominance,
+        'volume_weighted_change_24h': columns.weighted_mean('change_24h', 'volume'),
+        'market_cap_weighted_change_24h': columns.weighted_mean('change_24h', 'market_cap'),
+        'advancers': int((change > 0).sum()),
+        'decliners': int((change < 0).sum()),
+        'version': snapshot.version,
+        'timestamp': snapshot.timestamp,
+        'source': snapshot.source
+    }
+
+def market_movers(snapshot: Snapshot, limit: int = 20) -> Dict:
+    """Biggest 24h gainers and losers of a market_prices snapshot"""
+    columns = snapshot.columns
+    return {
+        'gainers': list(snapshot.records_at(columns.order('change_24h', limit=limit))),
+        'losers': list(snapshot.records_at(columns.order('change_24h', ascending=True, limit=limit))),
+        'limit': limit,
+        'version': snapshot.version,
+        'timestamp': snapshot.timestamp,
+        'source': snapshot.source
+    }
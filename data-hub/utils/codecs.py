@@ -0,0 +1,77 @@
+import json
+import zlib
+from typing import Any, Dict, Union
+
+try:
+    import msgpack
+except ImportError:  # msgpack is optional, JSON is always available
+    msgpack = None
+
+# Tagged values start with a NUL byte, which JSON text never does, so untagged values are read as legacy JSON.
+# Layout: MAGIC, codec tag, compression tag, body.
+MAGIC = b'\x00'
+UNCOMPRESSED = b'-'
+ZLIB = b'z'
+
+class JsonCodec:
+    name = 'json'
+    tag = b'j'
+
+    def encode(self, value: Any) -> bytes:
+        return json.dumps(value, separators=(',', ':')).encode('utf-8')
+
+    def decode(self, body: bytes) -> Any:
+        return json.loads(body)
+
+class MsgpackCodec:
+    """Binary encoding; floats and ints are stored natively instead of as decimal text"""
+    name = 'msgpack'
+    tag = b'm'
+
+    def encode(self, value: Any) -> bytes:
+        return msgpack.packb(value, use_bin_type=True)
+
+    def decode(self, body: bytes) -> Any:
+        return msgpack.unpackb(body, raw=False, strict_map_key=False)
+
+CODECS: Dict[str, Any] = {'json': JsonCodec()}
+if msgpack is not None:
+    CODECS['msgpack'] = MsgpackCodec()
+_BY_TAG = {codec.tag: codec for codec in CODECS.values()}
+
+class PayloadSerializer:
+    """Encodes values for Redis with a codec and compresses bodies above a size threshold.
+
+    Every value carries its codec and compression tags, so values written with
+    different settings (or before tagging existed) can be read side by side while
+    a new codec rolls out.
+    """
+
+    def __init__(self, codec: str = 'json', compress_threshold: int = 4096, compress_level: int = 1):
+        if codec not in CODECS:
+            raise ValueError(f"Unknown or unavailable codec {codec!r} (available: {', '.join(CODECS)})")
+        self.codec = CODECS[codec]
+        self.compress_threshold = compress_threshold
+        self.compress_level = compress_level
+
+    def dumps(self, value: Any) -> bytes:
+        body = self.codec.encode(value)
+        compression = UNCOMPRESSED
+        if self.compress_threshold and len(body) >= self.compress_threshold:
+            compressed = zlib.compress(body, self.compress_level)
+            if len(compressed) < len(body):
+                body, compression = compressed, ZLIB
+        return MAGIC + self.codec.tag + compression + body
+
+    @staticmethod
+    def loads(raw: Union[bytes, str]) -> Any:
+        if isinstance(raw, str) or not raw.startswith(MAGIC):
+            return json.loads(raw)
+
+        codec = _BY_TAG.get(raw[1:2])
+        if codec is None:
+            raise ValueError(f"Value encoded with unavailable codec tag {raw[1:2]!r}")
+        body = raw[3:]
+        if raw[2:3] == ZLIB:
+            body = zlib.decompress(body)
+        return codec.decode(body)
@@ -0,0 +1,73 @@
+from typing import Dict, List, Tuple
+
+# Fields that change on every collection without carrying information
+IGNORED_FIELDS = frozenset({'last_updated'})
+
+def _differs(old: Dict, new: Dict) -> bool:
+    if old.keys() != new.keys():
+        return True
+    return any(new[field] != old[field] for field in new if field not in IGNORED_FIELDS)
+
+def diff_records(previous: Dict[str, Dict], current: Dict[str, Dict]) -> Tuple[List[Dict], List[str]]:
+    """Compare two keyed record sets: (new or changed records, removed keys)"""
+    changed = [
+        record for key, record in current.items()
+        if key not in previous or _differs(previous[key], record)
+    ]
+    removed = [key for key in previous if key not in current]
+    return changed, removed
+
+def field_diff(previous: Dict[str, Dict], current: Dict[str, Dict]) -> Dict:
+    """Per-field delta between two keyed record sets.
+
+    Changed records only carry the fields that differ (plus last_updated); new records
+    are sent whole.
+    """
+    changed = {}
+    added = []
+    for key, record in current.items():
+        old = previous.get(key)
+        if old is None:
+            added.append(record)
+            continue
+
+        fields = {
+            field: value for field, value in record.items()
+            if field not in IGNORED_FIELDS and old.get(field) != value
+        }
+        if fields:
+            fields.update({field: record[field] for field in IGNORED_FIELDS if field in record})
+            changed[key] = fields
+
+    return {
+        'changed': changed,
+        'added': added,
+        'removed': [key for key in previous if key not in current]
+    }
+
+def merge_deltas(deltas: List[Dict], key_field: str = 'id') -> Dict:
+    """Fold consecutive deltas (oldest first) into one delta"""
+    changed: Dict[str, Dict] = {}
+    added: Dict[str, Dict] = {}
+    removed = set()
+
+    for delta in deltas:
+        for key in delta['removed']:
+            changed.pop(key, None)
+            added.pop(key, None)
+            removed.add(key)
+        for record in delta['added']:
+            removed.discard(record[key_field])
+            changed.pop(record[key_field], None)
+            added[record[key_field]] = record
+        for key, fields in delta['changed'].items():
+            if key in added:
+                added[key] = {**added[key], **fields}
+            else:
+                changed.setdefault(key, {}).update(fields)
+
+    return {
+        'changed': changed,
+        'added': list(added.values()),
+        'removed': sorted(removed)
+    }
@@ -0,0 +1,173 @@
+import logging
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+from config.settings import Config
+
+# Which record fields are kept as history, per collected key
+HISTORY_METRICS = {
+    'market_prices': {'price': 'current_price', 'market_cap': 'market_cap', 'volume': 'total_volume'},
+    'staking_data': {'apy': 'staking_apy'}
+}
+METRICS = frozenset(metric for metrics in HISTORY_METRICS.values() for metric in metrics)
+
+# Resolution tiers, finest first: (name, bucket seconds, retention seconds or None to keep forever)
+TIERS = (
+    ('raw', 1, 6 * 3600),
+    ('1m', 60, 2 * 86400),
+    ('1h', 3600, 90 * 86400),
+    ('1d', 86400, None)
+)
+
+def _parse_timestamp(timestamp: str) -> int:
+    return int(datetime.fromisoformat(timestamp).timestamp())
+
+class HistoryStore:
+    """Embedded time-series store (SQLite) for prices and APYs.
+
+    Every appended point is folded into each tier as an open/high/low/close bucket, so
+    the rollups are maintained on write and a range query is a single primary key seek
+    on the finest tier that answers it within max_points. Tables are WITHOUT ROWID and
+    clustered on (metric, symbol, bucket).
+    """
+
+    PRUNE_INTERVAL = 3600
+
+    def __init__(self, path: str, max_points: int = 1000, raw_step: int = 60):
+        self.logger = logging.getLogger(__name__)
+        self.path = path
+        self.max_points = max_points
+        self.raw_step = raw_step
+        self._lock = threading.Lock()
+        self._last_prune = 0.0
+        self._conn: Optional[sqlite3.Connection] = None
+        self._pid = None
+
+    def _connect(self) -> sqlite3.Connection:
+        # A forked worker must not share its parent's connection
+        if self._conn is None or self._pid != os.getpid():
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            # WAL lets the API read while a collector process appends
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            for tier, _, _ in TIERS:
+                conn.execute(f"""
+                    CREATE TABLE IF NOT EXISTS history_{tier} (
+                        metric TEXT NOT NULL,
+                        symbol TEXT NOT NULL,
+                        bucket INTEGER NOT NULL,
+                        open REAL, high REAL, low REAL, close REAL,
+                        samples INTEGER NOT NULL,
+                        PRIMARY KEY (metric, symbol, bucket)
+                    ) WITHOUT ROWID
+                """)
+            conn.commit()
+            self._conn, self._pid = conn, os.getpid()
+        return self._conn
+
+    def _points(self, key: str, payload: Dict) -> List[Tuple[str, str, int, float]]:
+        metrics = HISTORY_METRICS.get(key)
+        if not metrics or not payload.get('data'):
+            return []
+
+        ts = _parse_timestamp(payload['timestamp'])
+        points = []
+        seen = set()
+        for record in payload['data']:
+            symbol = record.get('symbol')
+            # Same rule as the symbol hashes: the first (best ranked) coin owns a symbol
+            if not symbol or symbol in seen:
+                continue
+            seen.add(symbol)
+            for metric, field in metrics.items():
+                value = record.get(field)
+                if value is not None:
+                    points.append((metric, symbol, ts, float(value)))
+        return points
+
+    def append(self, key: str, payload: Dict) -> int:
+        """Append one collected payload to every tier; returns the number of points written"""
+        points = self._points(key, payload)
+        if not points:
+            return 0
+
+        try:
+            with self._lock:
+                conn = self._connect()
+                with conn:
+                    for tier, seconds, _ in TIERS:
+                        conn.executemany(f"""
+                            INSERT INTO history_{tier} (metric, symbol, bucket, open, high, low, close, samples)
+                            VALUES (?, ?, ?, ?, ?, ?, ?, 1)
+                            ON CONFLICT (metric, symbol, bucket) DO UPDATE SET
+                                high = max(high, excluded.high),
+                                low = min(low, excluded.low),
+                                close = excluded.close,
+                                samples = samples + 1
+                        """, [
+                            (metric, symbol, ts - ts % seconds, value, value, value, value)
+                            for metric, symbol, ts, value in points
+                        ])
+                self._prune(conn)
+            return len(points)
+        except sqlite3.Error as e:
+            self.logger.error(f"Error appending history for {key}: {e}")
+            return 0
+
+    def _prune(self, conn: sqlite3.Connection):
+        now = time.time()
+        if now - self._last_prune < self.PRUNE_INTERVAL:
+            return
+        self._last_prune = now
+        with conn:
+            for tier, _, retention in TIERS:
+                if retention is not None:
+                    conn.execute(f"DELETE FROM history_{tier} WHERE bucket < ?", (int(now) - retention,))
+
+    def select_tier(self, start: int, end: int, now: Optional[float] = None) -> str:
+        """Finest tier that still covers start and returns at most max_points buckets"""
+        now = time.time() if now is None else now
+        for tier, seconds, retention in TIERS:
+            step = max(seconds, self.raw_step) if tier == 'raw' else seconds
+            if retention is not None and start < now - retention:
+                continue
+            if (end - start) / step <= self.max_points:
+                return tier
+        return TIERS[-1][0]
+
+    def query(self, symbol: str, metric: str, start: int, end: int,
+              resolution: Optional[str] = None) -> Tuple[str, List[Dict]]:
+        """Range query for one series: (resolution used, points oldest first)"""
+        tiers = {tier: seconds for tier, seconds, _ in TIERS}
+        if resolution not in tiers:
+            resolution = self.select_tier(start, end)
+        seconds = tiers[resolution]
+
+        try:
+            with self._lock:
+                rows = self._connect().execute(f"""
+                    SELECT bucket, open, high, low, close, samples FROM history_{resolution}
+                    WHERE metric = ? AND symbol = ? AND bucket BETWEEN ? AND ?
+                    ORDER BY bucket
+                """, (metric, symbol, start - start % seconds, end)).fetchall()
+        except sqlite3.Error as e:
+            self.logger.error(f"Error querying history for {symbol}: {e}")
+            return resolution, []
+
+        return resolution, [
+            {
+                'timestamp': datetime.fromtimestamp(bucket, timezone.utc).isoformat(),
+                'open': open_, 'high': high, 'low': low, 'close': close, 'samples': samples
+            }
+            for bucket, open_, high, low, close, samples in rows
+        ]
+
+# Global history store instance (connects lazily)
+history_store = HistoryStore(Config.HISTORY_DB_PATH, Config.HISTORY_MAX_POINTS, Config.COLLECTION_INTERVAL)
@@ -0,0 +1,141 @@
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+_MAX_AGE = re.compile(r'max-age=(\d+)')
+
+class CachedResponse:
+    """An upstream response body with its validators"""
+
+    def __init__(self, body: bytes, etag: Optional[str] = None, last_modified: Optional[str] = None,
+                 expires: float = 0.0, fetched_at: Optional[float] = None):
+        self.body = body
+        self.etag = etag
+        self.last_modified = last_modified
+        self.expires = expires
+        self.fetched_at = time.time() if fetched_at is None else fetched_at
+        self.content_hash = hashlib.blake2b(body, digest_size=16).hexdigest()
+
+    def is_fresh(self, now: Optional[float] = None) -> bool:
+        """Within the upstream's Cache-Control max-age, so no request is needed at all"""
+        return (time.time() if now is None else now) < self.expires
+
+    def json(self) -> Any:
+        return json.loads(self.body)
+
+class UpstreamCache:
+    """HTTP cache for collector requests, persisted to disk.
+
+    Keeps the last body and validators (ETag, Last-Modified) per URL so requests can
+    be conditional, answers from the cache while the upstream's max-age holds, and
+    tells the caller whether the content actually changed. Entries survive restarts,
+    so a restarted collector does not refetch everything at once.
+    """
+
+    def __init__(self, directory: Optional[str] = None):
+        self.logger = logging.getLogger(__name__)
+        self.directory = directory
+        self._entries: Dict[str, CachedResponse] = {}
+        self._lock = threading.Lock()
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def key(url: str, params: Optional[Dict] = None) -> str:
+        request = json.dumps([url, sorted((params or {}).items())], default=str)
+        return hashlib.blake2b(request.encode('utf-8'), digest_size=16).hexdigest()
+
+    def _path(self, key: str, suffix: str) -> str:
+        return os.path.join(self.directory, f"{key}.{suffix}")
+
+    def get(self, url: str, params: Optional[Dict] = None) -> Optional[CachedResponse]:
+        key = self.key(url, params)
+        entry = self._entries.get(key)
+        if entry is None and self.directory:
+            entry = self._load(key)
+            if entry is not None:
+                self._entries[key] = entry
+        return entry
+
+    def _load(self, key: str) -> Optional[CachedResponse]:
+        try:
+            with open(self._path(key, 'json')) as f:
+                meta = json.load(f)
+            with open(self._path(key, 'body'), 'rb') as f:
+                body = f.read()
+        except (OSError, ValueError):
+            return None
+        entry = CachedResponse(body, meta.get('etag'), meta.get('last_modified'),
+                               meta.get('expires', 0.0), meta.get('fetched_at'))
+        # A half-written pair (crash between the two files) is ignored
+        return entry if entry.content_hash == meta.get('content_hash') else None
+
+    def _save(self, key: str, entry: CachedResponse, body_changed: bool = True):
+        if not self.directory:
+            return
+        meta = {
+            'etag': entry.etag,
+            'last_modified': entry.last_modified,
+            'expires': entry.expires,
+            'fetched_at': entry.fetched_at,
+            'content_hash': entry.content_hash
+        }
+        try:
+            files = [('json', json.dumps(meta).encode('utf-8'))]
+            if body_changed:
+                files.insert(0, ('body', entry.body))
+            for suffix, content in files:
+                tmp = self._path(key, f"{suffix}.{os.getpid()}.tmp")
+                with open(tmp, 'wb') as f:
+                    f.write(content)
+                os.replace(tmp, self._path(key, suffix))
+        except OSError as e:
+            self.logger.error(f"Error persisting cached response {key}: {e}")
+
+    @staticmethod
+    def conditional_headers(entry: Optional[CachedResponse]) -> Dict[str, str]:
+        """If-None-Match / If-Modified-Since headers for revalidating entry"""
+        headers = {}
+        if entry is not None:
+            if entry.etag:
+                headers['If-None-Match'] = entry.etag
+            if entry.last_modified:
+                headers['If-Modified-Since'] = entry.last_modified
+        return headers
+
+    @staticmethod
+    def _expires(headers: Mapping[str, str]) -> float:
+        cache_control = headers.get('Cache-Control', '')
+        match = _MAX_AGE.search(cache_control)
+        if not match or 'no-cache' in cache_control or 'no-store' in cache_control:
+            return 0.0
+        return time.time() + int(match.group(1))
+
+    def store(self, url: str, params: Optional[Dict], headers: Mapping[str, str],
+              body: bytes) -> Tuple[CachedResponse, bool]:
+        """Record a 200 response; returns (entry, whether the content differs from the cached one)"""
+        key = self.key(url, params)
+        previous = self.get(url, params)
+        entry = CachedResponse(body, headers.get('ETag'), headers.get('Last-Modified'), self._expires(headers))
+        changed = previous is None or previous.content_hash != entry.content_hash
+        with self._lock:
+            self._entries[key] = entry
+            self._save(key, entry, body_changed=changed)
+        return entry, changed
+
+    def revalidate(self, url: str, params: Optional[Dict], headers: Mapping[str, str]) -> Optional[CachedResponse]:
+        """Record a 304 response: the cached body is still current"""
+        entry = self.get(url, params)
+        if entry is None:
+            return None
+        with self._lock:
+            entry.expires = self._expires(headers)
+            entry.fetched_at = time.time()
+            entry.etag = headers.get('ETag', entry.etag)
+            self._save(self.key(url, params), entry, body_changed=False)
+        return entry
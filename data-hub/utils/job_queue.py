@@ -0,0 +1,108 @@
+import json
+import logging
+import os
+import socket
+import time
+import uuid
+from typing import Dict, Optional
+
+class JobQueue:
+    """Reliable Redis job queue with per-job dedupe.
+
+    A job name can only be pending or running once: enqueue takes a dedupe key that
+    is released when the job completes (or expires after dedupe_ttl if its worker
+    died), so any number of workers never fetch the same source twice. Reserved
+    jobs are moved to a processing list until they complete.
+    """
+
+    def __init__(self, client, name: str = 'datahub:jobs', dedupe_ttl: int = 600):
+        self.logger = logging.getLogger(__name__)
+        self.client = client
+        self.name = name
+        self.processing = f"{name}:processing"
+        self.results = f"{name}:results"
+        self.dedupe_ttl = dedupe_ttl
+
+    def _dedupe_key(self, job_name: str) -> str:
+        return f"{self.name}:pending:{job_name}"
+
+    def enqueue(self, job_name: str, payload: Optional[Dict] = None) -> bool:
+        """Queue a job unless the same job is still pending or running"""
+        job = {
+            'id': uuid.uuid4().hex,
+            'name': job_name,
+            'payload': payload or {},
+            'enqueued_at': time.time()
+        }
+        if not self.client.set(self._dedupe_key(job_name), job['id'], nx=True, ex=self.dedupe_ttl):
+            return False
+        self.client.lpush(self.name, json.dumps(job))
+        return True
+
+    def reserve(self, timeout: int = 5) -> Optional[Dict]:
+        """Block up to timeout seconds for the next job and move it to the processing list"""
+        raw = self.client.brpoplpush(self.name, self.processing, timeout)
+        if raw is None:
+            return None
+        job = json.loads(raw)
+        job['_raw'] = raw
+        return job
+
+    def complete(self, job: Dict, success: bool = True):
+        """Drop a finished job, release its dedupe key and report its outcome to the scheduler"""
+        pipe = self.client.pipeline(transaction=True)
+        pipe.lrem(self.processing, 1, job['_raw'])
+        pipe.delete(self._dedupe_key(job['name']))
+        pipe.hset(self.results, job['name'], int(success))
+        pipe.execute()
+    
+    def pop_results(self) -> Dict[str, bool]:
+        """Outcomes of the jobs completed since the last call, by job name"""
+        pipe = self.client.pipeline(transaction=True)
+        pipe.hgetall(self.results)
+        pipe.delete(self.results)
+        results = pipe.execute()[0]
+        return {name: value == '1' for name, value in results.items()}
+
+    def purge_stale(self, max_age: Optional[int] = None) -> int:
+        """Drop processing entries older than max_age (their worker died); returns how many"""
+        max_age = self.dedupe_ttl if max_age is None else max_age
+        removed = 0
+        for raw in self.client.lrange(self.processing, 0, -1):
+            if time.time() - json.loads(raw)['enqueued_at'] > max_age:
+                removed += self.client.lrem(self.processing, 1, raw)
+        return removed
+
+    def depth(self) -> int:
+        return self.client.llen(self.name)
+
+class LeaderElection:
+    """Single-leader election on a Redis key with a TTL.
+
+    Every candidate calls ensure() on each tick; the holder keeps renewing the key,
+    and if it dies the key expires and another candidate takes over.
+    """
+
+    def __init__(self, client, key: str = 'datahub:scheduler:leader', ttl: int = 15):
+        self.client = client
+        self.key = key
+        self.ttl = ttl
+        self.identity = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.lock = client.lock(key, timeout=ttl, blocking=False)
+
+    def ensure(self) -> bool:
+        """Acquire or renew leadership; returns whether this process is the leader"""
+        try:
+            if self.lock.owned():
+                self.lock.reacquire()
+                return True
+            return bool(self.lock.acquire(blocking=False, token=self.identity))
+        except Exception:
+            return False
+
+    def release(self):
+        try:
+            if self.lock.owned():
+                self.lock.release()
+        except Exception:
+            pass
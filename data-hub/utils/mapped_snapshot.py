@@ -0,0 +1,301 @@
+import bisect
+import json
+import logging
+import mmap
+import os
+import struct
+import time
+from collections.abc import Sequence
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from config.settings import Config
+from utils.market_columns import NUMERIC_COLUMNS, MarketColumns, _number
+from utils.search_index import SearchIndex
+from utils.views import build_views
+
+# Snapshots the collector publishes as files and the API workers map. Every writer of
+# these keys publishes a file (staking_data also comes from the staking collector, and
+# a file it never replaces would shadow its writes, so it is not mapped)
+MAPPED_KEYS = ('market_prices',)
+
+# Layout (little-endian): header, section table, then 8-byte aligned sections.
+# Header: magic, snapshot version (-1 if none), record count, ttl seconds, section count.
+# Section table entries: name (NUL padded), offset, length in bytes.
+MAGIC = b'CWSNAP01'
+HEADER = struct.Struct('<8sqIII4x')
+SECTION = struct.Struct('<16sQQ')
+INDEXED_FIELDS = ('symbol', 'id')
+
+def _align(size: int) -> int:
+    return (size + 7) & ~7
+
+def _encode_snapshot(key: Optional[str], payload: Dict, ttl: int) -> bytes:
+    records = payload.get('data', [])
+    count = len(records)
+    encoded = [json.dumps(record, separators=(',', ':')).encode('utf-8') for record in records]
+
+    sections: List[Tuple[str, bytes]] = [
+        ('meta', json.dumps({'timestamp': payload.get('timestamp'), 'source': payload.get('source')}).encode('utf-8')),
+        ('records.off', np.cumsum([0] + [len(body) for body in encoded], dtype=np.uint64).tobytes()),
+        ('records', b''.join(encoded))
+    ]
+
+    # Sorted keys next to their positions, so lookups binary search without decoding records.
+    # Ties keep the lowest position first: records are ranked, the first coin owns a shared symbol.
+    for field in INDEXED_FIELDS:
+        entries = sorted((record[field].encode('utf-8'), position)
+                         for position, record in enumerate(records) if record.get(field))
+        keys = [name for name, _ in entries]
+        sections += [
+            (f'keys.{field}.off', np.cumsum([0] + [len(name) for name in keys], dtype=np.uint32).tobytes()),
+            (f'keys.{field}', b''.join(keys)),
+            (f'index.{field}', np.array([position for _, position in entries], dtype=np.uint32).tobytes())
+        ]
+
+    views = payload.get('views')
+    if views is None and key is not None:
+        views = build_views(key, records)
+    for name, positions in (views or {}).items():
+        sections.append((f'view.{name}', np.array(positions, dtype=np.uint32).tobytes()))
+
+    if key == 'market_prices':
+        for column, field in NUMERIC_COLUMNS.items():
+            values = np.fromiter((_number(record.get(field)) for record in records), dtype=np.float64, count=count)
+            sections.append((f'col.{column}', values.tobytes()))
+
+    version = payload.get('version')
+    offset = _align(HEADER.size + SECTION.size * len(sections))
+    table, body = [], []
+    for name, data in sections:
+        table.append(SECTION.pack(name.encode('ascii'), offset, len(data)))
+        padded = data + b'\x00' * (_align(len(data)) - len(data))
+        body.append(padded)
+        offset += len(padded)
+
+    head = HEADER.pack(MAGIC, -1 if version is None else version, count, ttl, len(sections)) + b''.join(table)
+    return head + b'\x00' * (_align(len(head)) - len(head)) + b''.join(body)
+
+class _Records(Sequence):
+    """Records of a mapped snapshot, each decoded from its own slice when accessed"""
+
+    def __init__(self, snapshot: 'MappedSnapshot'):
+        self.snapshot = snapshot
+
+    def __len__(self) -> int:
+        return self.snapshot.size
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return tuple(self.snapshot.record(i) for i in range(*index.indices(self.snapshot.size)))
+        if index < 0:
+            index += self.snapshot.size
+        if not 0 <= index < self.snapshot.size:
+            raise IndexError('record index out of range')
+        return self.snapshot.record(index)
+
+class _SortedKeys(Sequence):
+    """Sorted index keys as bytes, for bisect"""
+
+    def __init__(self, snapshot: 'MappedSnapshot', field: str):
+        self.snapshot = snapshot
+        self.base = snapshot.sections[f'keys.{field}'][0]
+        self.offsets = snapshot.array(f'keys.{field}.off', np.uint32)
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index: int) -> bytes:
+        return self.snapshot.map[self.base + int(self.offsets[index]):self.base + int(self.offsets[index + 1])]
+
+class MappedSnapshot:
+    """Read-only view of a snapshot file written by MappedSnapshots.publish (or see packed_snapshot).
+
+    The file is mapped, not read: numeric columns, views and indexes are NumPy arrays
+    over the mapping and every API worker on the host shares the same pages. Only the
+    small meta section is parsed when the file is opened. Records are decoded one by
+    one for the rows a request returns. Offers the same reads as utils.snapshot.Snapshot.
+    """
+
+    def __init__(self, buffer):
+        self.map = buffer
+        magic, version, self.size, self.ttl, section_count = HEADER.unpack_from(self.map, 0)
+        if magic != MAGIC:
+            raise ValueError('Not a snapshot file')
+        self.version = None if version < 0 else version
+
+        self.sections: Dict[str, Tuple[int, int]] = {}
+        for i in range(section_count):
+            name, offset, length = SECTION.unpack_from(self.map, HEADER.size + i * SECTION.size)
+            self.sections[name.rstrip(b'\x00').decode('ascii')] = (offset, length)
+
+        meta = json.loads(self.section('meta'))
+        self.timestamp = meta.get('timestamp')
+        self.source = meta.get('source')
+
+        self.data = _Records(self)
+        self._record_offsets = self.array('records.off', np.uint64)
+        self._records_base = self.sections['records'][0]
+        self._keys = {field: _SortedKeys(self, field) for field in INDEXED_FIELDS}
+        self._index = {field: self.array(f'index.{field}', np.uint32) for field in INDEXED_FIELDS}
+        self.views: Dict[str, np.ndarray] = {
+            name[len('view.'):]: self.array(name, np.uint32) for name in self.sections if name.startswith('view.')
+        }
+
+        self._search_index: Optional[SearchIndex] = None
+        self._columns = None
+
+    def section(self, name: str) -> bytes:
+        offset, length = self.sections[name]
+        return self.map[offset:offset + length]
+
+    def array(self, name: str, dtype) -> np.ndarray:
+        """Zero-copy (read-only) array over a section"""
+        offset, length = self.sections[name]
+        return np.frombuffer(self.map, dtype=dtype, count=length // np.dtype(dtype).itemsize, offset=offset)
+
+    def record(self, position: int) -> Dict:
+        start, end = self._record_offsets[position], self._record_offsets[position + 1]
+        return json.loads(self.map[self._records_base + int(start):self._records_base + int(end)])
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Dict-style access like Snapshot.get"""
+        if key == 'data':
+            return self.data
+        if key in ('timestamp', 'source', 'version'):
+            return getattr(self, key)
+        return default
+
+    def _find(self, field: str, value: str) -> Optional[Dict]:
+        keys = self._keys[field]
+        target = value.encode('utf-8')
+        i = bisect.bisect_left(keys, target)
+        if i < len(keys) and keys[i] == target:
+            return self.record(int(self._index[field][i]))
+        return None
+
+    def lookup(self, symbol: str) -> Optional[Dict]:
+        """Find a record by (upper-case) symbol"""
+        return self._find('symbol', symbol)
+
+    def lookup_many(self, symbols: Iterable[str]) -> List[Optional[Dict]]:
+        """Find records for several symbols, None where a symbol is unknown"""
+        return [self._find('symbol', symbol) for symbol in symbols]
+
+    def lookup_id(self, coin_id: str) -> Optional[Dict]:
+        """Find a record by CoinGecko id"""
+        return self._find('id', coin_id)
+
+    def records_at(self, positions: Iterable[int]) -> Tuple[Dict, ...]:
+        """Records at positions, e.g. the result of a columns query"""
+        return tuple(self.record(int(position)) for position in positions)
+
+    def top(self, view: str, limit: int, ascending: bool = False) -> Tuple[Dict, ...]:
+        """Top-N records of a pre-sorted view"""
+        positions = self.views.get(view)
+        if positions is None or limit <= 0:
+            return ()
+        return self.records_at(positions[-limit:][::-1] if ascending else positions[:limit])
+
+    @property
+    def search_index(self) -> SearchIndex:
+        """Search index over symbols and names, built on first use (decodes every record once)"""
+        if self._search_index is None:
+            self._search_index = SearchIndex(list(self.data))
+        return self._search_index
+
+    def search(self, query: str, limit: Optional[int] = None, fuzzy: bool = False) -> List[Dict]:
+        return self.search_index.search(query, limit=limit, fuzzy=fuzzy)
+
+    @property
+    def columns(self) -> MarketColumns:
+        """MarketColumns over the mapped numeric columns, without copying them"""
+        if self._columns is None:
+            numeric = {name[len('col.'):]: self.array(name, np.float64)
+                       for name in self.sections if name.startswith('col.')}
+            self._columns = MarketColumns.from_arrays(self.size, numeric)
+        return self._columns
+
+def packed_snapshot(key: str, payload: Dict) -> MappedSnapshot:
+    """Snapshot in the same layout, held in this process instead of a shared file.
+
+    The decoded records are dropped once packed: columns, views and indexes stay
+    arrays and records are decoded again only for the rows a request returns.
+    """
+    return MappedSnapshot(_encode_snapshot(key, payload, 0))
+
+class MappedSnapshots:
+    """Snapshots shared between processes on one host as immutable memory-mapped files.
+
+    The collector writes each new snapshot to a temporary file and renames it over
+    <directory>/<key>.snap, so a file is never modified once published. API workers
+    stat the path on every read and map the new file when it was replaced; requests
+    still holding the previous snapshot keep reading its (unlinked) file until they
+    finish. A file expires ttl seconds after its mtime, which the collector refreshes
+    while upstream data is unchanged, like the TTL of the stored snapshot.
+    """
+
+    def __init__(self, directory: str, ttl: int = 300):
+        self.logger = logging.getLogger(__name__)
+        self.directory = directory
+        self.ttl = ttl
+        # key -> ((device, inode), mapped snapshot)
+        self._current: Dict[str, Tuple[Tuple[int, int], MappedSnapshot]] = {}
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.snap")
+
+    def publish(self, key: str, payload: Dict, ttl: Optional[int] = None) -> bool:
+        """Write payload as the current snapshot file for key"""
+        path = self.path(key)
+        temp = f"{path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(temp, 'wb') as f:
+                f.write(_encode_snapshot(key, payload, self.ttl if ttl is None else ttl))
+            os.replace(temp, path)
+            return True
+        except OSError as e:
+            self.logger.error(f"Error publishing mapped snapshot {path}: {e}")
+            try:
+                os.unlink(temp)
+            except OSError:
+                pass
+            return False
+
+    def touch(self, key: str) -> bool:
+        """Extend the current file's expiry without rewriting it"""
+        try:
+            os.utime(self.path(key))
+            return True
+        except OSError:
+            return False
+
+    def get(self, key: str) -> Optional[MappedSnapshot]:
+        """The current snapshot for key, remapped only when the collector replaced the file"""
+        if key not in MAPPED_KEYS:
+            return None
+        path = self.path(key)
+        try:
+            stat = os.stat(path)
+            entry = self._current.get(key)
+            if entry is None or entry[0] != (stat.st_dev, stat.st_ino):
+                with open(path, 'rb') as f:
+                    # The identity of the file actually opened, it may have been replaced since the stat
+                    opened = os.fstat(f.fileno())
+                    entry = ((opened.st_dev, opened.st_ino), MappedSnapshot(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)))
+                self._current[key] = entry
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, struct.error) as e:
+            self.logger.error(f"Error mapping snapshot {path}: {e}")
+            return None
+
+        snapshot = entry[1]
+        if time.time() > stat.st_mtime + snapshot.ttl:
+            return None
+        return snapshot
+
+# Shared snapshot files on this host, None when SNAPSHOT_MMAP_DIR is empty
+mapped_snapshots = MappedSnapshots(Config.SNAPSHOT_MMAP_DIR) if Config.SNAPSHOT_MMAP_DIR else None
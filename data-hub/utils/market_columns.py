@@ -0,0 +1,98 @@
+import sys
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Public column names -> market record fields
+NUMERIC_COLUMNS = {
+    'price': 'current_price',
+    'market_cap': 'market_cap',
+    'rank': 'market_cap_rank',
+    'volume': 'total_volume',
+    'change_1h': 'price_change_1h',
+    'change_24h': 'price_change_24h',
+    'change_7d': 'price_change_7d'
+}
+STRING_COLUMNS = ('id', 'symbol', 'name')
+
+def _number(value) -> float:
+    return float('nan') if value is None else value
+
+class MarketColumns:
+    """Column-oriented view of a market snapshot for vectorized queries.
+
+    Numeric fields are float64 arrays (NaN where the source has no value) and
+    symbols/names are interned, so filters, sorts and aggregates run in NumPy.
+    Queries return positions into the snapshot; records are only picked for the
+    rows that end up in a response.
+    """
+
+    def __init__(self, records: Sequence[Dict]):
+        self.size = len(records)
+        self.strings: Dict[str, np.ndarray] = {
+            field: np.array([sys.intern(record.get(field) or '') for record in records], dtype=object)
+            for field in STRING_COLUMNS
+        }
+        self.numeric: Dict[str, np.ndarray] = {
+            name: np.fromiter((_number(record.get(field)) for record in records), dtype=np.float64, count=self.size)
+            for name, field in NUMERIC_COLUMNS.items()
+        }
+
+    @classmethod
+    def from_arrays(cls, size: int, numeric: Dict[str, np.ndarray],
+                    strings: Optional[Dict[str, np.ndarray]] = None) -> 'MarketColumns':
+        """Columns over existing arrays (e.g. a mapped snapshot file), without copying them"""
+        columns = cls.__new__(cls)
+        columns.size = size
+        columns.numeric = numeric
+        columns.strings = strings or {}
+        return columns
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __getitem__(self, column: str) -> np.ndarray:
+        return self.numeric[column] if column in self.numeric else self.strings[column]
+
+    def select(self, bounds: Dict[Tuple[str, str], float]) -> np.ndarray:
+        """Positions within every (column, 'min'|'max') bound; rows without a value never match a bound"""
+        selected = np.ones(self.size, dtype=bool)
+        for (column, side), bound in bounds.items():
+            values = self.numeric[column]
+            with np.errstate(invalid='ignore'):
+                selected &= values >= bound if side == 'min' else values <= bound
+        return np.flatnonzero(selected)
+
+    def order(self, column: str, ascending: bool = False, positions: Optional[np.ndarray] = None,
+              limit: Optional[int] = None) -> np.ndarray:
+        """Positions sorted by column (rows without a value last), cut to limit"""
+        if positions is None:
+            positions = np.arange(self.size)
+        values = self.numeric[column][positions]
+        keys = values if ascending else -values
+        keys = np.where(np.isnan(keys), np.inf, keys)
+
+        if limit is not None and 0 < limit < len(keys):
+            # Only the top rows need a full sort
+            head = np.argpartition(keys, limit - 1)[:limit]
+            order = head[np.argsort(keys[head], kind='stable')]
+        else:
+            order = np.argsort(keys, kind='stable')
+            if limit is not None:
+                order = order[:max(limit, 0)]
+        return positions[order]
+
+    def total(self, column: str, positions: Optional[np.ndarray] = None) -> float:
+        values = self.numeric[column] if positions is None else self.numeric[column][positions]
+        return float(np.nansum(values))
+
+    def weighted_mean(self, column: str, weights: str, positions: Optional[np.ndarray] = None) -> Optional[float]:
+        """Mean of column weighted by another column, over rows that have both"""
+        values, weight = self.numeric[column], self.numeric[weights]
+        if positions is not None:
+            values, weight = values[positions], weight[positions]
+        valid = ~(np.isnan(values) | np.isnan(weight))
+        total_weight = weight[valid].sum()
+        if not total_weight:
+            return None
+        return float((values[valid] * weight[valid]).sum() / total_weight)
@@ -0,0 +1,100 @@
+import gzip
+import json
+from typing import Dict, FrozenSet, Iterable
+
+try:
+    import brotli
+except ImportError:  # brotli is optional, gzip variants are always produced
+    brotli = None
+
+from utils.snapshot import Snapshot
+from utils.analytics import market_analytics, market_movers
+from utils.views import VIEW_SPECS
+
+# Encodings in server preference order
+ENCODINGS = ('br', 'gzip', 'identity') if brotli else ('gzip', 'identity')
+# Limit of the published top-N bodies (top coins, top staking, movers)
+TOP_LIMIT = 20
+# Compression level for bodies the collector publishes, and for bodies encoded on a request
+PUBLISH_LEVEL = 9
+REQUEST_LEVEL = 1
+
+def body_name(*parts) -> str:
+    """Name of a response body, shared by the collector (publisher) and the API (reader)"""
+    return ':'.join(str(part) for part in parts)
+
+def versioned_name(name: str, version: int) -> str:
+    """Storage name of a published body, so bodies of different snapshot versions never mix"""
+    return f"{name}@{version}"
+
+def published_names(limits: Iterable[int] = (10, 50, 100), top_limit: int = TOP_LIMIT) -> FrozenSet[str]:
+    """Names of every body prerender_bodies publishes, the only ones the API caches"""
+    names = [body_name('market-prices', limit) for limit in limits]
+    names += [body_name('top-coins', view, ascending, top_limit)
+              for view in VIEW_SPECS['market_prices'] for ascending in (False, True)]
+    names += [body_name('market-analytics'), body_name('market-movers', top_limit),
+              body_name('staking-data', None), body_name('top-staking', top_limit), body_name('market-summary')]
+    return frozenset(names)
+
+def listing_body(data: Iterable[Dict], snapshot: Snapshot) -> Dict:
+    """Standard listing response body for data taken from snapshot"""
+    data = list(data)
+    body = {
+        'data': data,
+        'count': len(data),
+        'timestamp': snapshot.timestamp,
+        'source': snapshot.source
+    }
+    if snapshot.version is not None:
+        body['version'] = snapshot.version
+    return body
+
+def top_coins_body(snapshot: Snapshot, by: str, ascending: bool, limit: int) -> Dict:
+    body = listing_body(snapshot.top(by, limit, ascending=ascending), snapshot)
+    body.update({'by': by, 'order': 'asc' if ascending else 'desc'})
+    return body
+
+def encode_body(body: Dict) -> bytes:
+    return json.dumps(body, separators=(',', ':')).encode('utf-8')
+
+def encode_variants(body: Dict, level: int = PUBLISH_LEVEL) -> Dict[str, bytes]:
+    """Encode a response body once and compress it for every supported encoding"""
+    raw = encode_body(body)
+    variants = {
+        'identity': raw,
+        'gzip': gzip.compress(raw, compresslevel=level)
+    }
+    if brotli:
+        variants['br'] = brotli.compress(raw, quality=level)
+    return variants
+
+def prerender_bodies(key: str, payload: Dict, limits: Iterable[int] = (10, 50, 100),
+                     top_limit: int = TOP_LIMIT) -> Dict[str, Dict[str, bytes]]:
+    """Render and compress the API's common response bodies for a freshly collected payload.
+
+    Returned names carry the payload's version (see versioned_name); a payload without
+    a version publishes nothing, since readers could not tell which snapshot it belongs to.
+    """
+    bodies = {}
+    version = payload.get('version')
+    if version is None:
+        return bodies
+
+    if key == 'market_prices':
+        snapshot = Snapshot(payload, key)
+        for limit in limits:
+            bodies[body_name('market-prices', limit)] = listing_body(snapshot.data[:limit], snapshot)
+        for view in snapshot.views:
+            for ascending in (False, True):
+                bodies[body_name('top-coins', view, ascending, top_limit)] = top_coins_body(
+                    snapshot, view, ascending, top_limit)
+        bodies[body_name('market-analytics')] = market_analytics(snapshot)
+        bodies[body_name('market-movers', top_limit)] = market_movers(snapshot, top_limit)
+    elif key == 'staking_data':
+        snapshot = Snapshot(payload, key)
+        bodies[body_name('staking-data', None)] = listing_body(snapshot.data, snapshot)
+        bodies[body_name('top-staking', top_limit)] = listing_body(snapshot.top('apy', top_limit), snapshot)
+    elif key == 'market_summary':
+        bodies[body_name('market-summary')] = payload
+
+    return {versioned_name(name, version): encode_variants(body) for name, body in bodies.items()}
@@ -0,0 +1,139 @@
+import asyncio
+import logging
+import threading
+import time
+from typing import Dict, Optional
+
+# Atomically refill and take from a bucket stored as a Redis hash.
+# Uses the Redis server clock so every collector host shares one time base.
+# Returns the number of milliseconds until enough tokens are available (0 = taken).
+_TOKEN_BUCKET_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local requested = tonumber(ARGV[3])
+local now_parts = redis.call('TIME')
+local now = tonumber(now_parts[1]) * 1000 + math.floor(tonumber(now_parts[2]) / 1000)
+
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+local tokens = tonumber(bucket[1])
+local updated = tonumber(bucket[2])
+if tokens == nil then
+    tokens = capacity
+    updated = now
+end
+
+tokens = math.min(capacity, tokens + (now - updated) * rate)
+local wait = 0
+if tokens >= requested then
+    tokens = tokens - requested
+else
+    wait = math.ceil((requested - tokens) / rate)
+end
+
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'updated', now)
+redis.call('PEXPIRE', KEYS[1], math.ceil(capacity / rate) + 1000)
+return wait
+"""
+
+class TokenBucket:
+    """In-process token bucket, O(1) per acquire"""
+
+    def __init__(self, rate_per_minute: float, capacity: Optional[float] = None):
+        self.rate = rate_per_minute / 60.0  # tokens per second
+        self.capacity = float(capacity if capacity is not None else rate_per_minute)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def take(self, tokens: float = 1) -> float:
+        """Take tokens if available; return 0.0 on success, else seconds until available"""
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+
+            if self.tokens >= tokens:
+                self.tokens -= tokens
+                return 0.0
+
+            return (tokens - self.tokens) / self.rate
+
+class RedisTokenBucket(TokenBucket):
+    """Token bucket stored in Redis so all collector processes share one quota"""
+
+    def __init__(self, client, key: str, rate_per_minute: float, capacity: Optional[float] = None):
+        super().__init__(rate_per_minute, capacity)
+        self.logger = logging.getLogger(__name__)
+        self.key = key
+        self._script = client.register_script(_TOKEN_BUCKET_SCRIPT)
+
+    def take(self, tokens: float = 1) -> float:
+        try:
+            wait_ms = self._script(keys=[self.key], args=[self.rate / 1000.0, self.capacity, tokens])
+            return int(wait_ms) / 1000.0
+        except Exception as e:
+            # Fall back to the local bucket so a Redis blip does not stop collection
+            self.logger.warning(f"Shared rate limiter unavailable for {self.key}, using local bucket: {e}")
+            return super().take(tokens)
+
+class RateLimiter:
+    """Per-source token buckets, optionally shared between processes through Redis"""
+
+    def __init__(self, rate_limits: Dict[str, float], shared: bool = False, prefix: str = 'ratelimit'):
+        self.logger = logging.getLogger(__name__)
+        self.rate_limits = rate_limits
+
+        client = None
+        if shared:
+            # Imported lazily so the simple (Redis-less) setup does not need redis installed
+            from utils.redis_client import redis_client
+            client = redis_client.client
+            if client is None:
+                self.logger.warning("Redis unavailable, rate limits are enforced per process")
+
+        self.buckets: Dict[str, TokenBucket] = {}
+        for source, rate in rate_limits.items():
+            if client is not None:
+                self.buckets[source] = RedisTokenBucket(client, f"{prefix}:{source}", rate)
+            else:
+                self.buckets[source] = TokenBucket(rate)
+
+    def try_acquire(self, source: str) -> bool:
+        """Take a token for source without waiting"""
+        return self.buckets[source].take() == 0.0
+
+    def acquire(self, source: str, timeout: Optional[float] = None) -> bool:
+        """Wait until a token for source is available, or until timeout expires"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        while True:
+            wait = self.buckets[source].take()
+            if wait == 0.0:
+                return True
+
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or wait > remaining:
+                    return False
+
+            time.sleep(wait)
+
+    async def acquire_async(self, source: str, timeout: Optional[float] = None) -> bool:
+        """Async variant of acquire that yields to the event loop while waiting"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        bucket = self.buckets[source]
+
+        while True:
+            if isinstance(bucket, RedisTokenBucket):
+                wait = await asyncio.to_thread(bucket.take)
+            else:
+                wait = bucket.take()
+            if wait == 0.0:
+                return True
+
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or wait > remaining:
+                    return False
+
+            await asyncio.sleep(wait)
@@ -0,0 +1,209 @@
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, Optional
+
+import redis
+
+# Failures that mean Redis is unreachable; server replies such as ResponseError do not count
+CONNECTION_ERRORS = (redis.ConnectionError, redis.TimeoutError, OSError)
+
+class CircuitOpenError(redis.ConnectionError):
+    """Raised instead of touching the network while the circuit breaker is open"""
+
+class CircuitBreaker:
+    """Opens after threshold consecutive connection failures.
+
+    While open every checkout fails immediately, so callers fall back (e.g. to the
+    last known snapshot) instead of each waiting for a connect timeout. on_open is
+    called whenever a call is refused and should make sure something (a background
+    reconnect) eventually calls reset() once Redis answers again.
+    """
+
+    def __init__(self, threshold: int = 5, on_open: Optional[Callable[[], None]] = None):
+        self.threshold = threshold
+        self.on_open = on_open
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    @property
+    def is_open(self) -> bool:
+        return self.opened_at is not None
+
+    def allow(self) -> bool:
+        """Whether a call may go to Redis"""
+        if self.opened_at is None:
+            return True
+        if self.on_open is not None:
+            self.on_open()
+        return False
+
+    def record_success(self):
+        if self.failures:
+            with self._lock:
+                self.failures = 0
+
+    def record_failure(self) -> bool:
+        """Count a failure; returns True when this one opened the circuit"""
+        with self._lock:
+            self.failures += 1
+            opened = self.opened_at is None and self.failures >= self.threshold
+            if opened:
+                self.opened_at = time.time()
+        if opened and self.on_open is not None:
+            self.on_open()
+        return opened
+
+    def trip(self):
+        """Open the circuit right away (e.g. Redis was unreachable at startup)"""
+        with self._lock:
+            self.failures = max(self.failures, self.threshold)
+            if self.opened_at is None:
+                self.opened_at = time.time()
+        if self.on_open is not None:
+            self.on_open()
+
+    def reset(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+
+class PoolMetrics:
+    """Connection pool counters: wait time for a connection, in-flight commands and error rate.
+
+    Checkouts and errors are kept in one-second buckets so the error rate covers the
+    last window seconds without storing every call.
+    """
+
+    def __init__(self, window: int = 60):
+        self.window = window
+        self.in_flight = 0
+        self.checkouts = 0
+        self.errors = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self._buckets = deque()  # [second, checkouts, errors]
+        self._lock = threading.Lock()
+
+    def _bucket(self, now: float):
+        second = int(now)
+        if not self._buckets or self._buckets[-1][0] != second:
+            self._buckets.append([second, 0, 0])
+            while self._buckets[0][0] <= second - self.window:
+                self._buckets.popleft()
+        return self._buckets[-1]
+
+    def checkout(self, waited: float):
+        with self._lock:
+            self.in_flight += 1
+            self.checkouts += 1
+            self.wait_total += waited
+            self.wait_max = max(self.wait_max, waited)
+            self._bucket(time.time())[1] += 1
+
+    def checkin(self):
+        with self._lock:
+            self.in_flight -= 1
+
+    def error(self):
+        with self._lock:
+            self.errors += 1
+            self._bucket(time.time())[2] += 1
+
+    def error_rate(self) -> float:
+        """Share of connection errors per checkout over the last window seconds"""
+        with self._lock:
+            self._bucket(time.time())
+            checkouts = sum(bucket[1] for bucket in self._buckets)
+            errors = sum(bucket[2] for bucket in self._buckets)
+        if not checkouts:
+            return 1.0 if errors else 0.0
+        return min(1.0, errors / checkouts)
+
+    def as_dict(self) -> Dict:
+        error_rate = self.error_rate()
+        return {
+            'in_flight': self.in_flight,
+            'checkouts': self.checkouts,
+            'errors': self.errors,
+            'error_rate': round(error_rate, 4),
+            'pool_wait_avg_ms': round(self.wait_total / self.checkouts * 1000, 3) if self.checkouts else 0.0,
+            'pool_wait_max_ms': round(self.wait_max * 1000, 3)
+        }
+
+class _MeteredConnectionMixin:
+    """Reports every reply (or connection failure) to the pool's breaker and metrics"""
+    breaker: CircuitBreaker = None
+    metrics: PoolMetrics = None
+
+    def send_packed_command(self, *args, **kwargs):
+        try:
+            return super().send_packed_command(*args, **kwargs)
+        except CONNECTION_ERRORS:
+            self._failed()
+            raise
+
+    def read_response(self, *args, **kwargs):
+        try:
+            response = super().read_response(*args, **kwargs)
+        except CONNECTION_ERRORS:
+            self._failed()
+            raise
+        except Exception:
+            # Redis answered (with an error reply), so the connection is fine
+            self.breaker.record_success()
+            raise
+        self.breaker.record_success()
+        return response
+
+    def _failed(self):
+        self.metrics.error()
+        self.breaker.record_failure()
+
+class MeteredConnectionPool(redis.BlockingConnectionPool):
+    """Fixed-size pool that times connection checkouts and fails fast while the breaker is open.
+
+    Callers wait up to timeout seconds for a free connection when all max_connections
+    are in use; that wait is what pool_wait_* in PoolMetrics measures.
+    """
+
+    def __init__(self, breaker: CircuitBreaker, metrics: PoolMetrics, connection_class=redis.Connection,
+                 **kwargs):
+        self.breaker = breaker
+        self.metrics = metrics
+        self._checked_out = set()
+        metered = type(f"Metered{connection_class.__name__}", (_MeteredConnectionMixin, connection_class),
+                       {'breaker': breaker, 'metrics': metrics})
+        super().__init__(connection_class=metered, **kwargs)
+
+    @classmethod
+    def from_url(cls, url: str, breaker: CircuitBreaker, metrics: PoolMetrics, max_connections: int = 20,
+                 timeout: float = 5, **connection_kwargs):
+        # redis-py parses the URL (the scheme picks the TCP/TLS/unix connection class)
+        parsed = redis.ConnectionPool.from_url(url, **connection_kwargs)
+        return cls(breaker, metrics, connection_class=parsed.connection_class, max_connections=max_connections,
+                   timeout=timeout, **parsed.connection_kwargs)
+
+    def get_connection(self, *args, **kwargs):
+        if not self.breaker.allow():
+            raise CircuitOpenError("Redis circuit breaker is open")
+        started = time.perf_counter()
+        try:
+            connection = super().get_connection(*args, **kwargs)
+        except CONNECTION_ERRORS as e:
+            self.metrics.error()
+            # An exhausted pool means load, not an unreachable Redis
+            if 'No connection available' not in str(e):
+                self.breaker.record_failure()
+            raise
+        self.metrics.checkout(time.perf_counter() - started)
+        self._checked_out.add(id(connection))
+        return connection
+
+    def release(self, connection):
+        # get_connection also releases connections that failed to connect, those were never counted
+        if id(connection) in self._checked_out:
+            self._checked_out.discard(id(connection))
+            self.metrics.checkin()
+        super().release(connection)
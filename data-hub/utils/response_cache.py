@@ -0,0 +1,84 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, Optional
+
+from flask import Request, Response
+
+from utils.prerender import ENCODINGS, REQUEST_LEVEL, encode_body, encode_variants, versioned_name
+
+class CachedBody:
+    """A pre-encoded JSON body in every supported encoding, with its strong ETag"""
+
+    def __init__(self, source: Any, variants: Dict[str, bytes]):
+        self.source = source
+        self.variants = variants
+        self.etag = hashlib.blake2b(variants['identity'], digest_size=16).hexdigest()
+
+class ResponseCache:
+    """Pre-encoded response bodies, rebuilt only when their source snapshot changes.
+
+    Entries remember the snapshot object they were built from; the snapshot cache hands
+    out a new object for every new version, so an identity check is a version check.
+    Only the bodies the collector publishes (see utils.prerender) are cached: they are
+    fetched through loader for the source's version, and encoded here with cheap
+    compression while the collector has not published them. Bodies for other parameters
+    are encoded for their request only, uncompressed, and never evict published ones.
+    """
+
+    def __init__(self, loader: Optional[Callable[[str], Optional[Dict[str, bytes]]]] = None,
+                 published: Iterable[str] = (), max_entries: int = 256):
+        self.loader = loader
+        self.published = frozenset(published)
+        self.max_entries = max_entries
+        self._entries: 'OrderedDict[str, CachedBody]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_body(self, name: str, source: Any, build: Callable[[], Dict], cache: bool = False) -> CachedBody:
+        """Get the encoded body for name, encoding build() at most once per source snapshot.
+
+        cache=True also caches a body that is not published, for parameters the caller
+        has bounded to a few values per snapshot.
+        """
+        published = name in self.published
+        if not published and not cache:
+            return CachedBody(source, {'identity': encode_body(build())})
+
+        entry = self._entries.get(name)
+        if entry is None or entry.source is not source:
+            # Published bodies are stored per snapshot version, so a worker still on the
+            # previous version never picks up bodies of the next one
+            version = source.get('version')
+            variants = None
+            if published and self.loader and version is not None:
+                variants = self.loader(versioned_name(name, version))
+            if not variants or 'identity' not in variants:
+                variants = encode_variants(build(), level=REQUEST_LEVEL)
+
+            entry = CachedBody(source, variants)
+            with self._lock:
+                self._entries[name] = entry
+                self._entries.move_to_end(name)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return entry
+
+    def respond(self, request: Request, name: str, source: Any, build: Callable[[], Dict],
+                cache: bool = False) -> Response:
+        """Serve the best cached encoding with a strong ETag, answering If-None-Match with 304"""
+        entry = self.get_body(name, source, build, cache)
+        encoding = request.accept_encodings.best_match(
+            [encoding for encoding in ENCODINGS if encoding in entry.variants]) or 'identity'
+
+        response = Response(entry.variants[encoding], mimetype='application/json')
+        response.vary.add('Accept-Encoding')
+        if encoding == 'identity':
+            response.set_etag(entry.etag)
+        else:
+            # Each representation needs its own strong validator
+            response.headers['Content-Encoding'] = encoding
+            response.set_etag(f"{entry.etag}-{encoding}")
+
+        # Clients may keep the body but must revalidate it, which costs a 304 at most
+        response.headers['Cache-Control'] = 'no-cache'
+        return response.make_conditional(request)
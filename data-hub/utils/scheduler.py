@@ -0,0 +1,123 @@
+import asyncio
+import logging
+import math
+import random
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+class SourceSchedule:
+    """Timing state of one source"""
+
+    def __init__(self, name: str, interval: float):
+        self.name = name
+        self.interval = interval
+        self.next_run = 0.0  # due immediately
+        self.failures = 0
+        self.running_since: Optional[float] = None
+
+class Scheduler:
+    """Wall-clock anchored schedule with per-source intervals, jitter and backoff.
+
+    Runs are pinned to multiples of a source's interval (a 120s source runs at
+    :00, :02, ... plus a random jitter), so collection time never shifts the
+    cadence and missed slots are skipped rather than replayed. A failing source
+    retries with exponential backoff on its own, without delaying the others.
+    """
+
+    def __init__(self, intervals: Dict[str, float], jitter: float = 0.05,
+                 backoff_base: float = 15, backoff_max: float = 900,
+                 clock: Callable[[], float] = time.time):
+        self.logger = logging.getLogger(__name__)
+        self.sources = {name: SourceSchedule(name, interval) for name, interval in intervals.items()}
+        self.jitter = jitter
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.clock = clock
+
+    def _next_slot(self, source: SourceSchedule, now: float) -> float:
+        slot = (math.floor(now / source.interval) + 1) * source.interval
+        return slot + random.uniform(0, self.jitter * source.interval)
+
+    def due(self, now: Optional[float] = None) -> List[str]:
+        """Sources whose next run has come and that are not running"""
+        now = self.clock() if now is None else now
+        return [
+            name for name, source in self.sources.items()
+            if source.running_since is None and source.next_run <= now
+        ]
+
+    def start(self, name: str, now: Optional[float] = None):
+        """Mark a source as running until record() is called"""
+        self.sources[name].running_since = self.clock() if now is None else now
+
+    def record(self, name: str, success: bool, now: Optional[float] = None):
+        """Schedule the next run of a source after it finished"""
+        now = self.clock() if now is None else now
+        source = self.sources[name]
+        source.running_since = None
+
+        if success:
+            source.failures = 0
+            source.next_run = self._next_slot(source, now)
+            return
+
+        source.failures += 1
+        delay = min(self.backoff_max, self.backoff_base * 2 ** (source.failures - 1))
+        # Full jitter keeps retries of several failing sources apart
+        source.next_run = now + random.uniform(delay / 2, delay)
+        self.logger.warning(f"{name} failed {source.failures}x, retrying in {source.next_run - now:.0f}s")
+
+    def expire_running(self, timeout: float, now: Optional[float] = None) -> List[str]:
+        """Count runs that never reported back within timeout as failures"""
+        now = self.clock() if now is None else now
+        expired = [
+            name for name, source in self.sources.items()
+            if source.running_since is not None and now - source.running_since > timeout
+        ]
+        for name in expired:
+            self.record(name, False, now)
+        return expired
+
+    def wait_time(self, now: Optional[float] = None) -> float:
+        """Seconds until the earliest next run of an idle source"""
+        now = self.clock() if now is None else now
+        pending = [source.next_run for source in self.sources.values() if source.running_since is None]
+        return max(0.0, min(pending) - now) if pending else 1.0
+
+    async def run_forever_async(self, run: Callable[[List[str]], Awaitable[Dict[str, Any]]],
+                                max_sleep: float = 60):
+        """Await run([source]) in a task of its own whenever a source is due.
+
+        A source waiting on its rate limiter or a slow upstream only delays its own
+        next run, never the slots of the others. run returns {source: result}; a
+        missing, None or exception result counts as a failure.
+        """
+        finished = asyncio.Event()
+        tasks = set()
+
+        async def run_source(name: str):
+            try:
+                result = (await run([name])).get(name)
+            except Exception as e:
+                self.logger.error(f"Error running {name}: {e}")
+                result = None
+            self.record(name, result is not None and not isinstance(result, Exception))
+            finished.set()
+
+        while True:
+            try:
+                # A finished source may be due again sooner than the earliest idle one
+                await asyncio.wait_for(finished.wait(), min(self.wait_time(), max_sleep))
+            except asyncio.TimeoutError:
+                pass
+            finished.clear()
+
+            for name in self.due():
+                self.start(name)
+                task = asyncio.create_task(run_source(name))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+
+    def run_forever(self, run: Callable[[List[str]], Dict[str, Any]], max_sleep: float = 60):
+        """Call run([source]) in a worker thread of its own whenever a source is due (see run_forever_async)"""
+        asyncio.run(self.run_forever_async(lambda due: asyncio.to_thread(run, due), max_sleep))
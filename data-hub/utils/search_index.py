@@ -0,0 +1,83 @@
+from collections import Counter
+from typing import Dict, List, Optional
+
+def _normalize(text: str) -> str:
+    return ' '.join(text.lower().split())
+
+def _rank(record: Dict) -> float:
+    rank = record.get('market_cap_rank')
+    return rank if rank is not None else float('inf')
+
+class SearchIndex:
+    """N-gram inverted index over pre-normalized coin symbols and names.
+
+    Every 1-, 2- and 3-character substring of a symbol or name maps to the records
+    containing it, in market_cap_rank order. Short queries are answered straight from
+    their posting list; longer ones only verify the candidates of their rarest trigram,
+    so results come out ranked and a limit stops the scan early.
+    """
+
+    GRAM_SIZE = 3
+
+    def __init__(self, records: List[Dict]):
+        self.records = sorted(records, key=_rank)
+        self.symbols = [_normalize(record.get('symbol', '')) for record in self.records]
+        self.names = [_normalize(record.get('name', '')) for record in self.records]
+
+        self.postings: Dict[str, List[int]] = {}
+        for position, (symbol, name) in enumerate(zip(self.symbols, self.names)):
+            grams = set()
+            for text in (symbol, name):
+                for size in range(1, self.GRAM_SIZE + 1):
+                    for start in range(len(text) - size + 1):
+                        grams.add(text[start:start + size])
+
+            # Positions are appended in rank order, so every posting list stays sorted
+            for gram in grams:
+                self.postings.setdefault(gram, []).append(position)
+
+    def search(self, query: str, limit: Optional[int] = None, fuzzy: bool = False) -> List[Dict]:
+        """Find coins whose symbol or name contains query, ordered by market_cap_rank.
+
+        With fuzzy=True, remaining slots are filled with coins sharing most of the
+        query's trigrams (tolerates typos such as 'etherum').
+        """
+        query = _normalize(query)
+        if not query or (limit is not None and limit <= 0):
+            return []
+
+        if len(query) <= self.GRAM_SIZE:
+            positions = self.postings.get(query, [])
+            matches = positions if limit is None else positions[:limit]
+        else:
+            grams = [query[start:start + self.GRAM_SIZE] for start in range(len(query) - self.GRAM_SIZE + 1)]
+            candidates = min((self.postings.get(gram, []) for gram in grams), key=len)
+            matches = []
+            for position in candidates:
+                if query in self.symbols[position] or query in self.names[position]:
+                    matches.append(position)
+                    if limit is not None and len(matches) >= limit:
+                        break
+
+        results = [self.records[position] for position in matches]
+        if fuzzy and (limit is None or len(results) < limit):
+            results += self._fuzzy_matches(query, set(matches), None if limit is None else limit - len(results))
+        return results
+
+    def _fuzzy_matches(self, query: str, exclude: set, limit: Optional[int], threshold: float = 0.5) -> List[Dict]:
+        if len(query) < self.GRAM_SIZE:
+            return []
+
+        grams = {query[start:start + self.GRAM_SIZE] for start in range(len(query) - self.GRAM_SIZE + 1)}
+        shared = Counter()
+        for gram in grams:
+            shared.update(self.postings.get(gram, ()))
+
+        scored = [
+            (-count / len(grams), position) for position, count in shared.items()
+            if position not in exclude and count / len(grams) >= threshold
+        ]
+        scored.sort()
+        if limit is not None:
+            scored = scored[:limit]
+        return [self.records[position] for _, position in scored]
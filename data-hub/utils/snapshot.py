@@ -0,0 +1,84 @@
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from utils.search_index import SearchIndex
+from utils.views import build_views
+
+class Snapshot:
+    """Decoded collector payload with lookup indexes built once per collection.
+
+    Records and views are exposed as tuples so requests can share them safely.
+    """
+
+    def __init__(self, payload: Dict, key: Optional[str] = None):
+        self.payload = payload
+        self.data: Tuple[Dict, ...] = tuple(payload.get('data', []))
+        self.timestamp = payload.get('timestamp')
+        self.source = payload.get('source')
+        self.version = payload.get('version')
+
+        # Records are ranked, so the first coin with a symbol owns it
+        self.by_symbol: Dict[str, Dict] = {}
+        self.by_id: Dict[str, Dict] = {}
+        for record in self.data:
+            self.by_symbol.setdefault(record['symbol'], record)
+            if 'id' in record:
+                self.by_id[record['id']] = record
+
+        # Pre-sorted views published by the collector (built here for older payloads)
+        positions = payload.get('views')
+        if positions is None and key is not None:
+            positions = build_views(key, self.data)
+        self.views: Dict[str, Tuple[Dict, ...]] = {
+            name: tuple(self.data[i] for i in view) for name, view in (positions or {}).items()
+        }
+
+        self._search_index: Optional[SearchIndex] = None
+        self._columns = None
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Dict-style access to the raw payload"""
+        return self.payload.get(key, default)
+
+    def lookup(self, symbol: str) -> Optional[Dict]:
+        """Find a record by (upper-case) symbol"""
+        return self.by_symbol.get(symbol)
+
+    def lookup_many(self, symbols: Iterable[str]) -> List[Optional[Dict]]:
+        """Find records for several symbols, None where a symbol is unknown"""
+        return [self.by_symbol.get(symbol) for symbol in symbols]
+
+    def lookup_id(self, coin_id: str) -> Optional[Dict]:
+        """Find a record by CoinGecko id"""
+        return self.by_id.get(coin_id)
+
+    def records_at(self, positions: Iterable[int]) -> Tuple[Dict, ...]:
+        """Records at positions, e.g. the result of a columns query"""
+        return tuple(self.data[position] for position in positions)
+
+    def top(self, view: str, limit: int, ascending: bool = False) -> Tuple[Dict, ...]:
+        """Top-N records of a pre-sorted view, without sorting per request"""
+        records = self.views.get(view, ())
+        if limit <= 0:
+            return ()
+        if ascending:
+            return records[-limit:][::-1]
+        return records[:limit]
+
+    @property
+    def search_index(self) -> SearchIndex:
+        """Search index over symbols and names, built on first use"""
+        if self._search_index is None:
+            self._search_index = SearchIndex(self.data)
+        return self._search_index
+
+    def search(self, query: str, limit: Optional[int] = None, fuzzy: bool = False) -> List[Dict]:
+        """Find records by symbol or name, ranked by market_cap_rank"""
+        return self.search_index.search(query, limit=limit, fuzzy=fuzzy)
+
+    @property
+    def columns(self):
+        """NumPy columns (utils.market_columns) for vectorized queries, built on first use"""
+        if self._columns is None:
+            # Imported here so the simple (NumPy-free) setup can still use snapshots
+            from utils.market_columns import MarketColumns
+            self._columns = MarketColumns(self.data)
+        return self._columns
@@ -0,0 +1,152 @@
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from utils.storage_backend import StorageBackend
+
+class SnapshotCache:
+    """Per-worker cache of decoded snapshots from the storage backend.
+
+    Entries are dropped when the collector announces a write on the updates channel,
+    so while the subscription is alive reads never touch the store. Without a subscription
+    each read only compares the small version key before reusing the decoded value.
+    Optional per-key builders turn the decoded payload into a richer object (e.g. an
+    indexed Snapshot) once per load instead of once per request.
+    Keys published as mapped files (see utils.mapped_snapshot) are read from the
+    shared mapping unless the store reports a different version, which is checked once
+    per announced write (or per read without a subscription), and from the store otherwise.
+    """
+
+    def __init__(self, store: StorageBackend, max_age: float = 120,
+                 builders: Optional[Dict[str, Callable[[Any], Any]]] = None, mapped=None):
+        self.logger = logging.getLogger(__name__)
+        self.storage = store
+        self.max_age = max_age
+        self.builders = builders or {}
+        self.mapped = mapped
+
+        # key -> (version, decoded value, loaded at)
+        self._entries: Dict[str, Tuple[Optional[int], Any, float]] = {}
+        # key -> (mapped snapshot whose version matched the store, checked at)
+        self._mapped_checked: Dict[str, Tuple[Any, float]] = {}
+        self._generation = 0
+        self._listening = False
+        self._listener = None
+        self._callbacks: List[Callable[[str], None]] = []
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        """Get the decoded snapshot for key, loading it from the store only when it changed"""
+        self._ensure_listener()
+        snapshot = self._mapped(key)
+        if snapshot is not None:
+            return snapshot
+
+        now = time.monotonic()
+        entry = self._entries.get(key)
+
+        if entry is not None and self._listening and now - entry[2] < self.max_age:
+            return entry[1]
+
+        if entry is not None:
+            version = self.storage.get_version(key)
+            if version is not None and version == entry[0]:
+                self._entries[key] = (version, entry[1], now)
+                return entry[1]
+
+        generation = self._generation
+        value, version = self.storage.get_data_with_version(key)
+        if value is not None and key in self.builders:
+            value = self.builders[key](value)
+
+        with self._lock:
+            if value is None:
+                self._entries.pop(key, None)
+            else:
+                # An invalidation raced with this load: keep the value but force a version check
+                loaded_at = now if generation == self._generation else 0.0
+                self._entries[key] = (version, value, loaded_at)
+        return value
+
+    def get_version(self, key: str) -> Optional[int]:
+        """Version of the currently cached snapshot for key, if any"""
+        snapshot = self._mapped(key)
+        if snapshot is not None:
+            return snapshot.version
+        entry = self._entries.get(key)
+        return entry[0] if entry is not None else None
+
+    def _mapped(self, key: str):
+        """The mapped snapshot for key, None when there is none or the store reports a different version"""
+        snapshot = self.mapped.get(key) if self.mapped is not None else None
+        if snapshot is None:
+            return None
+
+        now = time.monotonic()
+        checked = self._mapped_checked.get(key)
+        if checked is not None and checked[0] is snapshot and self._listening and now - checked[1] < self.max_age:
+            return snapshot
+
+        # Another writer (a queue worker on another host, a standalone collector) may have
+        # updated the store without replacing this host's file
+        generation = self._generation
+        version = self.storage.get_version(key)
+        if version is None:
+            # The store cannot tell (unreachable, circuit open): the file beats serving nothing
+            return snapshot
+        if version != snapshot.version:
+            return None
+        with self._lock:
+            if generation == self._generation:
+                self._mapped_checked[key] = (snapshot, now)
+        return snapshot
+
+    def add_listener(self, callback: Callable[[str], None]):
+        """Call callback(key) from the listener thread whenever the collector updates key"""
+        self._callbacks.append(callback)
+        self._ensure_listener()
+
+    def invalidate(self, key: Optional[str] = None):
+        """Drop one cached snapshot, or all of them"""
+        with self._lock:
+            self._generation += 1
+            if key is None:
+                self._entries.clear()
+                self._mapped_checked.clear()
+            else:
+                self._entries.pop(key, None)
+                self._mapped_checked.pop(key, None)
+
+    def _ensure_listener(self):
+        # Started lazily so that every forked API worker gets its own subscription
+        if self._listener is None or not self._listener.is_alive():
+            with self._lock:
+                if self._listener is None or not self._listener.is_alive():
+                    self._listener = threading.Thread(target=self._listen, name='snapshot-cache-listener',
+                                                      daemon=True)
+                    self._listener.start()
+
+    def _listen(self):
+        while True:
+            try:
+                pubsub = self.storage.subscribe_updates()
+                if pubsub is None:
+                    time.sleep(5)
+                    continue
+
+                # Anything cached before the subscription may have missed a notification
+                self.invalidate()
+                self._listening = True
+                for message in pubsub.listen():
+                    self.invalidate(message['data'])
+                    for callback in self._callbacks:
+                        try:
+                            callback(message['data'])
+                        except Exception as e:
+                            self.logger.error(f"Snapshot update callback failed: {e}")
+            except Exception as e:
+                self.logger.warning(f"Snapshot update subscription lost: {e}")
+            finally:
+                self._listening = False
+            time.sleep(5)
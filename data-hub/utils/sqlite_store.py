@@ -0,0 +1,262 @@
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from utils.storage_backend import SYMBOL_LAYOUTS, StorageBackend, SymbolRecords
+
+class _PollingSubscription:
+    """Stand-in for a Redis pub/sub subscription: yields keys whose version changed"""
+
+    def __init__(self, store: 'SQLiteStore', interval: float):
+        self.store = store
+        self.interval = interval
+        self.versions = store._versions()
+
+    def listen(self):
+        while True:
+            time.sleep(self.interval)
+            current = self.store._versions()
+            for key, version in current.items():
+                if self.versions.get(key) != version:
+                    yield {'data': key}
+            self.versions = current
+
+class SQLiteStore(StorageBackend):
+    """Snapshot store in a local SQLite file, for single-host deployments without Redis.
+
+    Collector and API processes open the same file (WAL, so readers never block the
+    writer). Values carry an expiry like Redis keys and are encoded with the same
+    codecs, a multi-key write is one transaction, and subscribers are notified by
+    polling the version table every STORAGE_POLL_INTERVAL seconds.
+    """
+
+    name = 'sqlite'
+    PRUNE_INTERVAL = 60
+
+    def __init__(self, path: str, poll_interval: float = 0.5):
+        super().__init__()
+        self.logger = logging.getLogger(__name__)
+        self.path = path
+        self.poll_interval = poll_interval
+        self._lock = threading.Lock()
+        self._last_prune = 0.0
+        self._conn: Optional[sqlite3.Connection] = None
+        self._pid = None
+
+    def _connect(self) -> sqlite3.Connection:
+        # A forked worker must not share its parent's connection
+        if self._conn is None or self._pid != os.getpid():
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS kv (
+                    key TEXT PRIMARY KEY,
+                    value BLOB NOT NULL,
+                    expires REAL NOT NULL
+                ) WITHOUT ROWID;
+                CREATE TABLE IF NOT EXISTS versions (
+                    key TEXT PRIMARY KEY,
+                    version INTEGER NOT NULL
+                ) WITHOUT ROWID;
+                CREATE TABLE IF NOT EXISTS bodies (
+                    key TEXT NOT NULL,
+                    encoding TEXT NOT NULL,
+                    body BLOB NOT NULL,
+                    expires REAL NOT NULL,
+                    PRIMARY KEY (key, encoding)
+                ) WITHOUT ROWID;
+            """)
+            self._conn, self._pid = conn, os.getpid()
+        return self._conn
+
+    def _write(self, statements: List[Tuple[str, tuple]]) -> bool:
+        """Run statements in one transaction"""
+        try:
+            with self._lock:
+                conn = self._connect()
+                conn.execute('BEGIN IMMEDIATE')
+                try:
+                    for sql, params in statements:
+                        conn.execute(sql, params)
+                    conn.execute('COMMIT')
+                except Exception:
+                    conn.execute('ROLLBACK')
+                    raise
+                self._prune(conn)
+            return True
+        except sqlite3.Error as e:
+            self.logger.error(f"Error writing to {self.path}: {e}")
+            return False
+
+    def _read(self, sql: str, params: tuple = ()) -> List[tuple]:
+        try:
+            with self._lock:
+                return self._connect().execute(sql, params).fetchall()
+        except sqlite3.Error as e:
+            self.logger.error(f"Error reading from {self.path}: {e}")
+            return []
+
+    def _prune(self, conn: sqlite3.Connection):
+        now = time.time()
+        if now - self._last_prune < self.PRUNE_INTERVAL:
+            return
+        self._last_prune = now
+        conn.execute('DELETE FROM kv WHERE expires <= ?', (now,))
+        conn.execute('DELETE FROM bodies WHERE expires <= ?', (now,))
+
+    @staticmethod
+    def _put(key: str, value: bytes, ttl: int) -> Tuple[str, tuple]:
+        return 'INSERT OR REPLACE INTO kv (key, value, expires) VALUES (?, ?, ?)', (key, value, time.time() + ttl)
+
+    def _version_statements(self, key: str, data: Any, delta: Any, delta_ttl: int) -> List[Tuple[str, tuple]]:
+        version = data.get('version') if isinstance(data, dict) else None
+        if version is None:
+            return [("""INSERT INTO versions (key, version) VALUES (?, 1)
+                        ON CONFLICT (key) DO UPDATE SET version = version + 1""", (key,))]
+        statements = [('INSERT OR REPLACE INTO versions (key, version) VALUES (?, ?)', (key, version))]
+        if delta is not None:
+            statements.append(self._put(f"{key}:delta:{version}", self.serializer.dumps(delta), delta_ttl))
+        return statements
+
+    def set_data(self, key: str, data: Any, ttl: int = 300, delta: Any = None, delta_ttl: int = 3600) -> bool:
+        return self._write([self._put(key, self.serializer.dumps(data), ttl),
+                            *self._version_statements(key, data, delta, delta_ttl)])
+
+    def set_data_batch(self, items: Dict[str, Any], ttl: int = 300, deltas: Optional[Dict[str, Any]] = None,
+                       delta_ttl: int = 3600, symbol_records: Optional[Dict[str, Tuple]] = None,
+                       ttls: Optional[Dict[str, int]] = None) -> Optional[str]:
+        if not items:
+            return None
+        deltas = deltas or {}
+        ttls = ttls or {}
+        statements = []
+        for key, data in items.items():
+            statements.append(self._put(key, self.serializer.dumps(data), ttls.get(key, ttl)))
+            statements += self._version_statements(key, data, deltas.get(key), delta_ttl)
+        for key, value in (symbol_records or {}).items():
+            records = SymbolRecords(*value)
+            statements += self._symbol_statements(key, records.records, records.ttl or ttl, records.meta,
+                                                 records.replace)
+        return str(time.time_ns()) if self._write(statements) else None
+
+    def get_many_with_versions(self, keys: List[str]) -> Dict[str, Tuple[Optional[Any], Optional[int]]]:
+        result = {key: (None, None) for key in keys}
+        if not keys:
+            return result
+        marks = ','.join('?' * len(keys))
+        rows = self._read(f"""
+            SELECT v.key, kv.value, v.version FROM versions v
+            LEFT JOIN kv ON kv.key = v.key AND kv.expires > ?
+            WHERE v.key IN ({marks})
+        """, (time.time(), *keys))
+        for key, value, version in rows:
+            result[key] = (self.serializer.loads(value) if value is not None else None, version)
+        return result
+
+    def get_version(self, key: str) -> Optional[int]:
+        rows = self._read('SELECT version FROM versions WHERE key = ?', (key,))
+        return rows[0][0] if rows else None
+
+    def _versions(self) -> Dict[str, int]:
+        return dict(self._read('SELECT key, version FROM versions'))
+
+    def _get_many(self, keys: List[str]) -> Dict[str, bytes]:
+        if not keys:
+            return {}
+        marks = ','.join('?' * len(keys))
+        return dict(self._read(f'SELECT key, value FROM kv WHERE key IN ({marks}) AND expires > ?',
+                               (*keys, time.time())))
+
+    def get_deltas(self, key: str, versions: List[int]) -> List[Optional[Dict]]:
+        names = [f"{key}:delta:{version}" for version in versions]
+        values = self._get_many(names)
+        return [self.serializer.loads(values[name]) if name in values else None for name in names]
+
+    def expire_keys(self, keys: List[str], ttl: int) -> bool:
+        if not keys:
+            return False
+        expires = time.time() + ttl
+        marks = ','.join('?' * len(keys))
+        return self._write([
+            (f'UPDATE kv SET expires = ? WHERE key IN ({marks})', (expires, *keys)),
+            (f'UPDATE bodies SET expires = ? WHERE key IN ({marks})', (expires, *keys))
+        ])
+
+    def set_bodies(self, bodies: Dict[str, Dict[str, bytes]], ttl: int = 300) -> bool:
+        expires = time.time() + ttl
+        statements = []
+        for name, variants in bodies.items():
+            statements.append(('DELETE FROM bodies WHERE key = ?', (f"body:{name}",)))
+            statements += [
+                ('INSERT INTO bodies (key, encoding, body, expires) VALUES (?, ?, ?, ?)',
+                 (f"body:{name}", encoding, body, expires))
+                for encoding, body in variants.items()
+            ]
+        return self._write(statements)
+
+    def get_body(self, name: str) -> Optional[Dict[str, bytes]]:
+        rows = self._read('SELECT encoding, body FROM bodies WHERE key = ? AND expires > ?',
+                          (f"body:{name}", time.time()))
+        return {encoding: bytes(body) for encoding, body in rows} or None
+
+    def set_symbol_records(self, key: str, records: List[Dict], ttl: int = 300, replace: bool = True,
+                           meta: Optional[Dict] = None) -> bool:
+        return self._write(self._symbol_statements(key, records, ttl, meta, replace))
+
+    def _symbol_statements(self, key: str, records: List[Dict], ttl: int,
+                           meta: Optional[Dict], replace: bool = True) -> List[Tuple[str, tuple]]:
+        # Sorted-set indexes are Redis only; the snapshot's own views cover them here
+        prefix, meta_key, _ = SYMBOL_LAYOUTS[key]
+        statements = []
+        if replace:
+            # Symbols that dropped out of the set must not outlive it
+            statements.append(('DELETE FROM kv WHERE substr(key, 1, ?) = ?',
+                               (len(prefix) + 1, f"{prefix}:")))
+        seen = set()
+        for record in records:
+            # Records arrive ranked, so the first coin claims a shared symbol
+            if record['symbol'] in seen:
+                continue
+            seen.add(record['symbol'])
+            statements.append(self._put(f"{prefix}:{record['symbol']}", self.serializer.dumps(record), ttl))
+        if meta is not None:
+            statements.append(self._put(meta_key, self.serializer.dumps(meta), ttl))
+        return statements
+
+    def get_symbol_records(self, key: str, symbols: List[str]) -> Tuple[List[Optional[Dict]], Optional[Dict]]:
+        prefix, meta_key, _ = SYMBOL_LAYOUTS[key]
+        names = [f"{prefix}:{symbol}" for symbol in symbols]
+        values = self._get_many(names + [meta_key])
+        records = [self.serializer.loads(values[name]) if name in values else None for name in names]
+        meta = values.get(meta_key)
+        return records, (self.serializer.loads(meta) if meta is not None else None)
+
+    def delete_data(self, key: str) -> bool:
+        return self._write([('DELETE FROM kv WHERE key = ?', (key,))])
+
+    def subscribe_updates(self):
+        return _PollingSubscription(self, self.poll_interval)
+
+    def health_check(self) -> bool:
+        try:
+            with self._lock:
+                self._connect().execute('SELECT 1')
+            return True
+        except sqlite3.Error as e:
+            self.logger.error(f"Storage health check failed: {e}")
+            return False
+
+    def stats(self) -> Dict[str, Any]:
+        rows = self._read('SELECT COUNT(*) FROM kv WHERE expires > ?', (time.time(),))
+        return {
+            'path': self.path,
+            'keys': rows[0][0] if rows else 0,
+            'size_bytes': os.path.getsize(self.path) if os.path.exists(self.path) else 0
+        }
@@ -0,0 +1,4 @@
+from utils.storage_backend import create_storage
+
+# Global snapshot store shared by collectors and APIs
+storage = create_storage()
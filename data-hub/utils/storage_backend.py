@@ -0,0 +1,133 @@
+import logging
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+from config.settings import Config
+from utils.codecs import PayloadSerializer
+
+# Per-symbol storage layout: snapshot key -> (hash key prefix, meta key, {sorted-set index key: score field}).
+# Meta and index keys live outside the "<prefix>:" namespace so they can never collide with a symbol.
+SYMBOL_LAYOUTS = {
+    'market_prices': ('coin', 'coin_meta', {'coin_index:rank': 'market_cap_rank'}),
+    'staking_data': ('staking', 'staking_meta', {'staking_index:apy': 'staking_apy'})
+}
+
+def symbol_members_key(key: str) -> str:
+    """Set of the symbols stored for key, so a replacing write can drop the ones that left"""
+    return f"{SYMBOL_LAYOUTS[key][0]}_symbols"
+
+class SymbolRecords(NamedTuple):
+    """Per-symbol records written together with a cycle (see set_data_batch)"""
+    records: List[Dict]
+    meta: Optional[Dict]
+    # The batch ttl when None
+    ttl: Optional[int] = None
+    # False merges into the records already stored (paginated ingestion)
+    replace: bool = True
+
+class StorageBackend(ABC):
+    """Snapshot store shared by the collectors and the APIs.
+
+    Implementations keep versioned snapshots with a TTL, their deltas, pre-rendered
+    response bodies and per-symbol records, and announce writes to subscribers.
+    Key names are the same for every backend, so collectors and API code do not
+    care which one is configured (STORAGE_BACKEND).
+    """
+
+    name = 'storage'
+
+    def __init__(self):
+        self.logger = logging.getLogger(__name__)
+        # Snapshots and deltas are stored tagged with their codec, see utils/codecs.py
+        try:
+            self.serializer = PayloadSerializer(Config.STORAGE_CODEC, Config.STORAGE_COMPRESS_THRESHOLD)
+        except ValueError as e:
+            self.logger.warning(f"{e}, storing snapshots as JSON")
+            self.serializer = PayloadSerializer('json', Config.STORAGE_COMPRESS_THRESHOLD)
+
+    @abstractmethod
+    def set_data(self, key: str, data: Any, ttl: int = 300, delta: Any = None, delta_ttl: int = 3600) -> bool:
+        """Store a snapshot, bump its version and announce the update"""
+
+    @abstractmethod
+    def set_data_batch(self, items: Dict[str, Any], ttl: int = 300, deltas: Optional[Dict[str, Any]] = None,
+                       delta_ttl: int = 3600, symbol_records: Optional[Dict[str, Tuple]] = None,
+                       ttls: Optional[Dict[str, int]] = None) -> Optional[str]:
+        """Store several snapshots atomically; returns an id for the write.
+
+        symbol_records (key -> SymbolRecords, or a (records, meta) tuple) writes the
+        per-symbol records of those keys in the same write, so they never get ahead of
+        the snapshot readers see. ttls overrides ttl for single items.
+        """
+
+    @abstractmethod
+    def get_many_with_versions(self, keys: List[str]) -> Dict[str, Tuple[Optional[Any], Optional[int]]]:
+        """Several snapshots with their versions, read consistently"""
+
+    def get_data(self, key: str) -> Optional[Any]:
+        return self.get_many_with_versions([key])[key][0]
+
+    def get_data_with_version(self, key: str) -> Tuple[Optional[Any], Optional[int]]:
+        """Retrieve data and its version atomically"""
+        return self.get_many_with_versions([key])[key]
+
+    @abstractmethod
+    def get_version(self, key: str) -> Optional[int]:
+        """The version counter that set_data bumps on every write"""
+
+    @abstractmethod
+    def get_deltas(self, key: str, versions: List[int]) -> List[Optional[Dict]]:
+        """Stored deltas for several versions of key, None where missing"""
+
+    @abstractmethod
+    def expire_keys(self, keys: List[str], ttl: int) -> bool:
+        """Reset the TTL of several keys"""
+
+    @abstractmethod
+    def set_bodies(self, bodies: Dict[str, Dict[str, bytes]], ttl: int = 300) -> bool:
+        """Store pre-rendered response bodies, encoding -> bytes per body"""
+
+    @abstractmethod
+    def get_body(self, name: str) -> Optional[Dict[str, bytes]]:
+        """All encodings of a pre-rendered response body"""
+
+    @abstractmethod
+    def set_symbol_records(self, key: str, records: List[Dict], ttl: int = 300, replace: bool = True,
+                           meta: Optional[Dict] = None) -> bool:
+        """Store one record per symbol (see SYMBOL_LAYOUTS) plus the snapshot meta"""
+
+    @abstractmethod
+    def get_symbol_records(self, key: str, symbols: List[str]) -> Tuple[List[Optional[Dict]], Optional[Dict]]:
+        """Per-symbol records for symbols plus the snapshot meta"""
+
+    @abstractmethod
+    def delete_data(self, key: str) -> bool:
+        """Delete a snapshot"""
+
+    def subscribe_updates(self):
+        """Subscription whose listen() yields {'data': key} for every written snapshot, or None"""
+        return None
+
+    @abstractmethod
+    def health_check(self) -> bool:
+        """Whether the store can be used"""
+
+    def stats(self) -> Dict[str, Any]:
+        """Backend specific metrics for the health endpoint"""
+        return {}
+
+def create_storage(backend: Optional[str] = None) -> StorageBackend:
+    """The configured snapshot store (STORAGE_BACKEND: redis or sqlite)"""
+    backend = backend or Config.STORAGE_BACKEND
+    if backend == 'redis':
+        try:
+            # Imported lazily so the sqlite backend does not need redis installed
+            from utils.redis_client import redis_client
+            return redis_client
+        except ImportError as e:
+            logging.getLogger(__name__).warning(f"Redis backend unavailable ({e}), using sqlite")
+            backend = 'sqlite'
+    if backend == 'sqlite':
+        from utils.sqlite_store import SQLiteStore
+        return SQLiteStore(Config.STORAGE_PATH, Config.STORAGE_POLL_INTERVAL)
+    raise ValueError(f"Unknown STORAGE_BACKEND {backend!r}, expected redis or sqlite")
@@ -0,0 +1,55 @@
+import io
+import json
+from typing import Dict, Iterable, List
+
+try:
+    import ijson
+    from ijson.common import ObjectBuilder
+except ImportError:  # ijson is optional, fall back to a full parse
+    ijson = None
+
+def parse_head(body: bytes, limit: int, fields: Iterable[str]) -> List[Dict]:
+    """First limit objects of a top-level JSON array, keeping only fields.
+
+    With ijson the document is parsed as a stream: values of other fields are
+    skipped without being built and parsing stops after the last needed object,
+    so a multi-MB response never exists as Python objects.
+    """
+    fields = frozenset(fields)
+    if ijson is None:
+        items = [item for item in json.loads(body) if isinstance(item, dict)]
+        return [{field: item[field] for field in fields if field in item} for item in items[:max(limit, 0)]]
+
+    items: List[Dict] = []
+    if limit <= 0:
+        return items
+
+    current = None
+    builder = None
+    key = None
+    depth = 0
+    for prefix, event, value in ijson.parse(io.BytesIO(body), use_float=True):
+        if builder is not None:
+            # Building a wanted value until its (possibly nested) end
+            builder.event(event, value)
+            if event in ('start_map', 'start_array'):
+                depth += 1
+            elif event in ('end_map', 'end_array'):
+                depth -= 1
+            if depth == 0:
+                current[key] = builder.value
+                builder = None
+            continue
+
+        if prefix != 'item':
+            continue
+        if event == 'start_map':
+            current = {}
+        elif event == 'map_key' and current is not None and value in fields:
+            builder, key, depth = ObjectBuilder(), value, 0
+        elif event == 'end_map' and current is not None:
+            items.append(current)
+            current = None
+            if len(items) >= limit:
+                break
+    return items
@@ -0,0 +1,33 @@
+from typing import Dict, List
+
+# Pre-sorted views published with each snapshot: snapshot key -> {view name: sort field}.
+# Views are descending; ascending top-N reads walk the same view from the tail.
+VIEW_SPECS = {
+    'market_prices': {
+        'market_cap': 'market_cap',
+        'volume': 'total_volume',
+        'change_24h': 'price_change_24h'
+    },
+    'staking_data': {
+        'apy': 'staking_apy',
+        'market_cap': 'market_cap'
+    }
+}
+
+def build_views(key: str, records: List[Dict]) -> Dict[str, List[int]]:
+    """Sort once per collection: view name -> record positions, highest value first.
+
+    Records without a value for the sort field are left out of that view.
+    """
+    views = {}
+    for name, field in VIEW_SPECS.get(key, {}).items():
+        positions = [i for i, record in enumerate(records) if record.get(field) is not None]
+        positions.sort(key=lambda i: records[i][field], reverse=True)
+        views[name] = positions
+    return views
+
+def attach_views(key: str, payload: Dict) -> Dict:
+    """Add the pre-sorted views for key to a collector payload"""
+    if key in VIEW_SPECS:
+        payload['views'] = build_views(key, payload['data'])
+    return payload
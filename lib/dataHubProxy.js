@@ -0,0 +1,48 @@
+// Forwards a Next.js API request to the data hub without re-encoding the response.
+// The data hub serves pre-rendered, pre-compressed bodies with strong ETags, so the
+// body bytes, their Content-Encoding and 304 Not Modified answers are passed through
+// unchanged. node:http is used instead of fetch, which would decompress the body.
+import http from 'http';
+import https from 'https';
+
+const FORWARDED_REQUEST_HEADERS = ['if-none-match', 'accept-encoding'];
+const FORWARDED_RESPONSE_HEADERS = ['content-type', 'content-encoding', 'content-length', 'etag', 'vary', 'cache-control'];
+
+export function proxyToDataHub(req, res, path) {
+  const url = new URL(`${process.env.DATA_HUB_URL || 'http://localhost:5000'}${path}?${new URLSearchParams(req.query)}`);
+
+  const headers = {};
+  FORWARDED_REQUEST_HEADERS.forEach(name => {
+    if (req.headers[name]) {
+      headers[name] = req.headers[name];
+    }
+  });
+
+  return new Promise((resolve, reject) => {
+    const request = (url.protocol === 'https:' ? https : http).get(url, { headers }, (response) => {
+      if (response.statusCode !== 200 && response.statusCode !== 304) {
+        response.resume();
+        reject(new Error(`Data hub responded with status: ${response.statusCode}`));
+        return;
+      }
+
+      // Set CORS headers
+      res.setHeader('Access-Control-Allow-Origin', '*');
+      res.setHeader('Access-Control-Allow-Methods', 'GET');
+      res.setHeader('Access-Control-Allow-Headers', 'Content-Type, If-None-Match');
+      res.setHeader('Access-Control-Expose-Headers', 'ETag');
+
+      FORWARDED_RESPONSE_HEADERS.forEach(name => {
+        if (response.headers[name] !== undefined) {
+          res.setHeader(name, response.headers[name]);
+        }
+      });
+
+      res.statusCode = response.statusCode;
+      response.on('error', reject);
+      response.on('end', resolve);
+      response.pipe(res);
+    });
+    request.on('error', reject);
+  });
+}
@@ -4,6 +4,8 @@ class DataService {
     this.baseUrl = process.env.NEXT_PUBLIC_DATA_HUB_URL || '/api/data';
     this.cache = new Map();
     this.cacheTimeout = 5 * 60 * 1000; // 5 minutes
+    // The stream runs on its own port, pages/api/data/stream.js proxies it by default
+    this.streamUrl = process.env.NEXT_PUBLIC_DATA_HUB_STREAM_URL || '/api/data/stream';
   }
 
   async fetchWithCache(endpoint, options = {}) {
@@ -22,7 +24,17 @@ class DataService {
         }
       });
 
-      const response = await fetch(url.toString());
+      // Revalidate a stale entry: the data hub answers 304 while the snapshot is unchanged
+      const headers = {};
+      if (cached && cached.etag) {
+        headers['If-None-Match'] = cached.etag;
+      }
+
+      const response = await fetch(url.toString(), { headers });
+      if (response.status === 304 && cached) {
+        cached.timestamp = Date.now();
+        return cached.data;
+      }
       if (!response.ok) {
         throw new Error(`HTTP error! status: ${response.status}`);
       }
@@ -32,6 +44,7 @@ class DataService {
       // Cache the result
       this.cache.set(cacheKey, {
         data,
+        etag: response.headers.get('ETag'),
         timestamp: Date.now()
       });
 
@@ -86,6 +99,22 @@ class DataService {
     return this.fetchWithCache('/health');
   }
 
+  // Live prices: the data hub pushes only changed coins after every collection.
+  // Returns an unsubscribe function.
+  subscribeToPrices(onUpdate, symbols = null) {
+    const url = new URL(this.streamUrl, typeof window !== 'undefined' ? window.location.href : undefined);
+    if (symbols) {
+      url.searchParams.append('symbols', Array.isArray(symbols) ? symbols.join(',') : symbols);
+    }
+
+    const source = new EventSource(url.toString());
+    source.addEventListener('snapshot', (event) => onUpdate({ type: 'snapshot', ...JSON.parse(event.data) }));
+    source.addEventListener('prices', (event) => onUpdate({ type: 'prices', ...JSON.parse(event.data) }));
+    source.onerror = (error) => console.error('Price stream error:', error);
+
+    return () => source.close();
+  }
+
   // Utility methods
   clearCache() {
     this.cache.clear();
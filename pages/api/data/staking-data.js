@@ -1,23 +1,17 @@
+import { proxyToDataHub } from '../../../lib/dataHubProxy';
+
 // Next.js API route for staking data
 export default async function handler(req, res) {
   try {
-    // Forward request to data hub
-    const response = await fetch(`${process.env.DATA_HUB_URL || 'http://localhost:5000'}/api/data/staking-data?${new URLSearchParams(req.query)}`);
-    
-    if (!response.ok) {
-      throw new Error(`Data hub responded with status: ${response.status}`);
-    }
-    
-    const data = await response.json();
-    
-    // Set CORS headers
-    res.setHeader('Access-Control-Allow-Origin', '*');
-    res.setHeader('Access-Control-Allow-Methods', 'GET');
-    res.setHeader('Access-Control-Allow-Headers', 'Content-Type');
-    
-    res.status(200).json(data);
+    // Forward request to data hub, its ETag, 304 and compressed body pass through unchanged
+    await proxyToDataHub(req, res, '/api/data/staking-data');
   } catch (error) {
     console.error('Error fetching staking data:', error);
+    if (res.headersSent) {
+      // Failed part way through the data hub's response
+      res.end();
+      return;
+    }
     
     // Fallback staking data
     const fallbackData = {
@@ -0,0 +1,60 @@
+// Next.js API route for the live price stream (Server-Sent Events)
+// The data hub serves the stream from a separate process (STREAM_PORT), so events are piped through unchanged.
+export const config = {
+  api: {
+    responseLimit: false
+  }
+};
+
+export default async function handler(req, res) {
+  const upstream = new AbortController();
+  req.on('close', () => upstream.abort());
+
+  try {
+    const headers = { Accept: 'text/event-stream' };
+    // Lets a reconnecting EventSource skip the snapshot it already has
+    if (req.headers['last-event-id']) {
+      headers['Last-Event-ID'] = req.headers['last-event-id'];
+    }
+
+    const response = await fetch(
+      `${process.env.DATA_HUB_STREAM_URL || 'http://localhost:5001'}/api/data/stream?${new URLSearchParams(req.query)}`,
+      { headers, signal: upstream.signal }
+    );
+
+    if (!response.ok || !response.body) {
+      throw new Error(`Data hub stream responded with status: ${response.status}`);
+    }
+
+    res.writeHead(200, {
+      'Content-Type': 'text/event-stream',
+      'Cache-Control': 'no-cache, no-transform',
+      'Connection': 'keep-alive',
+      'X-Accel-Buffering': 'no',
+      'Access-Control-Allow-Origin': '*'
+    });
+
+    const reader = response.body.getReader();
+    while (true) {
+      const { done, value } = await reader.read();
+      if (done) {
+        break;
+      }
+      res.write(value);
+    }
+    res.end();
+  } catch (error) {
+    if (upstream.signal.aborted) {
+      // The browser went away
+      return;
+    }
+    console.error('Error streaming prices:', error);
+
+    if (res.headersSent) {
+      // The EventSource reconnects on its own
+      res.end();
+    } else {
+      res.status(502).json({ error: 'Price stream unavailable' });
+    }
+  }
+}